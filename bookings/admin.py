@@ -1,9 +1,15 @@
 from django.contrib import admin
-from .models import Booking
+from fitness_backend.admin import EstimatedCountAdmin
+from trainers.admin import TrainerListFilter
+from .models import Booking, BookingSeries, WaitlistEntry
+
+
+class ScheduleTrainerListFilter(TrainerListFilter):
+    trainer_lookup = "schedule__trainer"
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(EstimatedCountAdmin):
 
     list_display = (
         "id",
@@ -17,8 +23,7 @@ class BookingAdmin(admin.ModelAdmin):
     list_filter = (
         "status",
         "booking_date",
-        "schedule__trainer__user__last_name",
-        "client__username",
+        ScheduleTrainerListFilter,
     )
     search_fields = (
         "client__username",
@@ -28,6 +33,8 @@ class BookingAdmin(admin.ModelAdmin):
         "schedule__trainer__user__last_name",
     )
     readonly_fields = ("created_at", "updated_at")
+    list_select_related = ("client", "schedule__trainer__user")
+    autocomplete_fields = ("client", "schedule", "series")
 
     def schedule_info(self, obj):
         return (
@@ -36,3 +43,60 @@ class BookingAdmin(admin.ModelAdmin):
         )
 
     schedule_info.short_description = "Расписание"
+
+
+@admin.register(BookingSeries)
+class BookingSeriesAdmin(EstimatedCountAdmin):
+    list_display = (
+        "id",
+        "client",
+        "schedule",
+        "start_date",
+        "booking_time",
+        "weeks",
+        "created_at",
+    )
+    list_filter = ("start_date",)
+    search_fields = (
+        "client__username",
+        "client__first_name",
+        "client__last_name",
+    )
+    readonly_fields = ("created_at", "updated_at")
+    autocomplete_fields = ("client", "schedule")
+
+    def get_queryset(self, request):
+        # клиент и расписание нужны в __str__ (в том числе в подсказках
+        # автодополнения поля series у записи)
+        return (
+            super()
+            .get_queryset(request)
+            .select_related(
+                "client", "schedule__trainer__user", "schedule__fitness_club"
+            )
+        )
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(EstimatedCountAdmin):
+    list_display = (
+        "id",
+        "client",
+        "schedule",
+        "booking_date",
+        "booking_time",
+        "created_at",
+    )
+    list_filter = ("booking_date",)
+    search_fields = (
+        "client__username",
+        "client__first_name",
+        "client__last_name",
+    )
+    readonly_fields = ("created_at",)
+    list_select_related = (
+        "client",
+        "schedule__trainer__user",
+        "schedule__fitness_club",
+    )
+    autocomplete_fields = ("client", "schedule")
@@ -1,6 +1,40 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+def ensure_booking_partitions(sender, **kwargs):
+    from .partitions import ensure_partitions
+
+    ensure_partitions()
+
+
+def record_booking_deleted(sender, instance, **kwargs):
+    from .models import BookingEventType, record_booking_changes
+
+    # Удаление (в том числе каскадное) выполняется в транзакции Collector,
+    # поэтому событие и сводка меняются атомарно с удалением.
+    record_booking_changes([instance], BookingEventType.DELETED)
+
+
+def sync_booking_rollups(sender, instance, created, **kwargs):
+    from .models import BookingRollup
+
+    # Тренер и клуб в сводке скопированы из расписания.
+    if not created:
+        BookingRollup.objects.filter(schedule=instance).exclude(
+            trainer_id=instance.trainer_id, fitness_club_id=instance.fitness_club_id
+        ).update(
+            trainer_id=instance.trainer_id, fitness_club_id=instance.fitness_club_id
+        )
 
 
 class BookingsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "bookings"
+
+    def ready(self):
+        # Секции на ближайшие месяцы досоздаются при каждом деплое (migrate);
+        # между деплоями их поддерживает команда manage_booking_partitions.
+        post_migrate.connect(ensure_booking_partitions, sender=self)
+        post_delete.connect(record_booking_deleted, sender="bookings.Booking")
+        post_save.connect(sync_booking_rollups, sender="schedule.Schedule")
@@ -0,0 +1,163 @@
+"""
+Движок свободных слотов.
+
+Окно каждого расписания делится на слоты фиксированной длины
+``BOOKING_SLOT_MINUTES``, и свободным предлагается время начала слота.
+Запись конфликтует только с записями на то же время, поэтому слот занят
+ровно тогда, когда заполнен счётчик ``SlotOccupancy`` его времени начала;
+записи вне сетки (сделанные до её введения или при другой длине слота)
+на свободные слоты не влияют. Сетка — правило только этой выдачи: проверки
+самой записи её не требуют.
+
+Занятость расписания на конкретную дату хранится битовой маской (``int``):
+бит ``i`` установлен, если ``i``-й слот заполнен (подтверждённых записей
+не меньше вместимости расписания). Маски строятся одним запросом
+к счётчикам ``SlotOccupancy`` по всем расписаниям и датам диапазона,
+отменённые занятия — одним запросом к исключениям из расписания, после чего
+любые вопросы о свободных слотах решаются в памяти.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from schedule.models import ScheduleException
+from .models import SlotOccupancy
+
+
+def minutes(value):
+    return value.hour * 60 + value.minute
+
+
+class ScheduleSlots:
+    """
+    Разбиение окна расписания на слоты фиксированной длины.
+    """
+
+    def __init__(self, schedule, slot_minutes):
+        self.schedule = schedule
+        self.slot_minutes = slot_minutes
+        self.start = minutes(schedule.start_time)
+        span = minutes(schedule.end_time) - self.start
+        self.count = max(0, -(-span // slot_minutes))
+        self.full_mask = (1 << self.count) - 1
+
+    def index(self, booking_time):
+        """
+        Номер слота, который начинается во время записи, или ``None``.
+        """
+        offset = minutes(booking_time) - self.start
+        if (
+            booking_time.second
+            or booking_time.microsecond
+            or offset < 0
+            or offset % self.slot_minutes
+            or offset // self.slot_minutes >= self.count
+        ):
+            return None
+        return offset // self.slot_minutes
+
+    def started_mask(self, now):
+        """
+        Маска слотов, начало которых уже наступило к времени ``now``.
+        """
+        elapsed = minutes(now) - self.start
+        if elapsed < 0:
+            return 0
+        return self.full_mask & ((1 << (elapsed // self.slot_minutes + 1)) - 1)
+
+    def time(self, index):
+        start = datetime.combine(datetime.min.date(), self.schedule.start_time)
+        return (start + timedelta(minutes=index * self.slot_minutes)).time()
+
+    def times(self, mask):
+        """
+        Время начала каждого слота, бит которого установлен в маске.
+        """
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self.time(low.bit_length() - 1))
+            mask ^= low
+        return result
+
+
+class AvailabilityIndex:
+    """
+    Занятость набора расписаний на диапазон дат.
+
+    Заполненные слоты диапазона загружаются одним запросом и сворачиваются
+    в битовые маски по паре ``(schedule_id, date)``; у отменённых занятий
+    и у слотов, начало которых к ``now`` уже наступило, свободных мест нет —
+    те же правила, что и при записи.
+    """
+
+    def __init__(self, schedules, date_from, date_to, slot_minutes=None, now=None):
+        self.slot_minutes = slot_minutes or settings.BOOKING_SLOT_MINUTES
+        self.now = now or timezone.localtime()
+        self.date_from = date_from
+        self.date_to = date_to
+        schedules = list(schedules)
+        self.slots = {
+            schedule.id: ScheduleSlots(schedule, self.slot_minutes)
+            for schedule in schedules
+        }
+        self.occupied = {}
+        self.by_weekday = defaultdict(list)
+        for schedule in sorted(schedules, key=lambda item: item.start_time):
+            self.by_weekday[schedule.weekday].append(schedule.id)
+
+        full_slots = (
+            SlotOccupancy.objects.full()
+            .filter(
+                schedule_id__in=self.slots.keys(),
+                booking_date__range=(date_from, date_to),
+            )
+            .values_list("schedule_id", "booking_date", "booking_time")
+        )
+        for schedule_id, booking_date, booking_time in full_slots:
+            index = self.slots[schedule_id].index(booking_time)
+            if index is not None:
+                key = (schedule_id, booking_date)
+                self.occupied[key] = self.occupied.get(key, 0) | (1 << index)
+
+        self.cancelled = ScheduleException.objects.cancelled(
+            schedules, date_from, date_to
+        )
+
+    def dates(self):
+        day = self.date_from
+        while day <= self.date_to:
+            yield day
+            day += timedelta(days=1)
+
+    def free_mask(self, schedule_id, day):
+        slots = self.slots[schedule_id]
+        if (
+            day.weekday() != slots.schedule.weekday
+            or day < self.now.date()
+            or (schedule_id, day) in self.cancelled
+        ):
+            return 0
+        mask = slots.full_mask & ~self.occupied.get((schedule_id, day), 0)
+        if day == self.now.date():
+            mask &= ~slots.started_mask(self.now.time())
+        return mask
+
+    def free_slots(self, schedule_id, day):
+        return self.slots[schedule_id].times(self.free_mask(schedule_id, day))
+
+    def by_day(self):
+        """
+        Свободные слоты по дням: ``[(date, [(schedule, [time, ...]), ...]), ...]``.
+        Расписания без свободных слотов в этот день пропускаются.
+        """
+        for day in self.dates():
+            entries = []
+            for schedule_id in self.by_weekday[day.weekday()]:
+                free = self.free_slots(schedule_id, day)
+                if free:
+                    entries.append((self.slots[schedule_id].schedule, free))
+            yield day, entries
@@ -0,0 +1,121 @@
+"""
+Доставка событий записей из outbox подписчикам.
+
+События забираются пакетами в порядке ``id`` и передаются функции доставки
+``BOOKING_EVENTS_DELIVERER``. По умолчанию это POST пакета в JSON на
+``BOOKING_EVENTS_WEBHOOK_URL`` (или запись в лог, если адрес не задан).
+При ошибке доставки пакет откладывается с экспоненциально растущей паузой,
+и следующие события ждут его: порядок доставки совпадает с порядком ленты.
+"""
+
+import json
+import logging
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import BookingEvent
+
+logger = logging.getLogger(__name__)
+
+# Ключ сессионной advisory-блокировки: одновременно работает один диспетчер.
+DISPATCHER_LOCK_KEY = 0x626F6F6B696E67  # "booking"
+
+
+def event_data(event):
+    return {
+        "id": event.id,
+        "booking_id": event.booking_id,
+        "event_type": event.event_type,
+        "payload": event.payload,
+        "created_at": event.created_at,
+    }
+
+
+def deliver_webhook(events):
+    """
+    Доставка по умолчанию: один POST ``{"events": [...]}`` на
+    ``BOOKING_EVENTS_WEBHOOK_URL``. Любой ответ, кроме 2xx, считается ошибкой.
+    """
+    url = settings.BOOKING_EVENTS_WEBHOOK_URL
+    if not url:
+        for event in events:
+            logger.info(
+                "Событие записи #%s: %s %s", event.id, event.event_type, event.payload
+            )
+        return
+
+    body = json.dumps(
+        {"events": [event_data(event) for event in events]}, cls=DjangoJSONEncoder
+    ).encode()
+    request = urllib.request.Request(
+        url,
+        data=body,
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(
+        request, timeout=settings.BOOKING_EVENTS_WEBHOOK_TIMEOUT
+    ) as response:
+        if not 200 <= response.status < 300:
+            raise RuntimeError(f"Подписчик ответил кодом {response.status}.")
+
+
+def retry_delay(attempts):
+    return timedelta(
+        seconds=min(2 ** (attempts - 1), settings.BOOKING_EVENTS_RETRY_MAX_SECONDS)
+    )
+
+
+def dispatch_batch(batch_size, deliver=None):
+    """
+    Доставляет следующий пакет недоставленных событий. Возвращает число
+    доставленных событий; ``0`` — если доставлять нечего или голова очереди
+    ещё ждёт повторной попытки. Ошибка доставки не пробрасывается: пакет
+    помечается для повтора.
+    """
+    deliver = deliver or import_string(settings.BOOKING_EVENTS_DELIVERER)
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            BookingEvent.objects.visible()
+            .filter(dispatched_at__isnull=True)
+            .order_by("id")
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        if not events or (events[0].next_attempt_at or now) > now:
+            return 0
+
+        ids = [event.id for event in events]
+        try:
+            deliver(events)
+        except Exception as exc:
+            attempts = events[0].attempts + 1
+            logger.warning("Не удалось доставить события %s: %s", ids, exc)
+            BookingEvent.objects.filter(id__in=ids).update(
+                attempts=attempts,
+                next_attempt_at=now + retry_delay(attempts),
+                last_error=str(exc)[:1000],
+            )
+            return 0
+
+        BookingEvent.objects.filter(id__in=ids).update(
+            dispatched_at=timezone.now(), next_attempt_at=None, last_error=""
+        )
+    return len(events)
+
+
+def acquire_dispatcher_lock():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [DISPATCHER_LOCK_KEY])
+        return cursor.fetchone()[0]
+
+
+def release_dispatcher_lock():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", [DISPATCHER_LOCK_KEY])
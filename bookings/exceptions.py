@@ -0,0 +1,24 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SlotAlreadyTaken(APIException):
+    """
+    Слот расписания уже заполнен подтверждёнными записями (достигнута
+    вместимость расписания).
+    """
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Этот слот расписания уже занят другой записью."
+    default_code = "slot_already_taken"
+
+
+class SlotBusy(APIException):
+    """
+    Слот бронируется конкурирующими запросами, блокировку не удалось получить
+    за отведённое число попыток.
+    """
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Слот сейчас бронируется другим клиентом. Повторите попытку позже."
+    default_code = "slot_busy"
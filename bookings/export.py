@@ -0,0 +1,76 @@
+"""
+Потоковая выгрузка записей в NDJSON или CSV.
+
+Строки читаются серверным курсором PostgreSQL (``QuerySet.iterator``)
+порциями по ``BOOKING_EXPORT_CHUNK_SIZE`` и сразу отдаются клиенту через
+``StreamingHttpResponse``, поэтому потребление памяти не зависит от размера
+выгрузки. Выбираются только нужные столбцы (``values_list``), модели не создаются.
+"""
+
+import csv
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+# Имя столбца выгрузки -> путь поля относительно Booking.
+EXPORT_COLUMNS = {
+    "id": "id",
+    "booking_date": "booking_date",
+    "booking_time": "booking_time",
+    "status": "status",
+    "client_id": "client_id",
+    "client_username": "client__username",
+    "client_email": "client__email",
+    "schedule_id": "schedule_id",
+    "trainer_id": "schedule__trainer_id",
+    "fitness_club_id": "schedule__fitness_club_id",
+    "fitness_club_name": "schedule__fitness_club__name",
+    "series_id": "series_id",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+class Echo:
+    """
+    Псевдобуфер для ``csv.writer``: возвращает записанную строку, а не хранит её.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset):
+    return queryset.values_list(*EXPORT_COLUMNS.values()).iterator(
+        chunk_size=settings.BOOKING_EXPORT_CHUNK_SIZE
+    )
+
+
+def ndjson_lines(queryset):
+    names = list(EXPORT_COLUMNS)
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in export_rows(queryset):
+        yield encoder.encode(dict(zip(names, row))) + "\n"
+
+
+def csv_lines(queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in export_rows(queryset):
+        yield writer.writerow(row)
+
+
+def export_response(queryset, export_format):
+    content_type, extension = EXPORT_FORMATS[export_format]
+    lines = ndjson_lines if export_format == "ndjson" else csv_lines
+    response = StreamingHttpResponse(lines(queryset), content_type=content_type)
+    filename = f"bookings-{timezone.localdate():%Y%m%d}.{extension}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,210 @@
+import statistics
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bookings.exceptions import SlotAlreadyTaken, SlotBusy
+from bookings.models import Booking, BookingStatus
+from bookings.reservations import reserve
+from schedule.models import DayOfWeek, Schedule
+from trainers.models import FitnessClub, Trainer
+from users.models import Role, User
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный тест бронирования: множество потоков одновременно пытаются "
+        "подтвердить запись на один и тот же слот. Выводит пропускную способность, "
+        "задержки и проверяет, что подтверждённых записей ровно столько, "
+        "какова вместимость слота. Каждый поток держит своё соединение с БД, "
+        "поэтому число потоков ограничено max_connections PostgreSQL: для сотен "
+        "потоков его нужно увеличить."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=50,
+            help="Число параллельных потоков (каждый держит своё соединение с БД); "
+            "не больше свободных соединений PostgreSQL (max_connections).",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Общее число попыток бронирования одного слота.",
+        )
+        parser.add_argument(
+            "--capacity",
+            type=int,
+            default=1,
+            help="Вместимость слота (число мест на занятии).",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Не удалять созданные для теста данные.",
+        )
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        total = options["requests"]
+        capacity = options["capacity"]
+        if threads < 1 or total < 1 or capacity < 1:
+            raise CommandError(
+                "--threads, --requests и --capacity должны быть положительными."
+            )
+
+        self.check_connections(threads)
+
+        schedule, clients, booking_date = self.create_fixtures(total, capacity)
+        booking_time = schedule.start_time
+        self.stdout.write(
+            f"Слот: расписание #{schedule.id}, {booking_date} "
+            f"{booking_time.strftime('%H:%M')}; потоков: {threads}, попыток: {total}"
+        )
+
+        outcomes = {"confirmed": 0, "slot_already_taken": 0, "slot_busy": 0, "error": 0}
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def attempt(client_id):
+            started = time.perf_counter()
+            try:
+                reserve(
+                    Booking(
+                        client_id=client_id,
+                        schedule_id=schedule.id,
+                        booking_date=booking_date,
+                        booking_time=booking_time,
+                        status=BookingStatus.CONFIRMED,
+                    )
+                )
+                outcome = "confirmed"
+            except SlotAlreadyTaken:
+                outcome = "slot_already_taken"
+            except SlotBusy:
+                outcome = "slot_busy"
+            except Exception:
+                outcome = "error"
+                with lock:
+                    errors.append(traceback.format_exc())
+            elapsed = time.perf_counter() - started
+            with lock:
+                outcomes[outcome] += 1
+                latencies.append(elapsed)
+
+        def worker(client_ids):
+            try:
+                for client_id in client_ids:
+                    attempt(client_id)
+            finally:
+                connection.close()
+
+        chunks = [clients[i::threads] for i in range(threads)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(worker, [chunk for chunk in chunks if chunk]))
+        elapsed = time.perf_counter() - started
+
+        confirmed_in_db = Booking.objects.filter(
+            schedule=schedule,
+            booking_date=booking_date,
+            booking_time=booking_time,
+            status=BookingStatus.CONFIRMED,
+        ).count()
+
+        latencies.sort()
+        self.stdout.write(f"Время: {elapsed:.3f} с, {total / elapsed:.1f} попыток/с")
+        self.stdout.write(
+            "Задержка, мс: "
+            f"p50={statistics.median(latencies) * 1000:.1f} "
+            f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} "
+            f"max={latencies[-1] * 1000:.1f}"
+        )
+        for outcome, count in outcomes.items():
+            self.stdout.write(f"  {outcome}: {count}")
+
+        if not options["keep"]:
+            self.delete_fixtures(schedule, clients)
+
+        if errors:
+            self.stderr.write(f"Первая ошибка из {len(errors)}:\n{errors[0]}")
+            raise CommandError(
+                f"Попыток, завершившихся ошибкой: {outcomes['error']}; "
+                "результат теста недостоверен."
+            )
+        expected = min(capacity, total)
+        if confirmed_in_db != expected or outcomes["confirmed"] != expected:
+            raise CommandError(
+                f"Нарушена корректность: подтверждённых записей в БД — {confirmed_in_db}, "
+                f"успешных бронирований — {outcomes['confirmed']}."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Подтверждённых записей на слоте: {expected}.")
+        )
+
+    def check_connections(self, threads):
+        """
+        Проверяет, что соединений PostgreSQL хватит на все потоки: иначе часть
+        попыток завершится ошибкой «too many clients» ещё до бронирования.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT current_setting('max_connections')::int"
+                " - current_setting('superuser_reserved_connections')::int"
+                " - (SELECT count(*) FROM pg_stat_activity WHERE backend_type = "
+                "'client backend')"
+            )
+            (available,) = cursor.fetchone()
+        if threads > available:
+            raise CommandError(
+                f"Свободных соединений PostgreSQL: {available}, а потоков: {threads}. "
+                "Уменьшите --threads или увеличьте max_connections."
+            )
+
+    def create_fixtures(self, clients_count, capacity):
+        suffix = uuid.uuid4().hex[:8]
+        trainer_user = User.objects.create_user(
+            username=f"bench-trainer-{suffix}",
+            email=f"bench-trainer-{suffix}@example.com",
+            role=Role.TRAINER,
+        )
+        club = FitnessClub.objects.create(name=f"Benchmark {suffix}")
+        trainer = Trainer.objects.create(user=trainer_user)
+        trainer.clubs.add(club)
+
+        booking_date = datetime.now().date() + timedelta(days=7)
+        schedule = Schedule.objects.create(
+            trainer=trainer,
+            fitness_club=club,
+            day_of_week=DayOfWeek.values[booking_date.weekday()],
+            start_time=datetime.strptime("10:00", "%H:%M").time(),
+            end_time=datetime.strptime("11:00", "%H:%M").time(),
+            capacity=capacity,
+        )
+        clients = User.objects.bulk_create(
+            User(
+                username=f"bench-client-{suffix}-{i}",
+                email=f"bench-client-{suffix}-{i}@example.com",
+                role=Role.CLIENT,
+                password="!",
+            )
+            for i in range(clients_count)
+        )
+        return schedule, [client.id for client in clients], booking_date
+
+    def delete_fixtures(self, schedule, client_ids):
+        trainer_user_id = schedule.trainer.user_id
+        club = schedule.fitness_club
+        User.objects.filter(id__in=client_ids).delete()
+        User.objects.filter(id=trainer_user_id).delete()
+        club.delete()
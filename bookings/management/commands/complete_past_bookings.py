@@ -0,0 +1,127 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from bookings.models import (
+    ACTIVE_BOOKING_STATUSES,
+    Booking,
+    BookingStatus,
+    record_booking_changes,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Переводит прошедшие записи (ожидающие и подтверждённые) в статус "
+        "«Завершено» пакетами ограниченного размера. Каждый пакет — отдельная "
+        "короткая транзакция, строки, занятые другими транзакциями, пропускаются, "
+        "поэтому команда не блокирует работу API. Прерванный запуск можно просто "
+        "повторить: уже завершённые записи под условие не попадают."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            type=date.fromisoformat,
+            default=None,
+            help="Завершать записи с датой строго раньше указанной (ГГГГ-ММ-ДД). "
+            "По умолчанию — сегодня.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Число записей, обновляемых одной транзакцией.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="Пауза между пакетами в секундах, чтобы снизить нагрузку на БД.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только подсчитать, сколько записей будет завершено.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size должен быть положительным.")
+        before = options["before"] or timezone.localdate()
+
+        pending = Booking.objects.filter(
+            booking_date__lt=before, status__in=ACTIVE_BOOKING_STATUSES
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"К завершению: {pending.count()} записей до {before}.")
+            return
+
+        completed = skipped = batches = 0
+        cursor = None
+        started = time.perf_counter()
+        while True:
+            done, locked, cursor = self.complete_batch(pending, cursor, batch_size)
+            if cursor is None:
+                break
+            batches += 1
+            completed += done
+            skipped += locked
+            self.stdout.write(
+                f"Пакет {batches}: завершено {done}, занято другими транзакциями "
+                f"{locked}; позиция {cursor[0]} #{cursor[1]}, всего {completed}"
+            )
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Завершено записей: {completed} за {elapsed:.1f} с ({batches} пакетов)."
+            )
+        )
+        if skipped:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Пропущено занятых записей: {skipped}; "
+                    "они будут завершены при следующем запуске."
+                )
+            )
+
+    def complete_batch(self, pending, cursor, batch_size):
+        """
+        Завершает очередной пакет записей после позиции ``cursor``
+        (пара ``(booking_date, id)``). Возвращает число обновлённых записей,
+        число пропущенных из-за блокировок и новую позицию (``None``, если
+        записей больше нет).
+        """
+        batch = pending.order_by("booking_date", "id")
+        if cursor is not None:
+            batch = batch.filter(
+                Q(booking_date__gt=cursor[0])
+                | Q(booking_date=cursor[0], id__gt=cursor[1])
+            )
+
+        with transaction.atomic():
+            candidates = list(batch.values_list("booking_date", "id")[:batch_size])
+            if not candidates:
+                return 0, 0, None
+            # Блокируем только свободные строки пакета: записи, которые прямо
+            # сейчас меняет API, остаются на следующий запуск.
+            bookings = list(
+                pending.filter(id__in=[pk for _, pk in candidates]).select_for_update(
+                    skip_locked=True
+                )
+            )
+            done = Booking.objects.filter(
+                id__in=[booking.id for booking in bookings]
+            ).update(status=BookingStatus.COMPLETED, updated_at=timezone.now())
+            for booking in bookings:
+                booking.status = BookingStatus.COMPLETED
+            record_booking_changes(bookings)
+        return done, len(candidates) - len(bookings), candidates[-1]
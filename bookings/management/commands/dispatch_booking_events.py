@@ -0,0 +1,61 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.events import (
+    acquire_dispatcher_lock,
+    dispatch_batch,
+    release_dispatcher_lock,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Диспетчер outbox: доставляет события записей подписчикам пакетами "
+        "в порядке их появления, повторяя неудачные доставки с нарастающей паузой. "
+        "Одновременно может работать только один диспетчер."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.BOOKING_EVENTS_BATCH_SIZE,
+            help="Максимальное число событий в одной доставке.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Пауза в секундах, когда доставлять нечего.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Доставить накопившиеся события и завершиться.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size должен быть положительным.")
+        if not acquire_dispatcher_lock():
+            raise CommandError("Диспетчер событий уже запущен в другом процессе.")
+
+        delivered = 0
+        try:
+            while True:
+                count = dispatch_batch(options["batch_size"])
+                if count:
+                    delivered += count
+                    self.stdout.write(f"Доставлено событий: {count}, всего {delivered}")
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            release_dispatcher_lock()
+
+        self.stdout.write(self.style.SUCCESS(f"Доставлено событий: {delivered}."))
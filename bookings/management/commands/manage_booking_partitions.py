@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from bookings.partitions import add_months, detach_partitions, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Обслуживание помесячных секций таблицы записей: создаёт секции на "
+        "ближайшие месяцы (и разносит по секциям записи из секции по умолчанию), "
+        "а при указании --retain-months отсоединяет секции старых месяцев. "
+        "Рассчитана на регулярный запуск по расписанию (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.BOOKING_PARTITION_MONTHS_AHEAD,
+            help="На сколько месяцев вперёд создавать секции.",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=None,
+            help="Сколько прошедших месяцев хранить в таблице; секции более "
+            "старых месяцев отсоединяются.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Удалять отсоединённые секции вместо переименования в архивные таблицы.",
+        )
+
+    def handle(self, *args, **options):
+        if options["ahead"] < 0:
+            raise CommandError("--ahead не может быть отрицательным.")
+
+        for name in ensure_partitions(options["ahead"]):
+            self.stdout.write(f"Создана секция {name}")
+
+        retain = options["retain_months"]
+        if retain is None:
+            return
+        if retain < 1:
+            raise CommandError("--retain-months должен быть положительным.")
+
+        cutoff = add_months(timezone.localdate().replace(day=1), -retain)
+        for name in detach_partitions(cutoff, drop=options["drop"]):
+            action = "удалена" if options["drop"] else "отсоединена и переименована"
+            self.stdout.write(f"Секция {name} {action}")
+        self.stdout.write(
+            self.style.SUCCESS(f"В таблице хранятся записи начиная с {cutoff}.")
+        )
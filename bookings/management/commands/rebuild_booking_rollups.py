@@ -0,0 +1,36 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.models import BookingRollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает сводку записей по статусам (BookingRollup) по таблице "
+        "записей — целиком или за период. Нужна для первичного заполнения и "
+        "для исправления сводки после изменений записей в обход приложения. "
+        "На время пересчёта изменения записей ждут его окончания."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date-from",
+            type=date.fromisoformat,
+            default=None,
+            help="Первый день пересчитываемого периода (ГГГГ-ММ-ДД).",
+        )
+        parser.add_argument(
+            "--date-to",
+            type=date.fromisoformat,
+            default=None,
+            help="Последний день пересчитываемого периода (ГГГГ-ММ-ДД).",
+        )
+
+    def handle(self, *args, **options):
+        date_from, date_to = options["date_from"], options["date_to"]
+        if date_from and date_to and date_from > date_to:
+            raise CommandError("--date-from должна быть не позже --date-to.")
+
+        rows = BookingRollup.objects.rebuild(date_from, date_to)
+        self.stdout.write(self.style.SUCCESS(f"Пересчитано строк сводки: {rows}."))
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:07
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0002_booking_unique_confirmed_slot"),
+        ("schedule", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookingSeries",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "start_date",
+                    models.DateField(
+                        help_text="Дата первого занятия серии. Должна совпадать с днём недели расписания.",
+                        verbose_name="Дата первого занятия",
+                    ),
+                ),
+                (
+                    "booking_time",
+                    models.TimeField(
+                        help_text="Время занятий серии. Должно находиться в пределах времени расписания.",
+                        verbose_name="Время записи",
+                    ),
+                ),
+                (
+                    "weeks",
+                    models.PositiveSmallIntegerField(
+                        help_text="Количество еженедельных занятий в серии.",
+                        validators=[
+                            django.core.validators.MinValueValidator(
+                                1,
+                                message="Серия должна содержать хотя бы одно занятие.",
+                            ),
+                            django.core.validators.MaxValueValidator(
+                                52, message="Серия не может быть длиннее 52 недель."
+                            ),
+                        ],
+                        verbose_name="Количество недель",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания серии"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Дата последнего обновления серии"
+                    ),
+                ),
+                (
+                    "client",
+                    models.ForeignKey(
+                        help_text="Клиент, для которого создана серия записей.",
+                        limit_choices_to={"role": "client"},
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booking_series",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Клиент",
+                    ),
+                ),
+                (
+                    "schedule",
+                    models.ForeignKey(
+                        help_text="Слот расписания, на который производится запись.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booking_series",
+                        to="schedule.schedule",
+                        verbose_name="Расписание",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Серия записей",
+                "verbose_name_plural": "Серии записей",
+                "ordering": ["-start_date", "-booking_time"],
+            },
+        ),
+        migrations.AddField(
+            model_name="booking",
+            name="series",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Еженедельная серия, в рамках которой создана запись.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="bookings",
+                to="bookings.bookingseries",
+                verbose_name="Серия",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookingseries",
+            index=models.Index(
+                fields=["client", "start_date"], name="bookings_bo_client__bb0332_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0003_booking_series"),
+        ("schedule", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="booking",
+            name="bookings_bo_client__a1774a_idx",
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["client", "booking_date", "booking_time", "id"],
+                name="bookings_bo_client__a1eaf1_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["booking_date", "booking_time", "id"],
+                name="bookings_bo_booking_5bc7c4_idx",
+            ),
+        ),
+    ]
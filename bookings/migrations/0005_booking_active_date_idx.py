@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:14
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицу и не может
+    # выполняться внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ("bookings", "0004_booking_keyset_indexes"),
+        ("schedule", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("status__in", ("pending", "confirmed"))),
+                fields=["booking_date", "id"],
+                name="booking_active_date_idx",
+            ),
+        ),
+    ]
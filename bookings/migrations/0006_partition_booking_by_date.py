@@ -0,0 +1,150 @@
+from datetime import date
+
+from django.db import migrations
+from django.utils import timezone
+
+TABLE = "bookings_booking"
+LEGACY_TABLE = "bookings_booking_legacy"
+SEQUENCE = "bookings_booking_id_seq"
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_bookings(apps, schema_editor):
+    """
+    Переносит записи в таблицу, секционированную по ``booking_date``.
+
+    Первичный ключ секционированной таблицы обязан включать ключ секционирования,
+    поэтому в БД он становится ``(id, booking_date)``; уникальность ``id``
+    по-прежнему обеспечивает последовательность. Столбец identity заменяется
+    обычной последовательностью: секционированные таблицы PostgreSQL до 17-й
+    версии identity не поддерживают. Индексы и ограничения воссоздаются с
+    прежними именами, так что состояние моделей Django не меняется.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass ORDER BY conname",
+            [TABLE],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = %s::regclass AND NOT EXISTS "
+            "(SELECT 1 FROM pg_constraint WHERE conindid = i.indexrelid) "
+            "ORDER BY c.relname",
+            [TABLE],
+        )
+        indexes = cursor.fetchall()
+
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}")
+        for name, _, _ in constraints:
+            cursor.execute(f'ALTER TABLE {LEGACY_TABLE} DROP CONSTRAINT "{name}"')
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (booking_date)"
+        )
+        cursor.execute(f"CREATE SEQUENCE {SEQUENCE}_new AS bigint OWNED BY {TABLE}.id")
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}_new')"
+        )
+
+        # Секции на все месяцы с записями и на год вперёд; всё, что окажется
+        # вне этих диапазонов, попадёт в секцию по умолчанию.
+        cursor.execute(
+            f"SELECT min(booking_date), max(booking_date) FROM {LEGACY_TABLE}"
+        )
+        first, last = cursor.fetchone()
+        current = timezone.localdate().replace(day=1)
+        month = min(first.replace(day=1), current) if first else current
+        end = add_months(max(last.replace(day=1), current) if last else current, 12)
+        while month <= end:
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{month:%Y%m} PARTITION OF {TABLE} "
+                "FOR VALUES FROM (%s) TO (%s)",
+                [month, add_months(month, 1)],
+            )
+            month = add_months(month, 1)
+        cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+        # Данные копируются до создания индексов и ограничений: так быстрее.
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {LEGACY_TABLE}")
+        cursor.execute(
+            f"SELECT setval('{SEQUENCE}_new', "
+            f"(SELECT COALESCE(max(id), 0) + 1 FROM {TABLE}), false)"
+        )
+        for name, kind, definition in constraints:
+            if kind == "p":
+                definition = "PRIMARY KEY (id, booking_date)"
+            cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT "{name}" {definition}')
+        for _, definition in indexes:
+            cursor.execute(definition)
+
+        cursor.execute(f"DROP TABLE {LEGACY_TABLE}")
+        cursor.execute(f"ALTER SEQUENCE {SEQUENCE}_new RENAME TO {SEQUENCE}")
+
+
+def unpartition_bookings(apps, schema_editor):
+    """
+    Возвращает записи в обычную таблицу с первичным ключом ``id`` и столбцом
+    identity. Секции, отсоединённые ``detach_partitions``, остаются отдельными
+    таблицами.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass ORDER BY conname",
+            [TABLE],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = %s::regclass AND NOT EXISTS "
+            "(SELECT 1 FROM pg_constraint WHERE conindid = i.indexrelid) "
+            "ORDER BY c.relname",
+            [TABLE],
+        )
+        indexes = cursor.fetchall()
+
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}")
+        cursor.execute(f"ALTER SEQUENCE {SEQUENCE} RENAME TO {SEQUENCE}_old")
+        cursor.execute(f"CREATE TABLE {TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS)")
+        cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id DROP DEFAULT")
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY"
+        )
+
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {LEGACY_TABLE}")
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f"(SELECT COALESCE(max(id), 0) + 1 FROM {TABLE}), false)",
+            [TABLE],
+        )
+        # Секции удаляются вместе с таблицей, а с ними — имена индексов
+        # и ограничений, которые воссоздаются на обычной таблице.
+        cursor.execute(f"DROP TABLE {LEGACY_TABLE}")
+        for name, kind, definition in constraints:
+            if kind == "p":
+                definition = "PRIMARY KEY (id)"
+            cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT "{name}" {definition}')
+        for _, definition in indexes:
+            cursor.execute(definition.replace(" ON ONLY ", " ON ", 1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0005_booking_active_date_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_bookings, unpartition_bookings),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0006_partition_booking_by_date"),
+        ("schedule", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WaitlistEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "booking_date",
+                    models.DateField(
+                        help_text="Дата занятия, на которое клиент ожидает место.",
+                        verbose_name="Дата записи",
+                    ),
+                ),
+                (
+                    "booking_time",
+                    models.TimeField(
+                        help_text="Время занятия, на которое клиент ожидает место.",
+                        verbose_name="Время записи",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата постановки в очередь"
+                    ),
+                ),
+                (
+                    "client",
+                    models.ForeignKey(
+                        help_text="Клиент, ожидающий освобождения слота.",
+                        limit_choices_to={"role": "client"},
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist_entries",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Клиент",
+                    ),
+                ),
+                (
+                    "schedule",
+                    models.ForeignKey(
+                        help_text="Слот расписания, освобождения которого ожидает клиент.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist_entries",
+                        to="schedule.schedule",
+                        verbose_name="Расписание",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Место в листе ожидания",
+                "verbose_name_plural": "Лист ожидания",
+                "ordering": ["booking_date", "booking_time", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["schedule", "booking_date", "booking_time", "id"],
+                        name="bookings_wa_schedul_21c275_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("client", "schedule", "booking_date", "booking_time"),
+                        name="unique_waitlist_entry",
+                    )
+                ],
+            },
+        ),
+    ]
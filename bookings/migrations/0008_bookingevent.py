@@ -0,0 +1,113 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:22
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0007_waitlistentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookingEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "booking_id",
+                    models.BigIntegerField(
+                        help_text="Внешнего ключа нет: таблица записей секционирована.",
+                        verbose_name="ID записи",
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("created", "Запись создана"),
+                            ("updated", "Запись изменена"),
+                            ("status_changed", "Статус записи изменён"),
+                            ("cancelled", "Запись отменена"),
+                            ("deleted", "Запись удалена"),
+                        ],
+                        max_length=20,
+                        verbose_name="Тип события",
+                    ),
+                ),
+                (
+                    "payload",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        verbose_name="Состояние записи после изменения",
+                    ),
+                ),
+                (
+                    "txid",
+                    models.BigIntegerField(
+                        db_default=models.Func(
+                            function="txid_current",
+                            output_field=models.BigIntegerField(),
+                        ),
+                        editable=False,
+                        verbose_name="ID транзакции",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата события"
+                    ),
+                ),
+                (
+                    "dispatched_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Дата доставки"
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Число попыток доставки"
+                    ),
+                ),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Следующая попытка доставки"
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(
+                        blank=True, verbose_name="Последняя ошибка доставки"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Событие записи",
+                "verbose_name_plural": "События записей",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["booking_id", "id"],
+                        name="bookings_bo_booking_fa888e_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(("dispatched_at__isnull", True)),
+                        fields=["id"],
+                        name="booking_event_pending_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_booking_rollups(apps, schema_editor):
+    # Первичное заполнение сводки по уже существующим записям.
+    schema_editor.execute(
+        """
+        INSERT INTO bookings_bookingrollup
+            (schedule_id, trainer_id, fitness_club_id, date, status, count)
+        SELECT b.schedule_id, s.trainer_id, s.fitness_club_id, b.booking_date,
+            b.status, count(*)
+        FROM bookings_booking b
+        JOIN schedule_schedule s ON s.id = b.schedule_id
+        GROUP BY b.schedule_id, s.trainer_id, s.fitness_club_id, b.booking_date,
+            b.status
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0008_bookingevent"),
+        ("schedule", "0001_initial"),
+        ("trainers", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookingRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Ожидает подтверждения"),
+                            ("confirmed", "Подтверждено"),
+                            ("cancelled", "Отменено"),
+                            ("completed", "Завершено"),
+                        ],
+                        max_length=15,
+                        verbose_name="Статус записи",
+                    ),
+                ),
+                ("count", models.IntegerField(default=0, verbose_name="Число записей")),
+                (
+                    "fitness_club",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booking_rollups",
+                        to="trainers.fitnessclub",
+                        verbose_name="Фитнес-клуб",
+                    ),
+                ),
+                (
+                    "schedule",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booking_rollups",
+                        to="schedule.schedule",
+                        verbose_name="Расписание",
+                    ),
+                ),
+                (
+                    "trainer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booking_rollups",
+                        to="trainers.trainer",
+                        verbose_name="Тренер",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Сводка записей",
+                "verbose_name_plural": "Сводки записей",
+                "ordering": ["date", "schedule"],
+                "indexes": [
+                    models.Index(fields=["date"], name="bookings_bo_date_eb6754_idx"),
+                    models.Index(
+                        fields=["trainer", "date"],
+                        name="bookings_bo_trainer_5a5513_idx",
+                    ),
+                    models.Index(
+                        fields=["fitness_club", "date"],
+                        name="bookings_bo_fitness_522e64_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("schedule", "date", "status"),
+                        name="unique_booking_rollup",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_booking_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_slot_occupancy(apps, schema_editor):
+    # Счётчики по уже существующим подтверждённым записям.
+    schema_editor.execute(
+        """
+        INSERT INTO bookings_slotoccupancy
+            (schedule_id, booking_date, booking_time, confirmed)
+        SELECT schedule_id, booking_date, booking_time, count(*)
+        FROM bookings_booking
+        WHERE status = 'confirmed'
+        GROUP BY schedule_id, booking_date, booking_time
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0009_bookingrollup"),
+        ("schedule", "0002_schedule_capacity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlotOccupancy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("booking_date", models.DateField(verbose_name="Дата записи")),
+                ("booking_time", models.TimeField(verbose_name="Время записи")),
+                (
+                    "confirmed",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Подтверждённых записей"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Занятость слота",
+                "verbose_name_plural": "Занятость слотов",
+                "ordering": ["booking_date", "booking_time", "schedule"],
+            },
+        ),
+        migrations.AddField(
+            model_name="slotoccupancy",
+            name="schedule",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="slot_occupancy",
+                to="schedule.schedule",
+                verbose_name="Расписание",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="slotoccupancy",
+            constraint=models.UniqueConstraint(
+                fields=("schedule", "booking_date", "booking_time"),
+                name="unique_slot_occupancy",
+            ),
+        ),
+        migrations.RunPython(fill_slot_occupancy, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name="booking",
+            name="unique_confirmed_booking_slot",
+        ),
+    ]
@@ -1,9 +1,20 @@
-from django.db import models
+from collections import Counter
+from datetime import timedelta
+
+from django.core.validators import MinValueValidator, MaxValueValidator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Func, Q
+from django.db.models.expressions import RawSQL
 from users.models import User, Role
-from schedule.models import Schedule, DayOfWeek
+from schedule.models import Schedule, ScheduleException
+from trainers.models import FitnessClub, Trainer
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+from .exceptions import SlotAlreadyTaken
+from .signals import bookings_changed
+
 
 class BookingStatus(models.TextChoices):
     PENDING = "pending", "Ожидает подтверждения"
@@ -12,9 +23,94 @@ class BookingStatus(models.TextChoices):
     COMPLETED = "completed", "Завершено"
 
 
+class BookingEventType(models.TextChoices):
+    CREATED = "created", "Запись создана"
+    UPDATED = "updated", "Запись изменена"
+    STATUS_CHANGED = "status_changed", "Статус записи изменён"
+    CANCELLED = "cancelled", "Запись отменена"
+    DELETED = "deleted", "Запись удалена"
+
+
+ACTIVE_BOOKING_STATUSES = (BookingStatus.PENDING, BookingStatus.CONFIRMED)
+
+MAX_SERIES_WEEKS = 52
+
+
+class BookingSeries(models.Model):
+    """
+    Еженедельная серия записей: один и тот же слот расписания на несколько
+    недель подряд. Каждое занятие серии хранится отдельной записью Booking.
+    """
+
+    client = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        limit_choices_to={"role": Role.CLIENT},
+        related_name="booking_series",
+        verbose_name="Клиент",
+        help_text="Клиент, для которого создана серия записей.",
+    )
+    schedule = models.ForeignKey(
+        Schedule,
+        on_delete=models.CASCADE,
+        related_name="booking_series",
+        verbose_name="Расписание",
+        help_text="Слот расписания, на который производится запись.",
+    )
+    start_date = models.DateField(
+        verbose_name="Дата первого занятия",
+        help_text="Дата первого занятия серии. Должна совпадать с днём недели расписания.",
+    )
+    booking_time = models.TimeField(
+        verbose_name="Время записи",
+        help_text="Время занятий серии. Должно находиться в пределах времени расписания.",
+    )
+    weeks = models.PositiveSmallIntegerField(
+        verbose_name="Количество недель",
+        help_text="Количество еженедельных занятий в серии.",
+        validators=[
+            MinValueValidator(
+                1, message="Серия должна содержать хотя бы одно занятие."
+            ),
+            MaxValueValidator(
+                MAX_SERIES_WEEKS,
+                message=f"Серия не может быть длиннее {MAX_SERIES_WEEKS} недель.",
+            ),
+        ],
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Дата создания серии"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name="Дата последнего обновления серии"
+    )
+
+    class Meta:
+        verbose_name = "Серия записей"
+        verbose_name_plural = "Серии записей"
+        ordering = ["-start_date", "-booking_time"]
+        indexes = [
+            models.Index(fields=["client", "start_date"]),
+        ]
+
+    def __str__(self):
+        return (
+            f"Серия {self.client.username}: {self.schedule.get_day_of_week_display()} "
+            f"{self.booking_time.strftime('%H:%M')} с {self.start_date}, {self.weeks} нед."
+        )
+
+    @property
+    def dates(self):
+        return [self.start_date + timedelta(weeks=week) for week in range(self.weeks)]
+
+
 class Booking(models.Model):
     """
     Модель для записи клиентов на тренировки.
+
+    Таблица секционирована по месяцам ``booking_date`` (см. ``partitions.py``),
+    поэтому первичный ключ в БД — ``(id, booking_date)``, а внешние ключи
+    на записи из других таблиц не поддерживаются.
     """
 
     client = models.ForeignKey(
@@ -32,6 +128,15 @@ class Booking(models.Model):
         verbose_name="Расписание",
         help_text="Слот расписания, на который производится запись.",
     )
+    series = models.ForeignKey(
+        BookingSeries,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="bookings",
+        verbose_name="Серия",
+        help_text="Еженедельная серия, в рамках которой создана запись.",
+    )
     booking_date = models.DateField(
         verbose_name="Дата записи",
         help_text="Конкретная дата, на которую производится запись.",
@@ -60,9 +165,17 @@ class Booking(models.Model):
         unique_together = ("client", "schedule", "booking_date", "booking_time")
         ordering = ["-booking_date", "-booking_time"]
         indexes = [
-            models.Index(fields=["client", "booking_date"]),
+            models.Index(fields=["client", "booking_date", "booking_time", "id"]),
+            models.Index(fields=["booking_date", "booking_time", "id"]),
             models.Index(fields=["schedule", "booking_date", "booking_time"]),
             models.Index(fields=["status"]),
+            # Активные записи для автозавершения: индекс покрывает только их,
+            # поэтому не растёт вместе с историей.
+            models.Index(
+                fields=["booking_date", "id"],
+                condition=Q(status__in=ACTIVE_BOOKING_STATUSES),
+                name="booking_active_date_idx",
+            ),
         ]
 
     def __str__(self):
@@ -72,9 +185,91 @@ class Booking(models.Model):
             f"Статус: {self.get_status_display()}"
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Состояние на момент загрузки: по нему определяются тип события
+        # и ячейка сводки, из которой запись уходит при сохранении.
+        instance._loaded_state = (
+            instance.__dict__.get("schedule_id"),
+            instance.__dict__.get("booking_date"),
+            instance.__dict__.get("booking_time"),
+            instance.__dict__.get("status"),
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Событие, сводка и счётчик занятости слота меняются в той же
+        # транзакции, что и сама запись.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            record_booking_changes([self])
+
+    @property
+    def state(self):
+        return self.schedule_id, self.booking_date, self.booking_time, self.status
+
+    @property
+    def loaded_state(self):
+        return getattr(self, "_loaded_state", None)
+
+    @property
+    def loaded_status(self):
+        return self.loaded_state[3] if self.loaded_state else None
+
+    def remember_state(self):
+        self._loaded_state = self.state
+
+    def event_type(self):
+        """
+        Тип события для сохраняемого состояния записи по сравнению с загруженным.
+        """
+        previous = self.loaded_status
+        if previous is None:
+            return BookingEventType.CREATED
+        if previous == self.status:
+            return BookingEventType.UPDATED
+        if self.status == BookingStatus.CANCELLED:
+            return BookingEventType.CANCELLED
+        return BookingEventType.STATUS_CHANGED
+
+    def event_payload(self):
+        return {
+            "id": self.pk,
+            "client_id": self.client_id,
+            "schedule_id": self.schedule_id,
+            "series_id": self.series_id,
+            "booking_date": self.booking_date,
+            "booking_time": self.booking_time,
+            "status": self.status,
+            "previous_status": self.loaded_status,
+        }
+
     def clean(self):
         super().clean()
+        self.clean_slot()
+
+        if self.status != BookingStatus.CANCELLED and self.is_cancelled():
+            raise ValidationError(
+                {"booking_date": "Занятие в этот день отменено."},
+                code="class_cancelled",
+            )
 
+        if self.is_slot_full():
+            raise ValidationError(
+                {
+                    "schedule": ValidationError(
+                        "Этот слот расписания уже занят другой записью.",
+                        code="slot_already_taken",
+                    )
+                }
+            )
+
+    def clean_slot(self):
+        """
+        Проверки записи, не требующие запросов к базе данных: роль клиента,
+        дата в будущем, совпадение дня недели и времени с расписанием.
+        """
         if self.client and self.client.role != Role.CLIENT:
             raise ValidationError(
                 {
@@ -89,8 +284,7 @@ class Booking(models.Model):
                 code="past_date",
             )
 
-        day_of_week_int = list(DayOfWeek.values).index(self.schedule.day_of_week)
-        if self.booking_date.weekday() != day_of_week_int:
+        if self.booking_date.weekday() != self.schedule.weekday:
             raise ValidationError(
                 {
                     "booking_date": f'Дата записи ({self.booking_date.strftime("%A")}) не соответствует дню недели '
@@ -111,17 +305,487 @@ class Booking(models.Model):
                 code="time_mismatch",
             )
 
-        if (
-            Booking.objects.filter(
-                schedule=self.schedule,
+    def is_cancelled(self):
+        """
+        Отменено ли занятие в день записи (исключение из расписания).
+        """
+        return ScheduleException.objects.is_cancelled(self.schedule, self.booking_date)
+
+    def is_slot_full(self):
+        """
+        Проверяет, заполнен ли слот записи подтверждёнными записями других
+        клиентов. Читается одна строка счётчика ``SlotOccupancy``.
+        """
+        confirmed = (
+            SlotOccupancy.objects.filter(
+                schedule_id=self.schedule_id,
                 booking_date=self.booking_date,
                 booking_time=self.booking_time,
-                status=BookingStatus.CONFIRMED,
             )
-            .exclude(pk=self.pk)
-            .exists()
+            .values_list("confirmed", flat=True)
+            .first()
+            or 0
+        )
+        previous = self.loaded_state
+        if (
+            previous
+            and previous[3] == BookingStatus.CONFIRMED
+            and previous[:3] == self.state[:3]
         ):
-            raise ValidationError(
-                {"schedule": "Этот слот расписания уже занят другой записью."},
-                code="slot_already_taken",
+            # Собственная подтверждённая запись уже учтена в счётчике.
+            confirmed -= 1
+        return confirmed >= self.schedule.capacity
+
+
+class SlotOccupancyManager(models.Manager):
+    def full(self):
+        """
+        Слоты, в которых подтверждённых записей не меньше вместимости расписания.
+        """
+        return self.filter(confirmed__gte=F("schedule__capacity"))
+
+    def apply(self, bookings, deleted=False):
+        """
+        Переносит подтверждённые записи между счётчиками слотов: из слота,
+        в котором запись была подтверждена при загрузке, в слот её текущего
+        состояния (для удалённых — только убирает).
+
+        Освобождение — один ``UPDATE``, занятие — условный
+        ``INSERT ... ON CONFLICT DO UPDATE``: счётчик растёт, только если
+        остаётся в пределах вместимости, а блокировка строки счётчика
+        сериализует конкурирующие подтверждения одного слота. Если какой-либо
+        слот переполнился бы, выбрасывается ``SlotAlreadyTaken`` и транзакция
+        записи откатывается.
+        Должен вызываться в транзакции, изменяющей сами записи.
+        """
+        deltas = Counter()
+        for booking in bookings:
+            previous = booking.loaded_state
+            if previous and previous[3] == BookingStatus.CONFIRMED:
+                deltas[previous[:3]] -= 1
+            if not deleted and booking.status == BookingStatus.CONFIRMED:
+                deltas[booking.state[:3]] += 1
+
+        released = sorted(key for key, delta in deltas.items() if delta < 0)
+        claimed = sorted(key for key, delta in deltas.items() if delta > 0)
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        schedule_table = connection.ops.quote_name(Schedule._meta.db_table)
+        with connection.cursor() as cursor:
+            if released:
+                cursor.execute(
+                    f"""
+                    UPDATE {table} o
+                    SET confirmed = GREATEST(o.confirmed + d.delta, 0)
+                    FROM unnest(%s::bigint[], %s::date[], %s::time[], %s::integer[])
+                        AS d(schedule_id, booking_date, booking_time, delta)
+                    WHERE o.schedule_id = d.schedule_id
+                        AND o.booking_date = d.booking_date
+                        AND o.booking_time = d.booking_time
+                    """,
+                    self.slot_arrays(released, deltas),
+                )
+            if not claimed:
+                return
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (schedule_id, booking_date, booking_time, confirmed)
+                SELECT d.schedule_id, d.booking_date, d.booking_time, d.delta
+                FROM unnest(%s::bigint[], %s::date[], %s::time[], %s::integer[])
+                    WITH ORDINALITY AS d(schedule_id, booking_date, booking_time, delta, n)
+                JOIN {schedule_table} s ON s.id = d.schedule_id
+                WHERE d.delta <= s.capacity
+                ORDER BY d.n
+                ON CONFLICT (schedule_id, booking_date, booking_time)
+                DO UPDATE SET confirmed = {table}.confirmed + EXCLUDED.confirmed
+                WHERE {table}.confirmed + EXCLUDED.confirmed <= (
+                    SELECT capacity FROM {schedule_table}
+                    WHERE id = {table}.schedule_id
+                )
+                RETURNING schedule_id, booking_date, booking_time
+                """,
+                self.slot_arrays(claimed, deltas),
             )
+            applied = set(cursor.fetchall())
+        if len(applied) < len(claimed):
+            raise SlotAlreadyTaken()
+
+    @staticmethod
+    def slot_arrays(keys, deltas):
+        return [
+            [key[0] for key in keys],
+            [key[1] for key in keys],
+            [key[2] for key in keys],
+            [deltas[key] for key in keys],
+        ]
+
+
+class SlotOccupancy(models.Model):
+    """
+    Счётчик подтверждённых записей на слот расписания.
+
+    Ведётся в транзакциях, изменяющих записи (см. ``record_booking_changes``),
+    и не превышает ``Schedule.capacity``: проверка заполненности слота —
+    чтение одной строки, а не подсчёт записей. Таблица записей секционирована,
+    поэтому внешнего ключа на записи нет; строки без подтверждённых записей
+    остаются со значением 0.
+    """
+
+    schedule = models.ForeignKey(
+        Schedule,
+        on_delete=models.CASCADE,
+        related_name="slot_occupancy",
+        verbose_name="Расписание",
+    )
+    booking_date = models.DateField(verbose_name="Дата записи")
+    booking_time = models.TimeField(verbose_name="Время записи")
+    confirmed = models.PositiveIntegerField(
+        default=0, verbose_name="Подтверждённых записей"
+    )
+
+    objects = SlotOccupancyManager()
+
+    class Meta:
+        verbose_name = "Занятость слота"
+        verbose_name_plural = "Занятость слотов"
+        ordering = ["booking_date", "booking_time", "schedule"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["schedule", "booking_date", "booking_time"],
+                name="unique_slot_occupancy",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"Расписание #{self.schedule_id} {self.booking_date} "
+            f"{self.booking_time.strftime('%H:%M')}: {self.confirmed}"
+        )
+
+
+class WaitlistEntry(models.Model):
+    """
+    Место клиента в очереди ожидания на занятый слот расписания.
+
+    Очередь слота упорядочена по ``id``: первым подтверждается клиент,
+    вставший в очередь раньше. Индекс ``(schedule, booking_date, booking_time, id)``
+    позволяет получить голову очереди без просмотра всей очереди.
+    """
+
+    client = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        limit_choices_to={"role": Role.CLIENT},
+        related_name="waitlist_entries",
+        verbose_name="Клиент",
+        help_text="Клиент, ожидающий освобождения слота.",
+    )
+    schedule = models.ForeignKey(
+        Schedule,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries",
+        verbose_name="Расписание",
+        help_text="Слот расписания, освобождения которого ожидает клиент.",
+    )
+    booking_date = models.DateField(
+        verbose_name="Дата записи",
+        help_text="Дата занятия, на которое клиент ожидает место.",
+    )
+    booking_time = models.TimeField(
+        verbose_name="Время записи",
+        help_text="Время занятия, на которое клиент ожидает место.",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Дата постановки в очередь"
+    )
+
+    class Meta:
+        verbose_name = "Место в листе ожидания"
+        verbose_name_plural = "Лист ожидания"
+        ordering = ["booking_date", "booking_time", "id"]
+        indexes = [
+            models.Index(fields=["schedule", "booking_date", "booking_time", "id"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["client", "schedule", "booking_date", "booking_time"],
+                name="unique_waitlist_entry",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.client.username} ожидает {self.booking_date} "
+            f"{self.booking_time.strftime('%H:%M')} (расписание #{self.schedule_id})"
+        )
+
+
+class BookingEventManager(models.Manager):
+    def visible(self):
+        """
+        События, которые уже можно отдавать в ленту.
+
+        ``id`` выделяется при вставке, а видимым событие становится при коммите,
+        поэтому событие с меньшим ``id`` может появиться позже большего.
+        Чтобы потребитель, запомнивший последний ``id``, ничего не пропустил,
+        событие отдаётся только после завершения всех транзакций, начатых
+        раньше его собственной (граница ``xmin`` текущего снимка).
+        """
+        return self.filter(
+            Q(txid__lt=RawSQL("txid_snapshot_xmin(txid_current_snapshot())", []))
+            | Q(txid=RawSQL("txid_current_if_assigned()", []))
+        )
+
+    def record(self, bookings, event_type=None):
+        """
+        Записывает в outbox события по записям одним INSERT. Тип события, если
+        не указан явно, определяется по изменению статуса каждой записи.
+        Должен вызываться в транзакции, изменяющей сами записи.
+        """
+        return self.bulk_create(
+            self.model(
+                booking_id=booking.pk,
+                event_type=event_type or booking.event_type(),
+                payload=booking.event_payload(),
+            )
+            for booking in bookings
+        )
+
+
+class BookingEvent(models.Model):
+    """
+    Событие изменения записи (transactional outbox).
+
+    События пишутся в той же транзакции, что и изменение записи, поэтому
+    не теряются и не появляются для откатившихся изменений. Лента изменений
+    отдаёт события по возрастанию ``id``; ``txid`` — номер транзакции-автора,
+    по нему лента скрывает события, пока не завершились все более ранние
+    транзакции (см. ``visible()``). Рассылку подписчикам выполняет команда
+    ``dispatch_booking_events``.
+    """
+
+    booking_id = models.BigIntegerField(
+        verbose_name="ID записи",
+        help_text="Внешнего ключа нет: таблица записей секционирована.",
+    )
+    event_type = models.CharField(
+        max_length=20, choices=BookingEventType.choices, verbose_name="Тип события"
+    )
+    payload = models.JSONField(
+        encoder=DjangoJSONEncoder, verbose_name="Состояние записи после изменения"
+    )
+    txid = models.BigIntegerField(
+        db_default=Func(function="txid_current", output_field=models.BigIntegerField()),
+        editable=False,
+        verbose_name="ID транзакции",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата события")
+    dispatched_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Дата доставки"
+    )
+    attempts = models.PositiveIntegerField(
+        default=0, verbose_name="Число попыток доставки"
+    )
+    next_attempt_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Следующая попытка доставки"
+    )
+    last_error = models.TextField(blank=True, verbose_name="Последняя ошибка доставки")
+
+    objects = BookingEventManager()
+
+    class Meta:
+        verbose_name = "Событие записи"
+        verbose_name_plural = "События записей"
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["booking_id", "id"]),
+            # Очередь доставки: только недоставленные события.
+            models.Index(
+                fields=["id"],
+                condition=Q(dispatched_at__isnull=True),
+                name="booking_event_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.get_event_type_display()} (запись #{self.booking_id})"
+
+
+def rollup_key(state):
+    schedule_id, booking_date, _, status = state
+    return schedule_id, booking_date, status
+
+
+class BookingRollupManager(models.Manager):
+    def apply(self, bookings, deleted=False):
+        """
+        Переносит записи из ячеек сводки, в которых они учитывались при загрузке,
+        в ячейки их текущего состояния (для удалённых — только убирает).
+
+        Все изменения применяются одним ``INSERT ... ON CONFLICT DO UPDATE``
+        в порядке ключа, поэтому параллельные транзакции блокируют строки
+        сводки в одном порядке. Уменьшение не создаёт отсутствующих строк:
+        их уже нет, только если сводка удалена каскадом вместе с расписанием.
+        Должен вызываться в транзакции, изменяющей сами записи.
+        """
+        deltas = Counter()
+        for booking in bookings:
+            previous = booking.loaded_state
+            if previous and previous[0] is not None:
+                deltas[rollup_key(previous)] -= 1
+            if not deleted:
+                deltas[rollup_key(booking.state)] += 1
+
+        keys = sorted(key for key, delta in deltas.items() if delta)
+        if not keys:
+            return
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        schedule_table = connection.ops.quote_name(Schedule._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table}
+                    (schedule_id, trainer_id, fitness_club_id, date, status, count)
+                SELECT s.id, s.trainer_id, s.fitness_club_id, d.date, d.status, d.delta
+                FROM unnest(%s::bigint[], %s::date[], %s::varchar[], %s::integer[])
+                    WITH ORDINALITY AS d(schedule_id, date, status, delta, n)
+                JOIN {schedule_table} s ON s.id = d.schedule_id
+                WHERE d.delta > 0 OR EXISTS (
+                    SELECT 1 FROM {table} r
+                    WHERE r.schedule_id = d.schedule_id
+                        AND r.date = d.date AND r.status = d.status
+                )
+                ORDER BY d.n
+                ON CONFLICT (schedule_id, date, status)
+                DO UPDATE SET count = {table}.count + EXCLUDED.count
+                """,
+                [
+                    [key[0] for key in keys],
+                    [key[1] for key in keys],
+                    [key[2] for key in keys],
+                    [deltas[key] for key in keys],
+                ],
+            )
+
+    def rebuild(self, date_from=None, date_to=None):
+        """
+        Пересчитывает сводку по таблице записей (целиком или за период).
+
+        На время пересчёта сводка блокируется от записи: изменения записей,
+        начатые раньше, успевают примениться и попадают в снимок пересчёта,
+        а начатые позже ждут его окончания и применяются уже поверх
+        пересчитанных строк. Возвращает число строк сводки.
+        """
+        rollups = self.all()
+        bookings = Booking.objects.all()
+        if date_from:
+            rollups = rollups.filter(date__gte=date_from)
+            bookings = bookings.filter(booking_date__gte=date_from)
+        if date_to:
+            rollups = rollups.filter(date__lte=date_to)
+            bookings = bookings.filter(booking_date__lte=date_to)
+
+        with transaction.atomic():
+            table = connection.ops.quote_name(self.model._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+            rollups.delete()
+            rows = (
+                bookings.values(
+                    "schedule_id",
+                    "schedule__trainer_id",
+                    "schedule__fitness_club_id",
+                    "booking_date",
+                    "status",
+                )
+                .annotate(total=Count("id"))
+                .order_by()
+            )
+            return len(
+                self.bulk_create(
+                    self.model(
+                        schedule_id=row["schedule_id"],
+                        trainer_id=row["schedule__trainer_id"],
+                        fitness_club_id=row["schedule__fitness_club_id"],
+                        date=row["booking_date"],
+                        status=row["status"],
+                        count=row["total"],
+                    )
+                    for row in rows.iterator()
+                )
+            )
+
+
+class BookingRollup(models.Model):
+    """
+    Сводка записей: число записей в каждом статусе на занятие расписания за день.
+
+    Ведётся инкрементально в транзакциях, изменяющих записи
+    (см. ``record_booking_changes``), поэтому статистика читается из сводки
+    без группировки по таблице записей. Тренер и клуб копируются из
+    расписания, чтобы статистику по ним можно было получить из одной таблицы.
+    Полный пересчёт — команда ``rebuild_booking_rollups``.
+    """
+
+    schedule = models.ForeignKey(
+        Schedule,
+        on_delete=models.CASCADE,
+        related_name="booking_rollups",
+        verbose_name="Расписание",
+    )
+    trainer = models.ForeignKey(
+        Trainer,
+        on_delete=models.CASCADE,
+        related_name="booking_rollups",
+        verbose_name="Тренер",
+    )
+    fitness_club = models.ForeignKey(
+        FitnessClub,
+        on_delete=models.CASCADE,
+        related_name="booking_rollups",
+        verbose_name="Фитнес-клуб",
+    )
+    date = models.DateField(verbose_name="Дата")
+    status = models.CharField(
+        max_length=15, choices=BookingStatus.choices, verbose_name="Статус записи"
+    )
+    count = models.IntegerField(default=0, verbose_name="Число записей")
+
+    objects = BookingRollupManager()
+
+    class Meta:
+        verbose_name = "Сводка записей"
+        verbose_name_plural = "Сводки записей"
+        ordering = ["date", "schedule"]
+        indexes = [
+            models.Index(fields=["date"]),
+            models.Index(fields=["trainer", "date"]),
+            models.Index(fields=["fitness_club", "date"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["schedule", "date", "status"], name="unique_booking_rollup"
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.date} расписание #{self.schedule_id}: "
+            f"{self.get_status_display()} — {self.count}"
+        )
+
+
+def record_booking_changes(bookings, event_type=None):
+    """
+    Фиксирует изменения записей: занятость слотов (с проверкой вместимости),
+    события в outbox и перенос в сводке; затем отправляет ``bookings_changed``.
+    Должен вызываться в транзакции, изменяющей сами записи, — и для ``save``,
+    и для массовых ``bulk_create``/``update``/удаления.
+    """
+    bookings = list(bookings)
+    deleted = event_type == BookingEventType.DELETED
+    SlotOccupancy.objects.apply(bookings, deleted=deleted)
+    BookingEvent.objects.record(bookings, event_type)
+    BookingRollup.objects.apply(bookings, deleted=deleted)
+    bookings_changed.send(sender=Booking, bookings=bookings, event_type=event_type)
+    for booking in bookings:
+        booking.remember_state()
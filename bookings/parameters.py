@@ -20,3 +20,99 @@ status_param = OpenApiParameter(
     location=OpenApiParameter.QUERY,
     description="Фильтрация по статусу записи (например, 'pending', 'confirmed', 'cancelled').",
 )
+
+fitness_club_id_param = OpenApiParameter(
+    name="fitness_club_id",
+    type=int,
+    location=OpenApiParameter.QUERY,
+    required=True,
+    description="ID фитнес-клуба, для которого рассчитываются свободные слоты.",
+)
+
+trainer_id_param = OpenApiParameter(
+    name="trainer_id",
+    type=int,
+    location=OpenApiParameter.QUERY,
+    description="Ограничить расчёт расписаниями одного тренера.",
+)
+
+date_from_param = OpenApiParameter(
+    name="date_from",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description="Первый день периода (формат: ГГГГ-ММ-ДД). По умолчанию — сегодня.",
+)
+
+days_param = OpenApiParameter(
+    name="days",
+    type=int,
+    location=OpenApiParameter.QUERY,
+    description="Длина периода в днях (по умолчанию 7, максимум 31).",
+)
+
+after_param = OpenApiParameter(
+    name="after",
+    type=int,
+    location=OpenApiParameter.QUERY,
+    description="Вернуть события с ID больше указанного (последний обработанный потребителем).",
+)
+
+booking_id_param = OpenApiParameter(
+    name="booking_id",
+    type=int,
+    location=OpenApiParameter.QUERY,
+    description="Фильтрация по ID записи.",
+)
+
+event_type_param = OpenApiParameter(
+    name="event_type",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description="Фильтрация по типу события (например, 'created', 'cancelled').",
+)
+
+export_format_param = OpenApiParameter(
+    name="export_format",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    enum=["ndjson", "csv"],
+    description="Формат выгрузки: 'ndjson' (по умолчанию) или 'csv'.",
+)
+
+stats_date_from_param = OpenApiParameter(
+    name="date_from",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description="Первый день периода (формат: ГГГГ-ММ-ДД). По умолчанию — 30 дней назад.",
+)
+
+stats_date_to_param = OpenApiParameter(
+    name="date_to",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description="Последний день периода (формат: ГГГГ-ММ-ДД). По умолчанию — сегодня.",
+)
+
+stats_fitness_club_id_param = OpenApiParameter(
+    name="fitness_club_id",
+    type=int,
+    location=OpenApiParameter.QUERY,
+    description="Фильтрация по ID фитнес-клуба.",
+)
+
+stats_trainer_id_param = OpenApiParameter(
+    name="trainer_id",
+    type=int,
+    location=OpenApiParameter.QUERY,
+    description="Фильтрация по ID тренера.",
+)
+
+group_by_param = OpenApiParameter(
+    name="group_by",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description=(
+        "Разрезы статистики через запятую: 'day', 'trainer', 'fitness_club'. "
+        "По умолчанию — все три."
+    ),
+)
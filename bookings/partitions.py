@@ -0,0 +1,154 @@
+"""
+Помесячные секции таблицы записей.
+
+Таблица ``bookings_booking`` секционирована по диапазону ``booking_date``:
+одна секция на календарный месяц (``bookings_booking_pГГГГММ``) и секция по
+умолчанию (``bookings_booking_default``) для дат, под которые секция ещё не
+создана. Секции на ближайшие месяцы создаются заранее, а старые месяцы
+отсоединяются целиком вместо построчного DELETE.
+"""
+
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Booking
+
+PARENT_TABLE = Booking._meta.db_table
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+PARTITION_NAME_RE = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARENT_TABLE}_p{month:%Y%m}"
+
+
+def archive_name(month):
+    return f"{PARENT_TABLE}_archive_{month:%Y%m}"
+
+
+def is_partitioned(cursor):
+    cursor.execute(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s)",
+        [PARENT_TABLE],
+    )
+    row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def partition_months(cursor):
+    """
+    Месяцы, для которых существуют присоединённые секции.
+    """
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = %s::regclass",
+        [PARENT_TABLE],
+    )
+    months = set()
+    for (name,) in cursor.fetchall():
+        match = PARTITION_NAME_RE.match(name)
+        if match:
+            months.add(date(int(match[1]), int(match[2]), 1))
+    return months
+
+
+def create_partition(cursor, month):
+    """
+    Создаёт секцию месяца. Если в секции по умолчанию уже есть записи этого
+    месяца, они переносятся в новую секцию до её присоединения: иначе
+    PostgreSQL не позволит создать пересекающуюся секцию.
+    """
+    qn = connection.ops.quote_name
+    parent, name = qn(PARENT_TABLE), qn(partition_name(month))
+    bounds = [month, add_months(month, 1)]
+
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {qn(DEFAULT_PARTITION)} "
+        "WHERE booking_date >= %s AND booking_date < %s)",
+        bounds,
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(
+            f"CREATE TABLE {name} PARTITION OF {parent} "
+            "FOR VALUES FROM (%s) TO (%s)",
+            bounds,
+        )
+        return
+
+    cursor.execute(
+        f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {qn(DEFAULT_PARTITION)} "
+        "WHERE booking_date >= %s AND booking_date < %s RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        bounds,
+    )
+    cursor.execute(
+        f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+        bounds,
+    )
+
+
+def ensure_partitions(months_ahead=None):
+    """
+    Создаёт недостающие секции с текущего месяца на ``months_ahead`` месяцев
+    вперёд, а также секции для всех месяцев, записи которых попали в секцию
+    по умолчанию. Возвращает имена созданных секций.
+    """
+    if months_ahead is None:
+        months_ahead = settings.BOOKING_PARTITION_MONTHS_AHEAD
+    current = timezone.localdate().replace(day=1)
+
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return created
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', booking_date)::date "
+            f"FROM {connection.ops.quote_name(DEFAULT_PARTITION)}"
+        )
+        stray = {month for (month,) in cursor.fetchall()}
+        wanted = {add_months(current, i) for i in range(months_ahead + 1)} | stray
+        for month in sorted(wanted - partition_months(cursor)):
+            create_partition(cursor, month)
+            created.append(partition_name(month))
+    return created
+
+
+def detach_partitions(before, drop=False):
+    """
+    Отсоединяет секции месяцев, целиком лежащих раньше ``before``.
+    Отсоединённая секция переименовывается в ``bookings_booking_archive_ГГГГММ``
+    и остаётся обычной таблицей для выгрузки в архив, либо удаляется при
+    ``drop=True``. Возвращает имена обработанных секций.
+    """
+    qn = connection.ops.quote_name
+    detached = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return detached
+        for month in sorted(partition_months(cursor)):
+            if add_months(month, 1) > before:
+                continue
+            name = partition_name(month)
+            cursor.execute(
+                f"ALTER TABLE {qn(PARENT_TABLE)} DETACH PARTITION {qn(name)}"
+            )
+            if drop:
+                cursor.execute(f"DROP TABLE {qn(name)}")
+            else:
+                cursor.execute(
+                    f"ALTER TABLE {qn(name)} RENAME TO {qn(archive_name(month))}"
+                )
+            detached.append(name)
+    return detached
@@ -9,12 +9,20 @@ class IsAdminOrClientOwnerOrTrainerOfSchedule(permissions.BasePermission):
     Разрешает:
     - Администраторам: полный доступ.
     - Клиентам: просматривать свои записи, создавать новые, обновлять/отменять свои записи (только некоторые статусы).
+    - Пакетное создание записей: администраторам и клиентам (клиенты — только для себя).
+    - Выгрузку записей: только администраторам.
     - Тренерам: просматривать записи на свои тренировки.
     """
 
     def has_permission(self, request, view):
         if view.action == "create":
             return request.user and request.user.role == Role.CLIENT
+        if view.action == "batch":
+            return request.user.is_authenticated and (
+                request.user.is_staff or request.user.role == Role.CLIENT
+            )
+        if view.action == "export":
+            return request.user.is_authenticated and request.user.is_staff
         if request.user and request.user.is_authenticated:
             return True
         return False
@@ -39,3 +47,57 @@ class IsAdminOrClientOwnerOrTrainerOfSchedule(permissions.BasePermission):
             return False
 
         return False
+
+
+class IsAdminOrSeriesOwner(permissions.BasePermission):
+    """
+    Разрешает:
+    - Администраторам: полный доступ к сериям записей.
+    - Клиентам: создавать серии для себя, просматривать и отменять свои серии.
+    - Тренерам: просматривать серии на свои тренировки.
+    """
+
+    def has_permission(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return False
+        if view.action == "create":
+            return request.user.is_staff or request.user.role == Role.CLIENT
+        return True
+
+    def has_object_permission(self, request, view, obj):
+        if request.user.is_staff:
+            return True
+        if request.user.role == Role.CLIENT:
+            return obj.client == request.user
+        if request.user.role == Role.TRAINER:
+            return (
+                obj.schedule.trainer.user == request.user and view.action == "retrieve"
+            )
+        return False
+
+
+class IsAdminOrWaitlistOwner(permissions.BasePermission):
+    """
+    Разрешает:
+    - Администраторам: полный доступ к листу ожидания.
+    - Клиентам: вставать в очередь, просматривать свои места и покидать очередь.
+    - Тренерам: просматривать очереди на свои тренировки.
+    """
+
+    def has_permission(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return False
+        if view.action == "create":
+            return request.user.is_staff or request.user.role == Role.CLIENT
+        return True
+
+    def has_object_permission(self, request, view, obj):
+        if request.user.is_staff:
+            return True
+        if request.user.role == Role.CLIENT:
+            return obj.client == request.user
+        if request.user.role == Role.TRAINER:
+            return (
+                obj.schedule.trainer.user == request.user and view.action == "retrieve"
+            )
+        return False
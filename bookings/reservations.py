@@ -0,0 +1,136 @@
+"""
+Бронирование слотов расписания с сериализацией конкурирующих запросов.
+
+Вместимость слота ``(schedule, booking_date, booking_time)`` защищает счётчик
+``SlotOccupancy``: подтверждение записи увеличивает его условным UPSERT в той
+же транзакции, а блокировка строки счётчика выстраивает конкурирующие
+подтверждения одного слота в очередь. Ожидание этой блокировки ограничено
+``BOOKING_SLOT_LOCK_TIMEOUT_MS``; по истечении транзакция повторяется.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, connection, transaction
+from rest_framework import serializers
+
+from .exceptions import SlotBusy
+from .models import (
+    Booking,
+    BookingEventType,
+    BookingStatus,
+    record_booking_changes,
+)
+
+# lock_not_available, deadlock_detected, serialization_failure
+RETRYABLE_PGCODES = {"55P03", "40P01", "40001"}
+UNIQUE_VIOLATION_PGCODE = "23505"
+
+
+@contextmanager
+def limited_lock_wait(enabled=True):
+    """
+    Ограничивает ожидание блокировок внутри блока значением
+    ``BOOKING_SLOT_LOCK_TIMEOUT_MS``. Без подтверждаемых записей за счётчики
+    слотов никто не конкурирует, и ограничение не включается (``enabled=False``).
+    """
+    if not enabled:
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('lock_timeout', %s, true)",
+            [f"{settings.BOOKING_SLOT_LOCK_TIMEOUT_MS}ms"],
+        )
+    yield
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL lock_timeout TO DEFAULT")
+
+
+def is_retryable(exc):
+    return getattr(exc.__cause__, "pgcode", None) in RETRYABLE_PGCODES
+
+
+def is_unique_violation(exc):
+    return getattr(exc.__cause__, "pgcode", None) == UNIQUE_VIOLATION_PGCODE
+
+
+def backoff(attempt):
+    base = settings.BOOKING_RESERVATION_BACKOFF_MS / 1000
+    time.sleep(base * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+
+def run_with_retries(write):
+    """
+    Выполняет ``write()`` в транзакции, повторяя её при истечении ожидания
+    блокировки с экспоненциальной задержкой не более
+    ``BOOKING_RESERVATION_MAX_ATTEMPTS`` раз. Повторная запись клиента
+    на тот же слот переводится в ошибку API.
+    """
+    attempts = settings.BOOKING_RESERVATION_MAX_ATTEMPTS
+    for attempt in range(1, attempts + 1):
+        try:
+            with transaction.atomic():
+                return write()
+        except IntegrityError as exc:
+            if not is_unique_violation(exc):
+                raise
+            raise serializers.ValidationError(
+                {"schedule_id": "Клиент уже записан на этот слот расписания."},
+                code="duplicate_booking",
+            ) from exc
+        except OperationalError as exc:
+            if not is_retryable(exc):
+                raise
+            if attempt == attempts:
+                raise SlotBusy() from exc
+            backoff(attempt)
+
+
+def reserve(booking):
+    """
+    Сохраняет запись на тренировку.
+
+    Если запись подтверждена, счётчик занятости слота увеличивается в той же
+    транзакции; заполненный слот отклоняет запись целиком.
+
+    Raises:
+        SlotAlreadyTaken: слот уже заполнен подтверждёнными записями.
+        SlotBusy: блокировку счётчика слота не удалось получить за все попытки.
+    """
+
+    adding, pk = booking._state.adding, booking.pk
+
+    def write():
+        # Откаченный INSERT успевает проставить записи pk; повтор должен
+        # снова вставлять её, а не обновлять несуществующую строку.
+        booking._state.adding, booking.pk = adding, pk
+        with limited_lock_wait(booking.status == BookingStatus.CONFIRMED):
+            booking.save()
+        return booking
+
+    return run_with_retries(write)
+
+
+def reserve_many(bookings):
+    """
+    Сохраняет уже проверенные записи одним ``bulk_create`` в одной транзакции.
+
+    Счётчики слотов подтверждённых записей увеличиваются одним запросом; если
+    слот успели заполнить после проверки, транзакция откатывается целиком.
+    События создания записей и изменения сводки пишутся той же транзакцией.
+    """
+
+    confirms = any(booking.status == BookingStatus.CONFIRMED for booking in bookings)
+
+    def write():
+        for booking in bookings:
+            booking._state.adding, booking.pk = True, None
+        with limited_lock_wait(confirms):
+            created = Booking.objects.bulk_create(bookings)
+            record_booking_changes(created, BookingEventType.CREATED)
+        return created
+
+    return run_with_retries(write)
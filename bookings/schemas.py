@@ -1,8 +1,48 @@
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiResponse, extend_schema_view
-from .serializers import BookingSerializer
-from .parameters import schedule_id_param, booking_date_param, status_param
+from .serializers import (
+    AvailabilitySerializer,
+    BookingSerializer,
+    BookingBatchSerializer,
+    BookingEventSerializer,
+    BookingSeriesSerializer,
+    BookingStatsSerializer,
+    WaitlistEntrySerializer,
+)
+from fitness_backend.parameters import (
+    expand_param,
+    fields_param,
+    idempotency_key_param,
+    if_modified_since_param,
+    if_none_match_param,
+)
+from .parameters import (
+    schedule_id_param,
+    booking_date_param,
+    status_param,
+    fitness_club_id_param,
+    trainer_id_param,
+    date_from_param,
+    days_param,
+    after_param,
+    booking_id_param,
+    event_type_param,
+    export_format_param,
+    stats_date_from_param,
+    stats_date_to_param,
+    stats_fitness_club_id_param,
+    stats_trainer_id_param,
+    group_by_param,
+)
 
-common_tags = {"booking": ["Записи"]}
+common_tags = {
+    "booking": ["Записи"],
+    "series": ["Серии записей"],
+    "availability": ["Свободные слоты"],
+    "waitlist": ["Лист ожидания"],
+    "events": ["Лента изменений записей"],
+    "stats": ["Статистика записей"],
+}
 
 
 booking_extend_schema_view = extend_schema_view(
@@ -13,9 +53,17 @@ booking_extend_schema_view = extend_schema_view(
             "Тренеры видят записи на тренировки из их расписаний. Клиенты видят только свои записи. "
             "Поддерживается фильтрация по ID расписания, дате записи и статусу."
         ),
-        parameters=[schedule_id_param, booking_date_param, status_param],
+        parameters=[
+            schedule_id_param,
+            booking_date_param,
+            status_param,
+            fields_param,
+            expand_param,
+            if_none_match_param,
+        ],
         responses={
             200: BookingSerializer(many=True),
+            304: OpenApiResponse(description="Данные не изменились (условный запрос)."),
             401: OpenApiResponse(description="Неавторизованный доступ."),
         },
         tags=common_tags["booking"],
@@ -23,8 +71,15 @@ booking_extend_schema_view = extend_schema_view(
     retrieve=extend_schema(
         summary="Получение записи",
         description="Получение детальной информации о конкретной записи по ее ID.",
+        parameters=[
+            fields_param,
+            expand_param,
+            if_none_match_param,
+            if_modified_since_param,
+        ],
         responses={
             200: BookingSerializer,
+            304: OpenApiResponse(description="Данные не изменились (условный запрос)."),
             401: OpenApiResponse(description="Неавторизованный доступ."),
             403: OpenApiResponse(description="Доступ запрещён."),
             404: OpenApiResponse(description="Запись не найдена."),
@@ -38,11 +93,45 @@ booking_extend_schema_view = extend_schema_view(
             "Администраторы могут создавать записи для любого клиента, указывая его ID."
         ),
         request=BookingSerializer,
+        parameters=[idempotency_key_param],
         responses={
             201: BookingSerializer,
             400: OpenApiResponse(description="Неверные данные запроса."),
             401: OpenApiResponse(description="Неавторизованный доступ."),
             403: OpenApiResponse(description="Доступ запрещён."),
+            409: OpenApiResponse(
+                description=(
+                    "Слот уже заполнен подтверждёнными записями или занят конкурирующим запросом. "
+                    "На занятый слот можно встать в лист ожидания. Также возвращается, "
+                    "если запрос с тем же ключом идемпотентности ещё выполняется."
+                )
+            ),
+            422: OpenApiResponse(
+                description="Ключ идемпотентности уже использован с другими данными."
+            ),
+        },
+        tags=common_tags["booking"],
+    ),
+    batch=extend_schema(
+        summary="Пакетное создание записей",
+        description=(
+            "Создание нескольких записей одним запросом (например, запись группы на ресепшене). "
+            "Пакет проверяется целиком фиксированным числом запросов к базе и создаётся одной "
+            "транзакцией: при ошибке хотя бы в одном элементе не создаётся ни одна запись, "
+            "а в ответе возвращаются ошибки по каждому элементу в порядке их передачи. "
+            "Администраторы указывают клиента в каждом элементе, клиенты записывают только себя."
+        ),
+        request=BookingBatchSerializer,
+        responses={
+            201: BookingSerializer(many=True),
+            400: OpenApiResponse(
+                description="Ошибки валидации по элементам пакета (поле `bookings`)."
+            ),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+            409: OpenApiResponse(
+                description="Слот занят конкурирующим запросом во время сохранения пакета."
+            ),
         },
         tags=common_tags["booking"],
     ),
@@ -59,6 +148,9 @@ booking_extend_schema_view = extend_schema_view(
             401: OpenApiResponse(description="Неавторизованный доступ."),
             403: OpenApiResponse(description="Доступ запрещён."),
             404: OpenApiResponse(description="Запись не найдена."),
+            409: OpenApiResponse(
+                description="Слот уже заполнен подтверждёнными записями."
+            ),
         },
         tags=common_tags["booking"],
     ),
@@ -72,6 +164,9 @@ booking_extend_schema_view = extend_schema_view(
             401: OpenApiResponse(description="Неавторизованный доступ."),
             403: OpenApiResponse(description="Доступ запрещён."),
             404: OpenApiResponse(description="Запись не найдена."),
+            409: OpenApiResponse(
+                description="Слот уже заполнен подтверждёнными записями."
+            ),
         },
         tags=common_tags["booking"],
     ),
@@ -79,7 +174,9 @@ booking_extend_schema_view = extend_schema_view(
         summary="Удаление или отмена записи",
         description=(
             "Удаление записи администратором или отмена клиентом. "
-            "Нельзя отменить завершенные или уже отменённые записи."
+            "Нельзя отменить завершенные или уже отменённые записи. "
+            "Если освободился подтверждённый слот, он сразу подтверждается первому "
+            "клиенту из листа ожидания."
         ),
         responses={
             204: OpenApiResponse(description="Успешно."),
@@ -89,4 +186,216 @@ booking_extend_schema_view = extend_schema_view(
         },
         tags=common_tags["booking"],
     ),
+    export=extend_schema(
+        summary="Выгрузка записей (только админ)",
+        description=(
+            "Потоковая выгрузка записей в NDJSON (одна запись JSON на строку) или CSV. "
+            "Строки читаются из БД серверным курсором порциями и сразу передаются клиенту, "
+            "поэтому выгрузка любого объёма не загружается в память целиком. "
+            "Поддерживаются те же фильтры, что и у списка записей."
+        ),
+        parameters=[
+            schedule_id_param,
+            booking_date_param,
+            status_param,
+            export_format_param,
+        ],
+        responses={
+            (200, "application/x-ndjson"): OpenApiTypes.STR,
+            (200, "text/csv"): OpenApiTypes.STR,
+            400: OpenApiResponse(description="Неверный формат выгрузки."),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+        },
+        tags=common_tags["booking"],
+    ),
+)
+
+
+booking_series_extend_schema_view = extend_schema_view(
+    list=extend_schema(
+        summary="Список серий записей",
+        description=(
+            "Администраторы видят все серии, клиенты — только свои, "
+            "тренеры — серии на тренировки из их расписаний."
+        ),
+        responses={
+            200: BookingSeriesSerializer(many=True),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+        },
+        tags=common_tags["series"],
+    ),
+    retrieve=extend_schema(
+        summary="Получение серии записей",
+        description="Детальная информация о серии и всех её занятиях.",
+        responses={
+            200: BookingSeriesSerializer,
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+            404: OpenApiResponse(description="Серия не найдена."),
+        },
+        tags=common_tags["series"],
+    ),
+    create=extend_schema(
+        summary="Создание еженедельной серии записей",
+        description=(
+            "Разворачивает еженедельную серию (например, «каждый вторник в 18:00 на 12 недель») "
+            "в отдельные записи на каждую дату. Если часть дат занята, серия не создаётся, "
+            "а в ответе перечисляются занятые даты; с `skip_conflicts=true` занятые даты "
+            "пропускаются. Клиенты создают серии только для себя."
+        ),
+        request=BookingSeriesSerializer,
+        responses={
+            201: BookingSeriesSerializer,
+            400: OpenApiResponse(
+                description="Неверные данные запроса или занятые даты."
+            ),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+            409: OpenApiResponse(
+                description="Слот занят конкурирующим запросом во время сохранения серии."
+            ),
+        },
+        tags=common_tags["series"],
+    ),
+    destroy=extend_schema(
+        summary="Отмена серии записей",
+        description=(
+            "Отменяет все предстоящие занятия серии и удаляет серию. "
+            "Прошедшие занятия сохраняются в истории записей."
+        ),
+        responses={
+            204: OpenApiResponse(description="Серия отменена."),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+            404: OpenApiResponse(description="Серия не найдена."),
+        },
+        tags=common_tags["series"],
+    ),
+)
+
+
+availability_extend_schema = extend_schema(
+    summary="Свободные слоты клуба",
+    description=(
+        "Возвращает свободные слоты всех активных расписаний фитнес-клуба за период "
+        "(по умолчанию — неделя с сегодняшнего дня). Окно каждого расписания делится на "
+        "слоты фиксированной длины (`slot_minutes`); в выдаче — время начала свободных "
+        "слотов. Слот занят, если подтверждённых записей на него не меньше вместимости "
+        "расписания (`capacity`); уже начавшиеся слоты и отменённые занятия не "
+        "выводятся. Расписания без свободных слотов в этот день не выводятся."
+    ),
+    parameters=[fitness_club_id_param, trainer_id_param, date_from_param, days_param],
+    responses={
+        200: AvailabilitySerializer,
+        400: OpenApiResponse(description="Неверные параметры запроса."),
+        401: OpenApiResponse(description="Неавторизованный доступ."),
+    },
+    tags=common_tags["availability"],
+)
+
+
+booking_stats_extend_schema = extend_schema(
+    summary="Статистика записей",
+    description=(
+        "Число записей по статусам за период в разрезе дней, тренеров и фитнес-клубов "
+        "(по умолчанию — за последние 30 дней во всех трёх разрезах). Данные читаются "
+        "из инкрементально обновляемой сводки, поэтому время ответа зависит от числа "
+        "занятий в периоде, а не от числа записей. Доступно только администраторам."
+    ),
+    parameters=[
+        stats_date_from_param,
+        stats_date_to_param,
+        group_by_param,
+        stats_fitness_club_id_param,
+        stats_trainer_id_param,
+    ],
+    responses={
+        200: BookingStatsSerializer,
+        400: OpenApiResponse(description="Неверные параметры запроса."),
+        401: OpenApiResponse(description="Неавторизованный доступ."),
+        403: OpenApiResponse(description="Доступ запрещён."),
+    },
+    tags=common_tags["stats"],
+)
+
+
+waitlist_extend_schema_view = extend_schema_view(
+    list=extend_schema(
+        summary="Лист ожидания",
+        description=(
+            "Места в очередях ожидания занятых слотов. Администраторы видят все очереди, "
+            "клиенты — только свои места, тренеры — очереди на свои тренировки. "
+            "Поддерживается фильтрация по ID расписания и дате."
+        ),
+        parameters=[schedule_id_param, booking_date_param],
+        responses={
+            200: WaitlistEntrySerializer(many=True),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+        },
+        tags=common_tags["waitlist"],
+    ),
+    retrieve=extend_schema(
+        summary="Место в листе ожидания",
+        description="Детальная информация о месте клиента в очереди ожидания.",
+        responses={
+            200: WaitlistEntrySerializer,
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+            404: OpenApiResponse(description="Место в очереди не найдено."),
+        },
+        tags=common_tags["waitlist"],
+    ),
+    create=extend_schema(
+        summary="Встать в лист ожидания",
+        description=(
+            "Ставит клиента в очередь на занятый слот расписания. Когда подтверждённая "
+            "запись на слот отменяется или удаляется, первый клиент очереди получает "
+            "подтверждённую запись автоматически. На свободный слот нужно записываться "
+            "напрямую. Клиенты встают в очередь только за себя."
+        ),
+        request=WaitlistEntrySerializer,
+        responses={
+            201: WaitlistEntrySerializer,
+            400: OpenApiResponse(
+                description="Неверные данные запроса, слот свободен или клиент уже в очереди."
+            ),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+        },
+        tags=common_tags["waitlist"],
+    ),
+    destroy=extend_schema(
+        summary="Покинуть лист ожидания",
+        description="Удаляет место клиента из очереди ожидания.",
+        responses={
+            204: OpenApiResponse(description="Место в очереди удалено."),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+            404: OpenApiResponse(description="Место в очереди не найдено."),
+        },
+        tags=common_tags["waitlist"],
+    ),
+)
+
+
+booking_events_extend_schema_view = extend_schema_view(
+    list=extend_schema(
+        summary="Лента изменений записей",
+        description=(
+            "События создания, изменения, отмены и удаления записей в порядке возрастания ID. "
+            "События пишутся в одной транзакции с изменением записи и появляются в ленте "
+            "только после завершения всех более ранних транзакций, поэтому потребителю "
+            "достаточно запоминать ID последнего обработанного события и передавать его в "
+            "`after`. Доступно только администраторам."
+        ),
+        parameters=[after_param, booking_id_param, event_type_param],
+        responses={
+            200: BookingEventSerializer(many=True),
+            400: OpenApiResponse(description="Неверные параметры запроса."),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+        },
+        tags=common_tags["events"],
+    ),
 )
@@ -1,14 +1,30 @@
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from rest_framework import serializers
 
-from schedule.models import Schedule
+from fitness_backend.serializers import FlexFieldsMixin
+from schedule.models import Schedule, ScheduleException
 from users.models import User, Role
-from .models import Booking
+from .exceptions import SlotAlreadyTaken
+from .models import (
+    Booking,
+    BookingEvent,
+    BookingSeries,
+    BookingStatus,
+    SlotOccupancy,
+    WaitlistEntry,
+)
+from .reservations import reserve, reserve_many
 from users.serializers import UserSerializer
 from schedule.serializers import ScheduleSerializer
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(FlexFieldsMixin, serializers.ModelSerializer):
 
     client = UserSerializer(read_only=True)
     schedule = ScheduleSerializer(read_only=True)
@@ -53,9 +69,497 @@ class BookingSerializer(serializers.ModelSerializer):
                 )
 
             instance = Booking(**data)
+            if self.instance is not None:
+                instance.pk = self.instance.pk
+                # Своя подтверждённая запись не занимает место в собственном слоте.
+                instance._loaded_state = self.instance.loaded_state
             try:
                 instance.clean()
             except ValidationError as e:
+                codes = {
+                    error.code for errors in e.error_dict.values() for error in errors
+                }
+                if "slot_already_taken" in codes:
+                    raise SlotAlreadyTaken()
                 raise serializers.ValidationError(e.message_dict)
 
         return data
+
+    def create(self, validated_data):
+        return reserve(Booking(**validated_data))
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        return reserve(instance)
+
+
+class BookingBatchItemSerializer(serializers.Serializer):
+    """
+    Элемент пакетной записи. Идентификаторы не разрешаются по одному:
+    расписания, клиенты и занятые слоты загружаются для всего пакета сразу
+    в ``BookingBatchSerializer.validate``.
+    """
+
+    client_id = serializers.IntegerField(
+        required=False,
+        help_text="ID клиента. Обязателен для администраторов, для клиентов игнорируется.",
+    )
+    schedule_id = serializers.IntegerField()
+    booking_date = serializers.DateField()
+    booking_time = serializers.TimeField()
+    status = serializers.ChoiceField(
+        choices=BookingStatus.choices, default=BookingStatus.PENDING
+    )
+
+
+class BookingBatchSerializer(serializers.Serializer):
+    """
+    Пакетное создание записей с проверкой всего пакета фиксированным числом
+    запросов: расписания, клиенты (для администраторов) и конфликтующие слоты.
+    Записи создаются одной транзакцией; при любой ошибке не создаётся ни одна,
+    а ошибки возвращаются по каждому элементу.
+    """
+
+    bookings = BookingBatchItemSerializer(
+        many=True, allow_empty=False, max_length=settings.BOOKING_BATCH_MAX_SIZE
+    )
+
+    def validate(self, data):
+        items = data["bookings"]
+        user = self.context["request"].user
+        is_client = user.role == Role.CLIENT and not user.is_staff
+
+        schedules = Schedule.objects.in_bulk({item["schedule_id"] for item in items})
+        if is_client:
+            clients = {user.id: user}
+            for item in items:
+                item["client_id"] = user.id
+        else:
+            clients = User.objects.in_bulk(
+                {item["client_id"] for item in items if "client_id" in item}
+            )
+
+        bookings = []
+        errors = [{} for _ in items]
+        for index, item in enumerate(items):
+            client = clients.get(item.get("client_id"))
+            schedule = schedules.get(item["schedule_id"])
+            if "client_id" not in item:
+                errors[index]["client_id"] = ["Обязательное поле."]
+            elif client is None:
+                errors[index]["client_id"] = ["Клиент не найден."]
+            if schedule is None:
+                errors[index]["schedule_id"] = ["Расписание не найдено."]
+            if errors[index]:
+                bookings.append(None)
+                continue
+
+            booking = Booking(
+                client=client,
+                schedule=schedule,
+                booking_date=item["booking_date"],
+                booking_time=item["booking_time"],
+                status=item["status"],
+            )
+            try:
+                booking.clean_slot()
+            except ValidationError as e:
+                errors[index] = e.message_dict
+                booking = None
+            bookings.append(booking)
+
+        candidates = [booking for booking in bookings if booking is not None]
+        occupancy, booked_by_client, cancelled = {}, set(), set()
+        if candidates:
+            dates = [booking.booking_date for booking in candidates]
+            cancelled = ScheduleException.objects.cancelled(
+                {booking.schedule for booking in candidates}, min(dates), max(dates)
+            )
+            slots = reduce(
+                or_,
+                (
+                    Q(
+                        schedule_id=booking.schedule_id,
+                        booking_date=booking.booking_date,
+                        booking_time=booking.booking_time,
+                    )
+                    for booking in candidates
+                ),
+            )
+            for schedule_id, booking_date, booking_time, client_id in (
+                Booking.objects.filter(slots)
+                .filter(client_id__in={booking.client_id for booking in candidates})
+                .values_list("schedule_id", "booking_date", "booking_time", "client_id")
+            ):
+                booked_by_client.add(
+                    (client_id, (schedule_id, booking_date, booking_time))
+                )
+            for (
+                schedule_id,
+                booking_date,
+                booking_time,
+                confirmed,
+            ) in SlotOccupancy.objects.filter(slots).values_list(
+                "schedule_id", "booking_date", "booking_time", "confirmed"
+            ):
+                occupancy[(schedule_id, booking_date, booking_time)] = confirmed
+
+        for index, booking in enumerate(bookings):
+            if booking is None:
+                continue
+            slot = (booking.schedule_id, booking.booking_date, booking.booking_time)
+            if slot[:2] in cancelled:
+                errors[index]["booking_date"] = ["Занятие в этот день отменено."]
+            elif (booking.client_id, slot) in booked_by_client:
+                errors[index]["schedule_id"] = [
+                    "Клиент уже записан на этот слот расписания."
+                ]
+            elif occupancy.get(slot, 0) >= booking.schedule.capacity:
+                errors[index]["schedule_id"] = [
+                    "Этот слот расписания уже занят другой записью."
+                ]
+            else:
+                booked_by_client.add((booking.client_id, slot))
+                if booking.status == BookingStatus.CONFIRMED:
+                    occupancy[slot] = occupancy.get(slot, 0) + 1
+
+        if any(errors):
+            raise serializers.ValidationError({"bookings": errors})
+
+        data["bookings"] = bookings
+        return data
+
+    def create(self, validated_data):
+        return reserve_many(validated_data["bookings"])
+
+
+class BookingSeriesOccurrenceSerializer(FlexFieldsMixin, serializers.ModelSerializer):
+    status_display = serializers.CharField(source="get_status_display", read_only=True)
+
+    class Meta:
+        model = Booking
+        fields = ["id", "booking_date", "booking_time", "status", "status_display"]
+        read_only_fields = fields
+
+
+class BookingSeriesSerializer(FlexFieldsMixin, serializers.ModelSerializer):
+    """
+    Еженедельная серия записей. При создании серия разворачивается в записи
+    на каждую неделю: проверки дня недели и времени выполняются один раз на
+    серию, занятость и отмены занятий на все даты проверяются по одному
+    запросу, а записи создаются одним ``bulk_create``.
+    """
+
+    client = UserSerializer(read_only=True)
+    schedule = ScheduleSerializer(read_only=True)
+    client_id = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.filter(role="client"),
+        source="client",
+        write_only=True,
+        required=False,
+        help_text="ID клиента. Обязателен для администраторов, для клиентов игнорируется.",
+    )
+    schedule_id = serializers.PrimaryKeyRelatedField(
+        queryset=Schedule.objects.all(),
+        source="schedule",
+        write_only=True,
+        required=True,
+    )
+    status = serializers.ChoiceField(
+        choices=BookingStatus.choices,
+        default=BookingStatus.PENDING,
+        write_only=True,
+        help_text="Статус создаваемых записей серии.",
+    )
+    skip_conflicts = serializers.BooleanField(
+        default=False,
+        write_only=True,
+        help_text="Пропустить занятые даты вместо отказа в создании всей серии.",
+    )
+    occurrences = BookingSeriesOccurrenceSerializer(
+        source="bookings", many=True, read_only=True
+    )
+
+    class Meta:
+        model = BookingSeries
+        fields = [
+            "id",
+            "client",
+            "client_id",
+            "schedule",
+            "schedule_id",
+            "start_date",
+            "booking_time",
+            "weeks",
+            "status",
+            "skip_conflicts",
+            "occurrences",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["created_at", "updated_at"]
+
+    def validate(self, data):
+        user = self.context["request"].user
+        if user.role == Role.CLIENT and not user.is_staff:
+            data["client"] = user
+        elif "client" not in data:
+            raise serializers.ValidationError({"client_id": "Обязательное поле."})
+
+        first = Booking(
+            client=data["client"],
+            schedule=data["schedule"],
+            booking_date=data["start_date"],
+            booking_time=data["booking_time"],
+            status=data["status"],
+        )
+        try:
+            first.clean_slot()
+        except ValidationError as e:
+            field_map = {"booking_date": "start_date", "client": "client_id"}
+            raise serializers.ValidationError(
+                {
+                    field_map.get(field, field): messages
+                    for field, messages in e.message_dict.items()
+                }
+            )
+
+        series = BookingSeries(
+            start_date=data["start_date"],
+            weeks=data["weeks"],
+        )
+        dates = series.dates
+        slot = {
+            "schedule": data["schedule"],
+            "booking_time": data["booking_time"],
+            "booking_date__in": dates,
+        }
+        conflicts = (
+            set(
+                Booking.objects.filter(**slot, client=data["client"]).values_list(
+                    "booking_date", flat=True
+                )
+            )
+            | set(
+                SlotOccupancy.objects.full()
+                .filter(**slot)
+                .values_list("booking_date", flat=True)
+            )
+            | {
+                day
+                for _, day in ScheduleException.objects.cancelled(
+                    [data["schedule"]], dates[0], dates[-1]
+                )
+            }
+        )
+        if conflicts and not data["skip_conflicts"]:
+            raise serializers.ValidationError(
+                {
+                    "start_date": "Слот расписания занят или занятие отменено на даты: "
+                    + ", ".join(str(date) for date in sorted(conflicts))
+                    + "."
+                }
+            )
+        data["dates"] = [date for date in dates if date not in conflicts]
+        if not data["dates"]:
+            raise serializers.ValidationError(
+                {
+                    "start_date": "Слот расписания занят или занятие отменено "
+                    "на все даты серии."
+                }
+            )
+        return data
+
+    def create(self, validated_data):
+        dates = validated_data.pop("dates")
+        status = validated_data.pop("status")
+        validated_data.pop("skip_conflicts")
+        with transaction.atomic():
+            series = BookingSeries.objects.create(**validated_data)
+            reserve_many(
+                [
+                    Booking(
+                        client=series.client,
+                        schedule=series.schedule,
+                        series=series,
+                        booking_date=date,
+                        booking_time=series.booking_time,
+                        status=status,
+                    )
+                    for date in dates
+                ]
+            )
+        return series
+
+
+class WaitlistEntrySerializer(FlexFieldsMixin, serializers.ModelSerializer):
+    """
+    Постановка в очередь ожидания на занятый слот расписания. Свободный слот
+    нужно бронировать напрямую, а не через очередь.
+    """
+
+    client = UserSerializer(read_only=True)
+    schedule = ScheduleSerializer(read_only=True)
+    client_id = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.filter(role="client"),
+        source="client",
+        write_only=True,
+        required=False,
+        help_text="ID клиента. Обязателен для администраторов, для клиентов игнорируется.",
+    )
+    schedule_id = serializers.PrimaryKeyRelatedField(
+        queryset=Schedule.objects.all(),
+        source="schedule",
+        write_only=True,
+        required=True,
+    )
+
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            "id",
+            "client",
+            "client_id",
+            "schedule",
+            "schedule_id",
+            "booking_date",
+            "booking_time",
+            "created_at",
+        ]
+        read_only_fields = ["created_at"]
+        # Повторная постановка в очередь проверяется в validate().
+        validators = []
+
+    def validate(self, data):
+        user = self.context["request"].user
+        if user.role == Role.CLIENT and not user.is_staff:
+            data["client"] = user
+        elif "client" not in data:
+            raise serializers.ValidationError({"client_id": "Обязательное поле."})
+
+        booking = Booking(
+            client=data["client"],
+            schedule=data["schedule"],
+            booking_date=data["booking_date"],
+            booking_time=data["booking_time"],
+        )
+        try:
+            booking.clean_slot()
+        except ValidationError as e:
+            field_map = {"client": "client_id", "schedule": "schedule_id"}
+            raise serializers.ValidationError(
+                {
+                    field_map.get(field, field): messages
+                    for field, messages in e.message_dict.items()
+                }
+            )
+
+        if booking.is_cancelled():
+            raise serializers.ValidationError(
+                {"booking_date": "Занятие в этот день отменено."},
+                code="class_cancelled",
+            )
+
+        slot = {
+            "schedule": data["schedule"],
+            "booking_date": data["booking_date"],
+            "booking_time": data["booking_time"],
+        }
+        if WaitlistEntry.objects.filter(client=data["client"], **slot).exists():
+            raise serializers.ValidationError(
+                {"schedule_id": "Клиент уже стоит в очереди на этот слот."},
+                code="already_waitlisted",
+            )
+        if (
+            Booking.objects.filter(client=data["client"], **slot)
+            .exclude(status=BookingStatus.CANCELLED)
+            .exists()
+        ):
+            raise serializers.ValidationError(
+                {"schedule_id": "Клиент уже записан на этот слот расписания."},
+                code="duplicate_booking",
+            )
+        if not booking.is_slot_full():
+            raise serializers.ValidationError(
+                {"schedule_id": "Слот свободен — запишитесь на него напрямую."},
+                code="slot_available",
+            )
+        return data
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {"schedule_id": "Клиент уже стоит в очереди на этот слот."},
+                code="already_waitlisted",
+            )
+
+
+class BookingEventSerializer(serializers.ModelSerializer):
+    event_type_display = serializers.CharField(
+        source="get_event_type_display", read_only=True
+    )
+
+    class Meta:
+        model = BookingEvent
+        fields = [
+            "id",
+            "booking_id",
+            "event_type",
+            "event_type_display",
+            "payload",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class AvailabilityScheduleSerializer(serializers.Serializer):
+    schedule_id = serializers.IntegerField(source="schedule.id")
+    trainer_id = serializers.IntegerField(source="schedule.trainer_id")
+    trainer_name = serializers.CharField(source="schedule.trainer.full_name")
+    start_time = serializers.TimeField(source="schedule.start_time")
+    end_time = serializers.TimeField(source="schedule.end_time")
+    free_slots = serializers.ListField(child=serializers.TimeField())
+
+
+class AvailabilityDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    schedules = AvailabilityScheduleSerializer(many=True)
+
+
+class AvailabilitySerializer(serializers.Serializer):
+    """
+    Свободные слоты клуба за период, сгруппированные по дням.
+    """
+
+    fitness_club_id = serializers.IntegerField()
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    slot_minutes = serializers.IntegerField()
+    days = AvailabilityDaySerializer(many=True)
+
+
+class BookingStatsRowSerializer(serializers.Serializer):
+    date = serializers.DateField(required=False)
+    trainer_id = serializers.IntegerField(required=False)
+    fitness_club_id = serializers.IntegerField(required=False)
+    counts = serializers.DictField(
+        child=serializers.IntegerField(),
+        help_text="Число записей в каждом статусе.",
+    )
+    total = serializers.IntegerField()
+
+
+class BookingStatsSerializer(serializers.Serializer):
+    """
+    Число записей по статусам за период в выбранных разрезах.
+    Поля разрезов, не указанных в ``group_by``, в строках отсутствуют.
+    """
+
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    group_by = serializers.ListField(child=serializers.CharField())
+    rows = BookingStatsRowSerializer(many=True)
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Отправляется ``record_booking_changes`` в транзакции, изменяющей записи, —
+# и для ``save``, и для массовых изменений, которые не вызывают post_save.
+# Аргументы: ``bookings`` (список записей) и ``event_type``.
+bookings_changed = Signal()
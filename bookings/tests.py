@@ -1,3 +1,1088 @@
-from django.test import TestCase
+import json
+from base64 import urlsafe_b64encode
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from schedule.models import DayOfWeek, Schedule
+from trainers.models import FitnessClub, Trainer
+from users.models import IdempotencyKey, Role, User
+from .availability import AvailabilityIndex
+from .events import dispatch_batch
+from .exceptions import SlotAlreadyTaken
+from .models import (
+    Booking,
+    BookingEvent,
+    BookingEventType,
+    BookingRollup,
+    BookingSeries,
+    BookingStatus,
+    SlotOccupancy,
+    WaitlistEntry,
+)
+from .reservations import reserve, reserve_many
+from .serializers import BookingBatchSerializer
+from .partitions import (
+    DEFAULT_PARTITION,
+    add_months,
+    detach_partitions,
+    ensure_partitions,
+    partition_name,
+)
+
+
+class SlotTestCase(TestCase):
+    """
+    Общие данные тестов одного слота: администратор, тренер, клуб,
+    расписание 10:00 на день недели ``booking_date`` и клиенты ``client0..N``.
+    """
+
+    clients_count = 2
+    capacity = 1
+    end_time = time(11)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", role=Role.ADMIN, is_staff=True
+        )
+        cls.trainer = Trainer.objects.create(
+            user=User.objects.create_user(
+                username="trainer", email="trainer@example.com", role=Role.TRAINER
+            )
+        )
+        cls.club = FitnessClub.objects.create(name="Клуб")
+        cls.booking_date = date.today() + timedelta(days=7)
+        cls.schedule = Schedule.objects.create(
+            trainer=cls.trainer,
+            fitness_club=cls.club,
+            day_of_week=DayOfWeek.values[cls.booking_date.weekday()],
+            start_time=time(10),
+            end_time=cls.end_time,
+            capacity=cls.capacity,
+        )
+        cls.clients = [
+            User.objects.create_user(
+                username=f"client{i}", email=f"client{i}@example.com", role=Role.CLIENT
+            )
+            for i in range(cls.clients_count)
+        ]
+
+    def booking(self, client, booking_time=time(10), **extra):
+        return Booking(
+            client=client,
+            schedule=self.schedule,
+            booking_date=self.booking_date,
+            booking_time=booking_time,
+            **extra,
+        )
+
+
+class BookingListQueryBudgetTests(TestCase):
+    """
+    Число запросов списка записей не зависит от количества записей.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", role=Role.ADMIN, is_staff=True
+        )
+        cls.client_user = User.objects.create_user(
+            username="client", email="client@example.com", role=Role.CLIENT
+        )
+        clubs = [FitnessClub.objects.create(name=f"Клуб {i}") for i in range(3)]
+        cls.booking_date = date.today() + timedelta(days=7)
+        day_of_week = DayOfWeek.values[cls.booking_date.weekday()]
+
+        for i in range(4):
+            trainer_user = User.objects.create_user(
+                username=f"trainer{i}",
+                email=f"trainer{i}@example.com",
+                role=Role.TRAINER,
+            )
+            trainer = Trainer.objects.create(user=trainer_user)
+            trainer.clubs.set(clubs)
+            schedule = Schedule.objects.create(
+                trainer=trainer,
+                fitness_club=clubs[i % len(clubs)],
+                day_of_week=day_of_week,
+                start_time=time(8 + i),
+                end_time=time(9 + i),
+            )
+            for j in range(5):
+                client = User.objects.create_user(
+                    username=f"client{i}-{j}",
+                    email=f"client{i}-{j}@example.com",
+                    role=Role.CLIENT,
+                )
+                Booking.objects.create(
+                    client=client,
+                    schedule=schedule,
+                    booking_date=cls.booking_date + timedelta(weeks=j),
+                    booking_time=schedule.start_time,
+                    status=BookingStatus.CONFIRMED,
+                )
+            series = BookingSeries.objects.create(
+                client=cls.client_user,
+                schedule=schedule,
+                start_date=cls.booking_date,
+                booking_time=schedule.start_time,
+                weeks=2,
+            )
+            for week in range(2):
+                Booking.objects.create(
+                    client=cls.client_user,
+                    schedule=schedule,
+                    series=series,
+                    booking_date=cls.booking_date + timedelta(weeks=week),
+                    booking_time=schedule.start_time,
+                )
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def test_booking_list(self):
+        # записи с клиентами, расписаниями, тренерами и клубами + клубы тренеров;
+        # ETag строится по загруженной странице
+        with self.assertNumQueries(2):
+            response = self.api.get("/api/bookings/bookings/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 28)
+
+        # Страница по курсору — без агрегатов и подсчётов по всей выборке.
+        next_page = self.api.get("/api/bookings/bookings/", {"page_size": 5})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get(next_page.data["next"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertFalse(
+            [
+                query
+                for query in queries
+                if "MAX(" in query["sql"].upper() or "COUNT(" in query["sql"].upper()
+            ]
+        )
+
+    def test_keyset_cursors_walk_pages_in_both_directions(self):
+        expected = list(
+            Booking.objects.order_by(
+                "-booking_date", "-booking_time", "-id"
+            ).values_list("id", "booking_date", "booking_time")
+        )
+        # Записи клиентов и серии попадают в одни и те же слоты: порядок
+        # внутри совпадающих (booking_date, booking_time) задаёт -id.
+        slots = [row[1:] for row in expected]
+        self.assertLess(len(set(slots)), len(slots))
+        expected = [row[0] for row in expected]
+
+        pages, url = [], "/api/bookings/bookings/?page_size=4"
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.api.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn("count", response.data)
+                pages.append([item["id"] for item in response.data["results"]])
+                url, previous = response.data["next"], response.data["previous"]
+            backwards = [pages[-1]]
+            while previous:
+                response = self.api.get(previous)
+                backwards.append([item["id"] for item in response.data["results"]])
+                previous = response.data["previous"]
+        self.assertEqual([pk for page in pages for pk in page], expected)
+        self.assertEqual(backwards, pages[::-1])
+        self.assertFalse(
+            [query for query in queries if "COUNT(" in query["sql"].upper()]
+        )
+
+    def test_invalid_cursor_is_rejected(self):
+        def cursor(payload):
+            return urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        for value in (
+            "not-a-cursor",
+            cursor([["2026-01-01", "10:00:00"], 0]),
+            cursor([["not-a-date", "10:00:00", 1], 0]),
+            cursor({"values": []}),
+        ):
+            response = self.api.get("/api/bookings/bookings/", {"cursor": value})
+            self.assertEqual(response.status_code, 404, value)
+
+    def test_export_streams_filtered_rows(self):
+        schedule = Schedule.objects.first()
+        response = self.api.get(
+            f"/api/bookings/bookings/export/?export_format=csv&schedule_id={schedule.id}"
+        )
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(1):
+            lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            lines[0].split(",")[:4], ["id", "booking_date", "booking_time", "status"]
+        )
+        self.assertEqual(len(lines) - 1, schedule.bookings.count())
+
+    def test_admin_changelists(self):
+        superuser = User.objects.create_superuser(
+            username="root", email="root@example.com", password="!"
+        )
+        self.client.force_login(superuser)
+        # сессия и пользователь, варианты фильтров, оценка и подсчёт строк,
+        # страница вместе со связями, которые выводятся в столбцах
+        budgets = {
+            "/admin/bookings/booking/": 6,
+            "/admin/bookings/bookingseries/": 5,
+            "/admin/bookings/waitlistentry/": 5,
+            "/admin/schedule/schedule/": 7,
+            "/admin/trainers/trainer/": 9,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url), self.assertNumQueries(budget):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_booking_series_list(self):
+        # серии + клубы тренеров + занятия серий
+        with self.assertNumQueries(3):
+            response = self.api.get("/api/bookings/series/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 4)
+
+    def test_batch_response(self):
+        client = APIClient()
+        client.force_authenticate(self.client_user)
+        schedule = Schedule.objects.first()
+        items = [
+            {
+                "schedule_id": schedule.id,
+                "booking_date": str(self.booking_date + timedelta(weeks=week)),
+                "booking_time": schedule.start_time.strftime("%H:%M"),
+            }
+            for week in range(5, 10)
+        ]
+        # расписания, отмены занятий, записи клиентов и счётчики слотов,
+        # вставка записей, событий outbox и сводки в транзакции, догрузка
+        # связей для ответа
+        with self.assertNumQueries(13):
+            response = client.post(
+                "/api/bookings/bookings/batch/", {"bookings": items}, format="json"
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 5)
+
+    def test_sparse_fields(self):
+        # только поля самой записи — без JOIN и предзагрузок
+        with self.assertNumQueries(1):
+            response = self.api.get(
+                "/api/bookings/bookings/?fields=id,booking_date,status"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(response.data["results"][0]), {"id", "booking_date", "status"}
+        )
+
+    def test_expand(self):
+        response = self.api.get("/api/bookings/bookings/?expand=schedule")
+        self.assertEqual(response.status_code, 200)
+        booking = response.data["results"][0]
+        self.assertIsInstance(booking["client"], int)
+        self.assertIsInstance(booking["schedule"]["trainer"], int)
+        self.assertIsInstance(booking["schedule"]["fitness_club"], int)
+
+
+class CompletePastBookingsTests(SlotTestCase):
+    clients_count = 7
+
+    def test_completes_only_past_active_bookings(self):
+        today = date.today()
+        statuses = [
+            BookingStatus.PENDING,
+            BookingStatus.CONFIRMED,
+            BookingStatus.CANCELLED,
+        ]
+        for i, client in enumerate(self.clients):
+            for days, status in [(-7 * (i + 1), statuses[i % 3]), (7, statuses[0])]:
+                Booking.objects.create(
+                    client=client,
+                    schedule=self.schedule,
+                    booking_date=today + timedelta(days=days),
+                    booking_time=time(10),
+                    status=status,
+                )
+
+        call_command("complete_past_bookings", batch_size=2, stdout=StringIO())
+
+        past = Booking.objects.filter(booking_date__lt=today)
+        self.assertEqual(past.filter(status=BookingStatus.COMPLETED).count(), 5)
+        self.assertEqual(past.filter(status=BookingStatus.CANCELLED).count(), 2)
+        self.assertFalse(
+            Booking.objects.filter(
+                booking_date__gt=today, status=BookingStatus.COMPLETED
+            ).exists()
+        )
+
+
+class BookingPartitionTests(SlotTestCase):
+    clients_count = 1
+
+    def test_stray_rows_move_to_new_partition_and_old_months_detach(self):
+        current = date.today().replace(day=1)
+        far_month = add_months(current, 36)
+        old_month = add_months(current, -1)
+        for booking_date in (far_month, old_month):
+            Booking.objects.create(
+                client=self.clients[0],
+                schedule=self.schedule,
+                booking_date=booking_date,
+                booking_time=time(10),
+            )
+
+        with connection.cursor() as cursor:
+            # секций на эти месяцы ещё нет
+            cursor.execute(f"SELECT count(*) FROM {DEFAULT_PARTITION}")
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+        created = ensure_partitions()
+        self.assertIn(partition_name(far_month), created)
+        self.assertIn(partition_name(old_month), created)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {DEFAULT_PARTITION}")
+            self.assertEqual(cursor.fetchone()[0], 0)
+            cursor.execute(f"SELECT count(*) FROM {partition_name(far_month)}")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+        self.assertEqual(detach_partitions(current), [partition_name(old_month)])
+        self.assertEqual(
+            list(Booking.objects.values_list("booking_date", flat=True)), [far_month]
+        )
+
+
+class WaitlistTests(SlotTestCase):
+    clients_count = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.slot = {
+            "schedule": cls.schedule,
+            "booking_date": cls.booking_date,
+            "booking_time": time(10),
+        }
+        cls.booking = Booking.objects.create(
+            client=cls.clients[0], status=BookingStatus.CONFIRMED, **cls.slot
+        )
+
+    def join(self, client):
+        api = APIClient()
+        api.force_authenticate(client)
+        return api.post(
+            "/api/bookings/waitlist/",
+            {
+                "schedule_id": self.schedule.id,
+                "booking_date": str(self.booking_date),
+                "booking_time": "10:00",
+            },
+            format="json",
+        )
+
+    def test_cancellation_promotes_head_of_queue(self):
+        for client in self.clients[1:]:
+            self.assertEqual(self.join(client).status_code, 201)
+
+        api = APIClient()
+        api.force_authenticate(self.clients[0])
+        response = api.delete(f"/api/bookings/bookings/{self.booking.id}/")
+        self.assertEqual(response.status_code, 204)
+
+        confirmed = Booking.objects.get(status=BookingStatus.CONFIRMED, **self.slot)
+        self.assertEqual(confirmed.client, self.clients[1])
+        self.assertEqual(
+            list(WaitlistEntry.objects.values_list("client", flat=True)),
+            [client.id for client in self.clients[2:]],
+        )
+
+    def test_free_slot_cannot_be_waitlisted(self):
+        self.booking.status = BookingStatus.CANCELLED
+        self.booking.save()
+        response = self.join(self.clients[1])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["schedule_id"][0].code, "slot_available")
+
+
+class SlotCapacityTests(SlotTestCase):
+    clients_count = 3
+    capacity = 2
+
+    def test_group_slot_accepts_confirmations_up_to_capacity(self):
+        clients = self.clients
+        slot = {
+            "schedule": self.schedule,
+            "booking_date": self.booking_date,
+            "booking_time": time(10),
+        }
+
+        def confirm(client):
+            return reserve(self.booking(client, status=BookingStatus.CONFIRMED))
+
+        first = confirm(clients[0])
+        confirm(clients[1])
+        with self.assertRaises(SlotAlreadyTaken):
+            confirm(clients[2])
+
+        first.status = BookingStatus.CANCELLED
+        first.save()
+        confirm(clients[2])
+        self.assertEqual(SlotOccupancy.objects.get(**slot).confirmed, 2)
+        self.assertEqual(
+            Booking.objects.filter(status=BookingStatus.CONFIRMED, **slot).count(), 2
+        )
+
+
+class ReservationTests(SlotTestCase):
+    def booking(self, client):
+        return super().booking(client, status=BookingStatus.CONFIRMED)
+
+    def test_taken_slot_is_rejected_with_conflict(self):
+        reserve(self.booking(self.clients[0]))
+        with self.assertRaises(SlotAlreadyTaken):
+            reserve(self.booking(self.clients[1]))
+
+        api = APIClient()
+        api.force_authenticate(self.clients[1])
+        response = api.post(
+            "/api/bookings/bookings/",
+            {
+                "client_id": self.clients[1].id,
+                "schedule_id": self.schedule.id,
+                "booking_date": str(self.booking_date),
+                "booking_time": "10:00",
+                "status": BookingStatus.CONFIRMED,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["detail"].code, "slot_already_taken")
+        self.assertEqual(Booking.objects.count(), 1)
+
+    @override_settings(BOOKING_RESERVATION_BACKOFF_MS=0)
+    def test_lock_timeout_is_retried(self):
+        self.schedule.capacity = 2
+        self.schedule.save()
+
+        class LockNotAvailable(Exception):
+            pgcode = "55P03"
+
+        lock_timeout = OperationalError("canceling statement due to lock timeout")
+        lock_timeout.__cause__ = LockNotAvailable()
+        apply = SlotOccupancy.objects.apply
+        calls = []
+
+        def flaky_apply(bookings, deleted=False):
+            # Первая попытка каждой записи падает уже после INSERT.
+            calls.append([booking.pk for booking in bookings])
+            if len(calls) % 2:
+                raise lock_timeout
+            return apply(bookings, deleted=deleted)
+
+        with mock.patch.object(SlotOccupancy.objects, "apply", flaky_apply):
+            booking = reserve(self.booking(self.clients[0]))
+            created = reserve_many([self.booking(self.clients[1])])
+
+        self.assertEqual(len(calls), 4)
+        self.assertTrue(all(pk is not None for pks in calls for pk in pks))
+        # Повтор вставляет запись заново, а не переиспользует откаченный pk.
+        self.assertNotEqual(calls[0], calls[1])
+        self.assertNotEqual(calls[2], calls[3])
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, BookingStatus.CONFIRMED)
+        self.assertEqual(Booking.objects.count(), 2)
+        self.assertEqual(
+            list(
+                BookingEvent.objects.order_by("id").values_list(
+                    "booking_id", "event_type"
+                )
+            ),
+            [
+                (booking.pk, BookingEventType.CREATED),
+                (created[0].pk, BookingEventType.CREATED),
+            ],
+        )
+        self.assertEqual(SlotOccupancy.objects.get(schedule=self.schedule).confirmed, 2)
+
+
+class BookingIdempotencyTests(SlotTestCase):
+    clients_count = 3
+    capacity = 2
+
+    def post(self, client, key, **payload):
+        api = APIClient()
+        api.force_authenticate(client)
+        return api.post(
+            "/api/bookings/bookings/",
+            {
+                "client_id": client.id,
+                "schedule_id": self.schedule.id,
+                "booking_date": str(self.booking_date),
+                "booking_time": "10:00",
+                "status": BookingStatus.CONFIRMED,
+                **payload,
+            },
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_replay_returns_stored_response(self):
+        first = self.post(self.clients[0], "key-1")
+        self.assertEqual(first.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", first)
+
+        with mock.patch("bookings.serializers.reserve") as reserve_mock:
+            replay = self.post(self.clients[0], "key-1")
+        reserve_mock.assert_not_called()
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_key_reuse_with_other_payload_is_rejected(self):
+        self.post(self.clients[0], "key-1")
+        response = self.post(self.clients[0], "key-1", booking_time="11:00")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_failed_request_releases_key(self):
+        past = self.post(
+            self.clients[0],
+            "key-1",
+            booking_date=str(self.booking_date - timedelta(weeks=2)),
+        )
+        self.assertEqual(past.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        for client in self.clients[1:]:
+            reserve(self.booking(client, status=BookingStatus.CONFIRMED))
+        taken = self.post(self.clients[0], "key-1")
+        self.assertEqual(taken.status_code, 409)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        cancelled = Booking.objects.get(client=self.clients[1])
+        cancelled.status = BookingStatus.CANCELLED
+        cancelled.save()
+        retry = self.post(self.clients[0], "key-1")
+        self.assertEqual(retry.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", retry)
+
+    def test_same_key_from_different_clients_does_not_replay(self):
+        first = self.post(self.clients[0], "key-1")
+        second = self.post(self.clients[1], "key-1")
+        self.assertEqual((first.status_code, second.status_code), (201, 201))
+        self.assertNotIn("Idempotent-Replayed", second)
+        self.assertNotEqual(first.data["id"], second.data["id"])
+        self.assertEqual(second.data["client"]["id"], self.clients[1].id)
+        self.assertEqual(IdempotencyKey.objects.count(), 2)
+
+
+class BookingBatchTests(SlotTestCase):
+    clients_count = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.taken = Booking.objects.create(
+            client=cls.clients[2],
+            schedule=cls.schedule,
+            booking_date=cls.booking_date,
+            booking_time=time(10),
+            status=BookingStatus.CONFIRMED,
+        )
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def item(self, client, booking_time="10:30", **extra):
+        return {
+            "client_id": client.id,
+            "schedule_id": self.schedule.id,
+            "booking_date": str(self.booking_date),
+            "booking_time": booking_time,
+            "status": BookingStatus.CONFIRMED,
+            **extra,
+        }
+
+    def test_errors_are_reported_per_item_and_nothing_is_created(self):
+        items = [
+            self.item(self.clients[0]),
+            self.item(self.clients[0]),
+            self.item(self.clients[0], schedule_id=0),
+            self.item(self.clients[0], booking_time="12:00"),
+            self.item(self.clients[0], booking_time="10:00"),
+            self.item(self.clients[1]),
+            self.item(self.clients[0], status=BookingStatus.PENDING),
+        ]
+        del items[1]["client_id"]
+        response = self.api.post(
+            "/api/bookings/bookings/batch/", {"bookings": items}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        errors = response.data["bookings"]
+        self.assertEqual(len(errors), len(items))
+        self.assertEqual(errors[0], {})
+        self.assertEqual(set(errors[1]), {"client_id"})
+        self.assertEqual(set(errors[2]), {"schedule_id"})
+        self.assertEqual(set(errors[3]), {"booking_time"})
+        # Слот заполнен записью из базы, следующий — подтверждением из пакета.
+        self.assertEqual(set(errors[4]), {"schedule_id"})
+        self.assertEqual(set(errors[5]), {"schedule_id"})
+        # Повторная запись того же клиента на слот в пределах пакета.
+        self.assertEqual(set(errors[6]), {"schedule_id"})
+        self.assertEqual(list(Booking.objects.all()), [self.taken])
+
+    def test_batch_is_created_all_or_nothing(self):
+        items = [
+            self.item(self.clients[0]),
+            self.item(
+                self.clients[1],
+                booking_date=str(self.booking_date + timedelta(weeks=1)),
+            ),
+        ]
+        serializer = BookingBatchSerializer(
+            data={"bookings": items},
+            context={"request": SimpleNamespace(user=self.admin)},
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        # Слот заняли между проверкой пакета и его записью.
+        Booking.objects.create(
+            client=self.clients[2],
+            schedule=self.schedule,
+            booking_date=self.booking_date,
+            booking_time=time(10, 30),
+            status=BookingStatus.CONFIRMED,
+        )
+        with self.assertRaises(SlotAlreadyTaken):
+            serializer.save()
+        self.assertFalse(Booking.objects.filter(client__in=self.clients[:2]).exists())
+
+        response = self.api.post(
+            "/api/bookings/bookings/batch/",
+            {"bookings": [items[1]]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Booking.objects.filter(client=self.clients[1]).count(), 1)
+
+
+class BookingSeriesTests(SlotTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.start_date = cls.booking_date
+        cls.client_user, cls.other_client = cls.clients
+        cls.dates = [cls.start_date + timedelta(weeks=week) for week in range(3)]
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def create_series(self, **extra):
+        return self.api.post(
+            "/api/bookings/series/",
+            {
+                "schedule_id": self.schedule.id,
+                "start_date": str(self.start_date),
+                "booking_time": "10:00",
+                "weeks": 3,
+                "status": BookingStatus.CONFIRMED,
+                **extra,
+            },
+            format="json",
+        )
+
+    def take_second_week(self):
+        Booking.objects.create(
+            client=self.other_client,
+            schedule=self.schedule,
+            booking_date=self.dates[1],
+            booking_time=time(10),
+            status=BookingStatus.CONFIRMED,
+        )
+
+    def test_series_expands_into_weekly_bookings(self):
+        response = self.create_series()
+        self.assertEqual(response.status_code, 201)
+        series = BookingSeries.objects.get(pk=response.data["id"])
+        self.assertEqual(
+            list(
+                series.bookings.order_by("booking_date").values_list(
+                    "client_id", "booking_date", "booking_time", "status"
+                )
+            ),
+            [
+                (self.client_user.id, day, time(10), BookingStatus.CONFIRMED)
+                for day in self.dates
+            ],
+        )
+        self.assertEqual(
+            sorted(item["booking_date"] for item in response.data["occurrences"]),
+            [str(day) for day in self.dates],
+        )
+
+    def test_conflicts_reject_series_unless_skipped(self):
+        self.take_second_week()
+
+        response = self.create_series()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(self.dates[1]), str(response.data["start_date"]))
+        self.assertFalse(BookingSeries.objects.exists())
+        self.assertFalse(Booking.objects.filter(client=self.client_user).exists())
+
+        response = self.create_series(skip_conflicts=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            sorted(
+                Booking.objects.filter(client=self.client_user).values_list(
+                    "booking_date", flat=True
+                )
+            ),
+            [self.dates[0], self.dates[2]],
+        )
+
+    def test_destroy_cancels_upcoming_bookings(self):
+        response = self.create_series()
+        series = BookingSeries.objects.get(pk=response.data["id"])
+        past = Booking.objects.create(
+            client=self.client_user,
+            schedule=self.schedule,
+            series=series,
+            booking_date=self.start_date - timedelta(weeks=2),
+            booking_time=time(10),
+            status=BookingStatus.COMPLETED,
+        )
+
+        response = self.api.delete(f"/api/bookings/series/{series.id}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(BookingSeries.objects.exists())
+        self.assertEqual(
+            set(
+                Booking.objects.filter(booking_date__gte=self.start_date).values_list(
+                    "status", flat=True
+                )
+            ),
+            {BookingStatus.CANCELLED},
+        )
+        past.refresh_from_db()
+        self.assertEqual(past.status, BookingStatus.COMPLETED)
+        self.assertEqual(
+            set(
+                SlotOccupancy.objects.filter(schedule=self.schedule).values_list(
+                    "confirmed", flat=True
+                )
+            ),
+            {0},
+        )
+        # Освободившиеся слоты снова доступны для записи.
+        self.take_second_week()
+
+
+class AvailabilityTests(SlotTestCase):
+    """
+    Свободные слоты считаются по тем же правилам, что и запись на слот.
+    """
+
+    end_time = time(11, 30)
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.client_user, cls.other_client = cls.clients
+
+    def index(self, day, now):
+        return AvailabilityIndex([self.schedule], day, day, slot_minutes=30, now=now)
+
+    def test_engine_matches_reservation_rule(self):
+        reserve(
+            Booking(
+                client=self.client_user,
+                schedule=self.schedule,
+                booking_date=self.booking_date,
+                booking_time=time(10, 30),
+                status=BookingStatus.CONFIRMED,
+            )
+        )
+        now = timezone.localtime()
+        self.assertEqual(
+            self.index(self.booking_date, now).free_slots(
+                self.schedule.id, self.booking_date
+            ),
+            [time(10), time(11)],
+        )
+
+        # Запись вне сетки (например, сделанная при другой длине слота)
+        # допустима и не занимает слоты сетки: запись на их начало проходит.
+        for client, booking_time in (
+            (self.other_client, time(10, 15)),
+            (self.client_user, time(10)),
+        ):
+            booking = Booking(
+                client=client,
+                schedule=self.schedule,
+                booking_date=self.booking_date,
+                booking_time=booking_time,
+                status=BookingStatus.CONFIRMED,
+            )
+            booking.clean()
+            reserve(booking)
+        self.assertEqual(
+            self.index(self.booking_date, now).free_slots(
+                self.schedule.id, self.booking_date
+            ),
+            [time(11)],
+        )
+
+        # Слоты, начало которых уже наступило, свободными не считаются.
+        during = timezone.make_aware(datetime.combine(self.booking_date, time(10, 40)))
+        self.assertEqual(
+            self.index(self.booking_date, during).free_slots(
+                self.schedule.id, self.booking_date
+            ),
+            [time(11)],
+        )
+        later = during + timedelta(days=1)
+        self.assertEqual(
+            self.index(self.booking_date, later).free_slots(
+                self.schedule.id, self.booking_date
+            ),
+            [],
+        )
+
+    def test_endpoint(self):
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        params = {
+            "fitness_club_id": self.club.id,
+            "date_from": str(self.booking_date),
+            "days": 1,
+        }
+
+        invalid = api.get(
+            "/api/bookings/availability/", {**params, "trainer_id": "abc"}
+        )
+        self.assertEqual(invalid.status_code, 400)
+        self.assertIn("trainer_id", invalid.data)
+
+        def free_slots():
+            response = api.get("/api/bookings/availability/", params)
+            self.assertEqual(response.status_code, 200)
+            return [
+                entry["free_slots"] for entry in response.data["days"][0]["schedules"]
+            ]
+
+        self.assertEqual(free_slots(), [["10:00:00", "10:30:00", "11:00:00"]])
+        response = api.post(
+            "/api/bookings/bookings/",
+            {
+                "client_id": self.client_user.id,
+                "schedule_id": self.schedule.id,
+                "booking_date": str(self.booking_date),
+                "booking_time": "10:30",
+                "status": BookingStatus.CONFIRMED,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(free_slots(), [["10:00:00", "11:00:00"]])
+
+
+class BookingEventOutboxTests(SlotTestCase):
+    clients_count = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.client_user = cls.clients[0]
+
+    def test_booking_lifecycle_is_recorded_and_served_as_feed(self):
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        response = api.post(
+            "/api/bookings/bookings/",
+            {
+                "schedule_id": self.schedule.id,
+                "client_id": self.client_user.id,
+                "booking_date": str(self.booking_date),
+                "booking_time": "10:00",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        booking_id = response.data["id"]
+        api.delete(f"/api/bookings/bookings/{booking_id}/")
+
+        admin_api = APIClient()
+        admin_api.force_authenticate(self.admin)
+        feed = admin_api.get("/api/bookings/events/").data["results"]
+        self.assertEqual(
+            [(event["booking_id"], event["event_type"]) for event in feed],
+            [(booking_id, "created"), (booking_id, "cancelled")],
+        )
+        self.assertEqual(feed[1]["payload"]["previous_status"], "pending")
+
+        after = admin_api.get(f"/api/bookings/events/?after={feed[0]['id']}")
+        self.assertEqual(
+            [event["id"] for event in after.data["results"]], [feed[1]["id"]]
+        )
+
+    def test_dispatch_retries_failed_batch_in_order(self):
+        for i in range(3):
+            Booking.objects.create(
+                client=self.client_user,
+                schedule=self.schedule,
+                booking_date=self.booking_date + timedelta(weeks=i),
+                booking_time=time(10),
+            )
+
+        def fail(events):
+            raise RuntimeError("недоступен")
+
+        self.assertEqual(dispatch_batch(2, deliver=fail), 0)
+        failed = BookingEvent.objects.filter(attempts=1)
+        self.assertEqual(failed.count(), 2)
+        # пока голова очереди ждёт повтора, следующие события не доставляются
+        self.assertEqual(dispatch_batch(2, deliver=lambda events: None), 0)
+
+        failed.update(next_attempt_at=None)
+        delivered = []
+        self.assertEqual(dispatch_batch(10, deliver=delivered.extend), 3)
+        self.assertEqual(
+            [event.id for event in delivered],
+            list(BookingEvent.objects.values_list("id", flat=True)),
+        )
+        self.assertFalse(BookingEvent.objects.filter(dispatched_at=None).exists())
+
+
+class BookingRollupTests(SlotTestCase):
+    clients_count = 3
+
+    def rollup(self):
+        return {
+            (row.schedule_id, row.date, row.status): row.count
+            for row in BookingRollup.objects.all()
+            if row.count
+        }
+
+    def grouped(self):
+        return {
+            (row["schedule_id"], row["booking_date"], row["status"]): row["total"]
+            for row in Booking.objects.values(
+                "schedule_id", "booking_date", "status"
+            ).annotate(total=Count("id"))
+        }
+
+    def test_rollup_follows_every_write_path(self):
+        first, second = reserve_many(
+            [
+                Booking(
+                    client=client,
+                    schedule=self.schedule,
+                    booking_date=self.booking_date,
+                    booking_time=time(10),
+                )
+                for client in self.clients[:2]
+            ]
+        )
+        third = Booking.objects.create(
+            client=self.clients[2],
+            schedule=self.schedule,
+            booking_date=self.booking_date + timedelta(weeks=1),
+            booking_time=time(10),
+        )
+        first.status = BookingStatus.CONFIRMED
+        first.save()
+        moved = Booking.objects.get(pk=third.pk)
+        moved.booking_date = self.booking_date
+        moved.status = BookingStatus.CANCELLED
+        moved.save()
+        Booking.objects.get(pk=second.pk).delete()
+
+        self.assertEqual(
+            self.rollup(),
+            {
+                (self.schedule.id, self.booking_date, "confirmed"): 1,
+                (self.schedule.id, self.booking_date, "cancelled"): 1,
+            },
+        )
+        self.assertEqual(self.rollup(), self.grouped())
+
+        # Правка в обход приложения исправляется пересчётом.
+        Booking.objects.filter(pk=first.pk).update(status=BookingStatus.COMPLETED)
+        call_command("rebuild_booking_rollups", stdout=StringIO())
+        self.assertEqual(self.rollup(), self.grouped())
+
+        # Тренер и клуб в сводке следуют за расписанием.
+        other_club = FitnessClub.objects.create(name="Другой клуб")
+        self.schedule.fitness_club = other_club
+        self.schedule.save()
+        self.assertEqual(
+            set(BookingRollup.objects.values_list("fitness_club_id", flat=True)),
+            {other_club.id},
+        )
+
+    def test_stats_endpoint_reads_rollup(self):
+        for client in self.clients:
+            Booking.objects.create(
+                client=client,
+                schedule=self.schedule,
+                booking_date=self.booking_date,
+                booking_time=time(10),
+                status=(
+                    BookingStatus.CONFIRMED
+                    if client == self.clients[0]
+                    else BookingStatus.PENDING
+                ),
+            )
+
+        api = APIClient()
+        api.force_authenticate(self.admin)
+        # Один запрос к сводке, таблица записей не читается.
+        with self.assertNumQueries(1):
+            response = api.get(
+                "/api/bookings/stats/",
+                {
+                    "date_from": str(self.booking_date),
+                    "date_to": str(self.booking_date),
+                    "group_by": "day,trainer",
+                },
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["rows"],
+            [
+                {
+                    "date": str(self.booking_date),
+                    "trainer_id": self.trainer.id,
+                    "counts": {
+                        "pending": 2,
+                        "confirmed": 1,
+                        "cancelled": 0,
+                        "completed": 0,
+                    },
+                    "total": 3,
+                }
+            ],
+        )
+
+        invalid = api.get("/api/bookings/stats/", {"group_by": "week"})
+        self.assertEqual(invalid.status_code, 400)
+
+        client_api = APIClient()
+        client_api.force_authenticate(self.clients[0])
+        self.assertEqual(client_api.get("/api/bookings/stats/").status_code, 403)
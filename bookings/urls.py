@@ -1,10 +1,22 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BookingViewSet
+from .views import (
+    AvailabilityView,
+    BookingEventViewSet,
+    BookingViewSet,
+    BookingSeriesViewSet,
+    BookingStatsView,
+    WaitlistViewSet,
+)
 
 router = DefaultRouter()
 router.register(r"bookings", BookingViewSet)  # Маршруты для записей на тренировки
+router.register(r"series", BookingSeriesViewSet)  # Еженедельные серии записей
+router.register(r"waitlist", WaitlistViewSet)  # Очередь ожидания занятых слотов
+router.register(r"events", BookingEventViewSet)  # Лента изменений записей
 
 urlpatterns = [
+    path("availability/", AvailabilityView.as_view(), name="availability"),
+    path("stats/", BookingStatsView.as_view(), name="booking-stats"),
     path("", include(router.urls)),
 ]
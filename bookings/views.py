@@ -1,14 +1,71 @@
-from rest_framework import viewsets, permissions as drf_permissions
-from .models import Booking, BookingStatus
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from fitness_backend.conditional import ConditionalGetMixin
+from fitness_backend.idempotency import IdempotentCreateMixin
+from fitness_backend.prefetch import OptimizedQuerysetMixin, prefetch_for_serializer
+from schedule.models import Schedule
+from .availability import AvailabilityIndex
+from .export import EXPORT_FORMATS, export_response
+from .models import (
+    Booking,
+    BookingEvent,
+    BookingSeries,
+    BookingRollup,
+    BookingStatus,
+    WaitlistEntry,
+    record_booking_changes,
+)
 from . import permissions as local_permissions
-from .serializers import BookingSerializer
+from .serializers import (
+    AvailabilitySerializer,
+    BookingSerializer,
+    BookingBatchSerializer,
+    BookingEventSerializer,
+    BookingSeriesSerializer,
+    BookingStatsSerializer,
+    WaitlistEntrySerializer,
+)
+from .waitlist import booking_slot, promote_waitlist
 from users.models import Role
-from .schemas import booking_extend_schema_view
+from .schemas import (
+    availability_extend_schema,
+    booking_events_extend_schema_view,
+    booking_extend_schema_view,
+    booking_series_extend_schema_view,
+    booking_stats_extend_schema,
+    waitlist_extend_schema_view,
+)
+
+MAX_AVAILABILITY_DAYS = 31
+MAX_STATS_DAYS = 366
+
+# Разрез статистики -> поле сводки.
+STATS_GROUPS = {
+    "day": "date",
+    "trainer": "trainer_id",
+    "fitness_club": "fitness_club_id",
+}
 
 
 @booking_extend_schema_view
-class BookingViewSet(viewsets.ModelViewSet):
-    queryset = Booking.objects.all().order_by("-booking_date", "-booking_time")
+class BookingViewSet(
+    IdempotentCreateMixin,
+    ConditionalGetMixin,
+    OptimizedQuerysetMixin,
+    viewsets.ModelViewSet,
+):
+    idempotency_scope = "bookings.create"
+    queryset = Booking.objects.all().order_by("-booking_date", "-booking_time", "-id")
+    ordering = ("-booking_date", "-booking_time", "-id")
     serializer_class = BookingSerializer
     permission_classes = [local_permissions.IsAdminOrClientOwnerOrTrainerOfSchedule]
 
@@ -42,6 +99,29 @@ class BookingViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    @action(detail=False, methods=["post"], serializer_class=BookingBatchSerializer)
+    def batch(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        bookings = serializer.save()
+        response_serializer = BookingSerializer(
+            bookings, many=True, context=self.get_serializer_context()
+        )
+        prefetch_for_serializer(bookings, response_serializer.child)
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                {"export_format": f"Допустимые значения: {', '.join(EXPORT_FORMATS)}."}
+            )
+        # Те же фильтры, что и у списка; связи для сериализатора не нужны —
+        # выгрузка читает столбцы напрямую.
+        queryset = self.get_queryset().prefetch_related(None)
+        return export_response(queryset, export_format)
+
     def perform_create(self, serializer):
 
         if self.request.user.role == Role.CLIENT:
@@ -53,30 +133,41 @@ class BookingViewSet(viewsets.ModelViewSet):
 
         if self.request.user.role == Role.CLIENT and not self.request.user.is_staff:
             if serializer.instance.client != self.request.user:
-                raise drf_permissions.PermissionDenied(
-                    "Вы можете обновлять только свои записи."
-                )
+                raise PermissionDenied("Вы можете обновлять только свои записи.")
             if (
                 "status" in serializer.validated_data
                 and serializer.validated_data["status"] != BookingStatus.CANCELLED
             ):
-                raise drf_permissions.PermissionDenied(
-                    "Вы можете только отменить свою запись."
-                )
+                raise PermissionDenied("Вы можете только отменить свою запись.")
 
             if serializer.instance.status in [
                 BookingStatus.COMPLETED,
                 BookingStatus.CANCELLED,
             ]:
-                raise drf_permissions.PermissionDenied(
+                raise PermissionDenied(
                     f"Невозможно изменить статус записи, которая уже '{serializer.instance.get_status_display()}'."
                 )
-        serializer.save()
+
+        # Если подтверждённая запись отменена или перенесена, освободившийся
+        # слот в той же транзакции отдаётся первому клиенту из очереди ожидания.
+        was_confirmed = serializer.instance.status == BookingStatus.CONFIRMED
+        old_slot = booking_slot(serializer.instance)
+        with transaction.atomic():
+            booking = serializer.save()
+            if was_confirmed and (
+                booking.status != BookingStatus.CONFIRMED
+                or booking_slot(booking) != old_slot
+            ):
+                promote_waitlist([old_slot])
 
     def perform_destroy(self, instance):
 
+        was_confirmed = instance.status == BookingStatus.CONFIRMED
         if self.request.user.is_staff:
-            instance.delete()
+            with transaction.atomic():
+                instance.delete()
+                if was_confirmed:
+                    promote_waitlist([booking_slot(instance)])
         elif (
             self.request.user.role == Role.CLIENT
             and instance.client == self.request.user
@@ -85,13 +176,298 @@ class BookingViewSet(viewsets.ModelViewSet):
                 BookingStatus.COMPLETED,
                 BookingStatus.CANCELLED,
             ]:
-                instance.status = BookingStatus.CANCELLED
-                instance.save()
+                with transaction.atomic():
+                    instance.status = BookingStatus.CANCELLED
+                    instance.save()
+                    if was_confirmed:
+                        promote_waitlist([booking_slot(instance)])
             else:
-                raise drf_permissions.PermissionDenied(
+                raise PermissionDenied(
                     f"Невозможно отменить запись, которая уже '{instance.get_status_display()}' или завершена."
                 )
         else:
-            raise drf_permissions.PermissionDenied(
-                "У вас нет прав для удаления этой записи."
+            raise PermissionDenied("У вас нет прав для удаления этой записи.")
+
+
+@booking_series_extend_schema_view
+class BookingSeriesViewSet(
+    OptimizedQuerysetMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = BookingSeries.objects.all().order_by(
+        "-start_date", "-booking_time", "-id"
+    )
+    ordering = ("-start_date", "-booking_time", "-id")
+    serializer_class = BookingSeriesSerializer
+    permission_classes = [local_permissions.IsAdminOrSeriesOwner]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if (
+            self.request.user.is_authenticated
+            and self.request.user.role == Role.CLIENT
+            and not self.request.user.is_staff
+        ):
+            queryset = queryset.filter(client=self.request.user)
+        elif (
+            self.request.user.is_authenticated
+            and self.request.user.role == Role.TRAINER
+            and not self.request.user.is_staff
+        ):
+            queryset = queryset.filter(schedule__trainer__user=self.request.user)
+
+        return queryset
+
+    def perform_destroy(self, instance):
+        # Отмена серии: предстоящие занятия отменяются, прошедшие остаются в истории.
+        with transaction.atomic():
+            upcoming = list(
+                instance.bookings.filter(
+                    booking_date__gte=timezone.now().date(),
+                    status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
+                ).select_for_update()
+            )
+            released = [
+                booking_slot(booking)
+                for booking in upcoming
+                if booking.status == BookingStatus.CONFIRMED
+            ]
+            Booking.objects.filter(id__in=[booking.id for booking in upcoming]).update(
+                status=BookingStatus.CANCELLED, updated_at=timezone.now()
+            )
+            for booking in upcoming:
+                booking.status = BookingStatus.CANCELLED
+            record_booking_changes(upcoming)
+            instance.delete()
+            promote_waitlist(released)
+
+
+@waitlist_extend_schema_view
+class WaitlistViewSet(
+    OptimizedQuerysetMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = WaitlistEntry.objects.all().order_by(
+        "booking_date", "booking_time", "id"
+    )
+    ordering = ("booking_date", "booking_time", "id")
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [local_permissions.IsAdminOrWaitlistOwner]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if (
+            self.request.user.is_authenticated
+            and self.request.user.role == Role.CLIENT
+            and not self.request.user.is_staff
+        ):
+            queryset = queryset.filter(client=self.request.user)
+        elif (
+            self.request.user.is_authenticated
+            and self.request.user.role == Role.TRAINER
+            and not self.request.user.is_staff
+        ):
+            queryset = queryset.filter(schedule__trainer__user=self.request.user)
+
+        schedule_id = self.request.query_params.get("schedule_id")
+        if schedule_id:
+            queryset = queryset.filter(schedule_id=schedule_id)
+
+        booking_date = self.request.query_params.get("booking_date")
+        if booking_date:
+            queryset = queryset.filter(booking_date=booking_date)
+
+        return queryset
+
+
+@booking_events_extend_schema_view
+class BookingEventViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Лента изменений записей: события outbox по возрастанию ID. Потребитель
+    запоминает ID последнего обработанного события и запрашивает только новые.
+    """
+
+    queryset = BookingEvent.objects.all()
+    ordering = ("id",)
+    serializer_class = BookingEventSerializer
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        queryset = BookingEvent.objects.visible().order_by("id")
+
+        after = self.request.query_params.get("after")
+        if after:
+            try:
+                queryset = queryset.filter(id__gt=int(after))
+            except ValueError:
+                raise ValidationError({"after": "Ожидается целое число."})
+
+        booking_id = self.request.query_params.get("booking_id")
+        if booking_id:
+            queryset = queryset.filter(booking_id=booking_id)
+
+        event_type = self.request.query_params.get("event_type")
+        if event_type:
+            queryset = queryset.filter(event_type=event_type)
+
+        return queryset
+
+
+@availability_extend_schema
+class AvailabilityView(APIView):
+    """
+    Свободные слоты всех активных расписаний клуба за период (по умолчанию неделя).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        errors = {}
+
+        try:
+            fitness_club_id = int(params["fitness_club_id"])
+        except KeyError:
+            errors["fitness_club_id"] = "Обязательный параметр."
+        except ValueError:
+            errors["fitness_club_id"] = "Ожидается целое число."
+
+        trainer_id = None
+        if params.get("trainer_id"):
+            try:
+                trainer_id = int(params["trainer_id"])
+            except ValueError:
+                errors["trainer_id"] = "Ожидается целое число."
+
+        date_from = timezone.localdate()
+        if params.get("date_from"):
+            try:
+                date_from = datetime.strptime(params["date_from"], "%Y-%m-%d").date()
+            except ValueError:
+                errors["date_from"] = "Неверный формат даты. Используйте YYYY-MM-DD."
+
+        try:
+            days = int(params.get("days", 7))
+            if not 1 <= days <= MAX_AVAILABILITY_DAYS:
+                raise ValueError
+        except ValueError:
+            errors["days"] = f"Ожидается число от 1 до {MAX_AVAILABILITY_DAYS}."
+
+        if errors:
+            raise ValidationError(errors)
+
+        schedules = Schedule.objects.filter(
+            fitness_club_id=fitness_club_id, is_active=True
+        ).select_related("trainer__user")
+        if trainer_id is not None:
+            schedules = schedules.filter(trainer_id=trainer_id)
+
+        date_to = date_from + timedelta(days=days - 1)
+        index = AvailabilityIndex(schedules, date_from, date_to)
+        data = {
+            "fitness_club_id": fitness_club_id,
+            "date_from": date_from,
+            "date_to": date_to,
+            "slot_minutes": index.slot_minutes,
+            "days": [
+                {
+                    "date": day,
+                    "schedules": [
+                        {"schedule": schedule, "free_slots": free_slots}
+                        for schedule, free_slots in entries
+                    ],
+                }
+                for day, entries in index.by_day()
+            ],
+        }
+        return Response(AvailabilitySerializer(data).data)
+
+
+@booking_stats_extend_schema
+class BookingStatsView(APIView):
+    """
+    Число записей по статусам в разрезе дней, тренеров и клубов.
+    Читает только сводку ``BookingRollup``, без группировки по таблице записей.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        errors = {}
+
+        today = timezone.localdate()
+        dates = {"date_from": today - timedelta(days=30), "date_to": today}
+        for name in dates:
+            if params.get(name):
+                try:
+                    dates[name] = datetime.strptime(params[name], "%Y-%m-%d").date()
+                except ValueError:
+                    errors[name] = "Неверный формат даты. Используйте YYYY-MM-DD."
+        date_from, date_to = dates["date_from"], dates["date_to"]
+        if not errors and not 0 <= (date_to - date_from).days < MAX_STATS_DAYS:
+            errors["date_to"] = (
+                f"Период должен начинаться не позже конца и быть не длиннее "
+                f"{MAX_STATS_DAYS} дней."
+            )
+
+        group_by = [
+            name.strip()
+            for name in params.get("group_by", ",".join(STATS_GROUPS)).split(",")
+            if name.strip()
+        ]
+        if not group_by or set(group_by) - set(STATS_GROUPS):
+            errors["group_by"] = (
+                f"Допустимые значения через запятую: {', '.join(STATS_GROUPS)}."
+            )
+
+        filters = {}
+        for name in ("fitness_club_id", "trainer_id"):
+            if params.get(name):
+                try:
+                    filters[name] = int(params[name])
+                except ValueError:
+                    errors[name] = "Ожидается целое число."
+
+        if errors:
+            raise ValidationError(errors)
+
+        fields = list(dict.fromkeys(STATS_GROUPS[name] for name in group_by))
+        totals = (
+            BookingRollup.objects.filter(
+                date__gte=date_from, date__lte=date_to, **filters
             )
+            .values(*fields, "status")
+            .annotate(total=Sum("count"))
+            .order_by(*fields)
+        )
+        rows = {}
+        for item in totals:
+            key = tuple(item[field] for field in fields)
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = {
+                    **{field: item[field] for field in fields},
+                    "counts": dict.fromkeys(BookingStatus.values, 0),
+                    "total": 0,
+                }
+            row["counts"][item["status"]] += item["total"]
+            row["total"] += item["total"]
+
+        data = {
+            "date_from": date_from,
+            "date_to": date_to,
+            "group_by": group_by,
+            "rows": list(rows.values()),
+        }
+        return Response(BookingStatsSerializer(data).data)
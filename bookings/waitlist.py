@@ -0,0 +1,67 @@
+"""
+Лист ожидания занятых слотов.
+
+Когда подтверждённая запись отменяется, удаляется или переносится на другой
+слот, освободившийся слот в той же транзакции отдаётся первому клиенту из
+очереди ожидания. Голова очереди выбирается по индексу
+``(schedule, booking_date, booking_time, id)``, поэтому стоимость продвижения
+не зависит от длины очереди.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .exceptions import SlotAlreadyTaken
+from .models import Booking, BookingStatus, SlotOccupancy, WaitlistEntry
+
+
+def booking_slot(booking):
+    return booking.schedule_id, booking.booking_date, booking.booking_time
+
+
+def promote_waitlist(slots):
+    """
+    Подтверждает первого клиента очереди для каждого освободившегося слота
+    ``(schedule_id, booking_date, booking_time)``.
+
+    Подтверждение проходит через тот же счётчик занятости, что и обычное
+    бронирование: если параллельная запись успела заполнить слот, очередь
+    этого слота не продвигается. Если у клиента уже есть (например,
+    отменённая) запись на этот слот, она подтверждается повторно.
+    Прошедшие слоты пропускаются. Возвращает список подтверждённых записей.
+    """
+    today = timezone.localdate()
+    slots = sorted({slot for slot in slots if slot[1] >= today})
+    promoted = []
+    if not slots:
+        return promoted
+
+    with transaction.atomic():
+        for schedule_id, booking_date, booking_time in slots:
+            slot = {
+                "schedule_id": schedule_id,
+                "booking_date": booking_date,
+                "booking_time": booking_time,
+            }
+            if SlotOccupancy.objects.full().filter(**slot).exists():
+                continue
+            entry = (
+                WaitlistEntry.objects.filter(**slot)
+                .order_by("id")
+                .select_for_update(skip_locked=True)
+                .first()
+            )
+            if entry is None:
+                continue
+            try:
+                with transaction.atomic():
+                    booking, _ = Booking.objects.update_or_create(
+                        client_id=entry.client_id,
+                        **slot,
+                        defaults={"status": BookingStatus.CONFIRMED},
+                    )
+                    entry.delete()
+            except SlotAlreadyTaken:
+                continue
+            promoted.append(booking)
+    return promoted
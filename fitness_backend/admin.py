@@ -0,0 +1,69 @@
+"""
+Общие инструменты админки для больших таблиц.
+
+``EstimatedCountPaginator`` не считает ``COUNT(*)`` по всей таблице: для списка
+без фильтров берётся оценка числа строк из статистики PostgreSQL
+(``pg_class.reltuples``, для секционированной таблицы — сумма по секциям),
+а для отфильтрованного — ограниченный подсчёт не дальше
+``ADMIN_EXACT_COUNT_LIMIT`` строк, после которого используется оценка
+планировщика. Небольшие таблицы и выборки по-прежнему считаются точно.
+"""
+
+import json
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def table_estimate(queryset):
+    """
+    Оценка числа строк таблицы модели по статистике PostgreSQL. Для таблицы,
+    которая ещё ни разу не анализировалась, возвращает 0.
+    """
+    table = queryset.model._meta.db_table
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint "
+            "FROM pg_class c "
+            "WHERE c.oid = to_regclass(%s) "
+            "OR c.oid IN (SELECT inhrelid FROM pg_inherits "
+            "WHERE inhparent = to_regclass(%s))",
+            [table, table],
+        )
+        return cursor.fetchone()[0]
+
+
+def plan_estimate(queryset):
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        if not queryset.query.where:
+            estimate = table_estimate(queryset)
+            if estimate > limit:
+                return estimate
+            return queryset.count()
+
+        bounded = queryset.order_by()[: limit + 1].count()
+        if bounded <= limit:
+            return bounded
+        return max(plan_estimate(queryset), bounded)
+
+
+class EstimatedCountAdmin(admin.ModelAdmin):
+    """
+    Базовый класс админки большой таблицы: приблизительное число строк
+    в пагинаторе и без повторного подсчёта всей таблицы рядом с результатами
+    поиска.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
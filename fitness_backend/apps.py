@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.core import checks
+
+
+class FitnessBackendConfig(AppConfig):
+    name = "fitness_backend"
+
+    def ready(self):
+        from .cache import check_shared_cache
+
+        checks.register(check_shared_cache, checks.Tags.caches, deploy=True)
@@ -0,0 +1,57 @@
+"""
+Сброс кэшированных данных при изменении их источника.
+
+Записи, зависящие от объекта, хранятся под ключом с версией этого объекта
+(``cache_version``): версия — случайная строка в кэше без срока жизни,
+и её удаление разом делает недостижимыми все записи объекта. Записи
+с фиксированными ключами сбрасываются удалением самих ключей.
+
+Ключи удаляются (``invalidate_keys``) сразу и ещё раз после фиксации
+транзакции: иначе параллельный промах, прочитавший данные до фиксации,
+оставил бы их в кэше под актуальным ключом. Сброс действует на все процессы,
+только если кэш общий (Redis, Memcached): с кэшем в памяти процесса воркеры,
+не обработавшие изменение, продолжают отдавать прежние данные — об этом
+предупреждает проверка ``check_shared_cache`` (``check --deploy``).
+"""
+
+from uuid import uuid4
+
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+def cache_version(key):
+    """
+    Текущая версия под ключом ``key``; отсутствующая версия создаётся.
+    """
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate_keys(keys):
+    keys = list(keys)
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def check_shared_cache(app_configs, **kwargs):
+    if not isinstance(caches["default"], LocMemCache):
+        return []
+    return [
+        checks.Warning(
+            "Кэш по умолчанию хранится в памяти процесса: кэши расписаний клубов, "
+            "членства тренеров и календарей .ics сбрасываются только в воркере, "
+            "изменившем данные, остальные отдают устаревшие ответы.",
+            hint="Укажите общий кэш в CACHE_URL (например, redis://redis:6379/1) "
+            "или запускайте один воркер.",
+            id="fitness_backend.W001",
+        )
+    ]
@@ -0,0 +1,157 @@
+"""
+Условные GET-запросы (ETag / Last-Modified) для list и retrieve.
+
+Валидаторы строятся без сериализации и без отдельных запросов — по уже
+загруженным строкам: для списка — по объектам текущей страницы, для
+объекта — по ``get_object()``, в обоих случаях вместе со связями, которые
+выводят вложенные сериализаторы (``updated_at`` и первичные ключи). Если
+клиент прислал совпадающий ``If-None-Match`` (или ``If-Modified-Since``),
+возвращается 304 без тела.
+"""
+
+from hashlib import md5
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .prefetch import related_lookups
+
+TIMESTAMP_FIELD = "updated_at"
+
+
+def related_model(model, path):
+    for attr in path.split("__"):
+        model = model._meta.get_field(attr).related_model
+    return model
+
+
+def has_timestamp(model):
+    try:
+        model._meta.get_field(TIMESTAMP_FIELD)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def timestamp_paths(serializer):
+    """
+    Пути (в нотации ORM) до моделей с ``updated_at``, которые выводит
+    сериализатор, включая саму модель (пустой путь).
+    """
+    model = serializer.Meta.model
+    select, prefetch = related_lookups(serializer)
+    paths = [""] if has_timestamp(model) else []
+    paths += [
+        path
+        for path in dict.fromkeys(select + prefetch)
+        if has_timestamp(related_model(model, path))
+    ]
+    return paths
+
+
+def related_objects(instance, path):
+    objects = [instance]
+    for attr in path.split("__") if path else []:
+        related = []
+        for obj in objects:
+            value = getattr(obj, attr, None)
+            if value is None:
+                continue
+            if hasattr(value, "all"):
+                related.extend(value.all())
+            else:
+                related.append(value)
+        objects = related
+    return objects
+
+
+def loaded_validators(objects, paths):
+    """
+    ``updated_at`` и первичные ключи объектов и их связей по путям ``paths``.
+    Первичные ключи учитывают удаление и замену строк, которые не меняют
+    ``Max(updated_at)``.
+    """
+    timestamps, identities = [], []
+    for path in paths:
+        related = [item for obj in objects for item in related_objects(obj, path)]
+        timestamps.extend(getattr(item, TIMESTAMP_FIELD) for item in related)
+        identities.append(".".join(str(item.pk) for item in related))
+    return timestamps, identities
+
+
+class ConditionalGetMixin:
+    """
+    Примесь для GenericAPIView: ETag и Last-Modified для list и retrieve.
+
+    ETag зависит от адреса запроса (фильтры, курсор, ``fields``/``expand``),
+    пользователя, формата ответа и валидаторов загруженных строк. Для списка
+    страница выбирается как обычно (по индексу, без подсчёта строк), 304
+    экономит сериализацию и передачу тела; ``Last-Modified`` у списков
+    носит справочный характер.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objects = list(queryset) if page is None else page
+        timestamps, identities = loaded_validators(
+            objects, timestamp_paths(self.get_serializer())
+        )
+
+        def render():
+            data = self.get_serializer(objects, many=True).data
+            if page is None:
+                return Response(data)
+            return self.get_paginated_response(data)
+
+        return self.conditional_response(
+            request, timestamps, identities, render, use_date=False
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        timestamps, identities = loaded_validators(
+            [instance], timestamp_paths(self.get_serializer())
+        )
+        return self.conditional_response(
+            request,
+            timestamps,
+            identities,
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    def conditional_response(
+        self, request, timestamps, identities, render, use_date=True
+    ):
+        timestamps = [timestamp for timestamp in timestamps if timestamp]
+        last_modified = int(max(timestamps).timestamp()) if timestamps else None
+        etag = self.make_etag(request, timestamps, identities)
+
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified if use_date else None,
+        )
+        if response is None:
+            response = render()
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        # Ответ зависит от пользователя: кэшировать только на клиенте
+        # и каждый раз проверять актуальность.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def make_etag(self, request, timestamps, identities):
+        media_type = getattr(request, "accepted_media_type", "")
+        parts = [
+            request.get_full_path(),
+            str(request.user.pk),
+            media_type,
+            max(timestamps).isoformat() if timestamps else "",
+            ",".join(map(str, identities)),
+        ]
+        digest = md5("|".join(parts).encode(), usedforsecurity=False).hexdigest()
+        return quote_etag(digest)
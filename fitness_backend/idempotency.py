@@ -0,0 +1,129 @@
+"""
+Идемпотентные POST-запросы по заголовку ``Idempotency-Key``.
+
+Первый запрос с ключом выполняется как обычно, а его ответ сохраняется на
+``IDEMPOTENCY_KEY_TTL_HOURS`` часов. Повтор с тем же ключом получает
+сохранённый ответ: сериализаторы, проверки и хеширование пароля повторно
+не выполняются. Сохраняются только успешные ответы: после ошибки (400, 409,
+5xx) ключ освобождается, и запрос можно повторить с тем же ключом.
+"""
+
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from users.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeyInProgress(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = (
+        "Запрос с этим ключом идемпотентности ещё выполняется. Повторите позже."
+    )
+    default_code = "idempotency_key_in_progress"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = (
+        "Ключ идемпотентности уже использован для запроса с другими данными."
+    )
+    default_code = "idempotency_key_reused"
+
+
+def request_fingerprint(request):
+    data = request.data
+    if hasattr(data, "lists"):
+        data = dict(data.lists())
+    payload = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder, default=str)
+    return salted_hmac("idempotency-key", payload).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """
+    Примесь для представлений с ``create()``: учитывает заголовок
+    ``Idempotency-Key``. Ключи разделяются по ``idempotency_scope`` и
+    пользователю, так что одинаковые ключи разных клиентов не пересекаются.
+    """
+
+    idempotency_scope = None
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValidationError(
+                {
+                    IDEMPOTENCY_HEADER: f"Ключ должен содержать от 1 до {MAX_KEY_LENGTH} символов."
+                }
+            )
+
+        record, replay = self.claim_idempotency_key(request, key)
+        if replay is not None:
+            return replay
+
+        try:
+            response = super().create(request, *args, **kwargs)
+        except BaseException:
+            record.delete()
+            raise
+
+        if status.is_success(response.status_code):
+            record.status_code = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=["status_code", "response_body"])
+        else:
+            record.delete()
+        return response
+
+    def claim_idempotency_key(self, request, key):
+        """
+        Занимает ключ для текущего запроса. Возвращает пару
+        ``(запись ключа, None)`` для нового запроса или ``(None, ответ)`` для
+        повтора уже выполненного.
+        """
+        user = request.user if request.user.is_authenticated else None
+        fingerprint = request_fingerprint(request)
+        now = timezone.now()
+        lookup = {"key": key, "scope": self.idempotency_scope, "user": user}
+
+        try:
+            with transaction.atomic():
+                return (
+                    IdempotencyKey.objects.create(
+                        **lookup,
+                        fingerprint=fingerprint,
+                        expires_at=now
+                        + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+                    ),
+                    None,
+                )
+        except IntegrityError:
+            pass
+
+        record = IdempotencyKey.objects.filter(**lookup).first()
+        if record is None or record.expires_at <= now:
+            # Ключ истёк (или был освобождён после ошибки): занимаем заново.
+            IdempotencyKey.objects.filter(**lookup, expires_at__lte=now).delete()
+            return self.claim_idempotency_key(request, key)
+        if record.fingerprint != fingerprint:
+            raise IdempotencyKeyReused()
+        if record.status_code is None:
+            raise IdempotencyKeyInProgress()
+
+        response = Response(record.response_body, status=record.status_code)
+        response[REPLAYED_HEADER] = "true"
+        return None, response
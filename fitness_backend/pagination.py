@@ -0,0 +1,152 @@
+"""
+Keyset-пагинация (по значениям ключа сортировки) для всех списков API.
+
+В отличие от ``CursorPagination`` из DRF, курсор хранит значения всех полей
+сортировки последнего объекта страницы, а следующая страница выбирается
+условием «строго после этих значений». Поэтому глубокие страницы обходятся
+так же дёшево, как первая (поиск по индексу без OFFSET), а ``COUNT(*)``
+не выполняется вовсе.
+"""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Представление задаёт порядок атрибутом ``ordering`` — кортежем полей,
+    последнее из которых уникально (обычно ``id``/``-id``). Поля сортировки
+    не должны принимать значение NULL.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = ("-id",)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "ordering", None) or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor["reverse"])
+
+        ordering = self.reverse_ordering() if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.cursor:
+            queryset = queryset.filter(self.after(ordering, self.cursor["values"]))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = self.cursor is not None, has_more
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def reverse_ordering(self):
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        )
+
+    def after(self, ordering, values):
+        """
+        Условие «строго после ``values``» в порядке ``ordering``:
+        ``(a > x) OR (a = x AND b > y) OR ...``, дополненное ``a >= x``,
+        чтобы планировщик мог начать поиск с нужного места индекса.
+        """
+        fields = [field.lstrip("-") for field in ordering]
+        lookups = ["lt" if field.startswith("-") else "gt" for field in ordering]
+        branches = []
+        for i, (field, lookup) in enumerate(zip(fields, lookups)):
+            equal = {fields[j]: values[j] for j in range(i)}
+            branches.append(Q(**equal, **{f"{field}__{lookup}": values[i]}))
+        leading = Q(**{f"{fields[0]}__{lookups[0]}e": values[0]})
+        return reduce(and_, [leading, reduce(or_, branches)])
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(
+            {"values": self.position(self.page[-1]), "reverse": False}
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(
+            {"values": self.position(self.page[0]), "reverse": True}
+        )
+
+    def position(self, instance):
+        values = []
+        for field in self.ordering:
+            value = instance
+            for attr in field.lstrip("-").split("__"):
+                value = getattr(value, attr)
+            values.append(value)
+        return values
+
+    def model_field(self, path):
+        model, field = self.model, None
+        for attr in path.split("__"):
+            field = model._meta.get_field(attr)
+            model = field.related_model
+        return field.target_field if field.is_relation else field
+
+    def encode_cursor(self, cursor):
+        payload = json.dumps(
+            [cursor["values"], int(cursor["reverse"])],
+            cls=DjangoJSONEncoder,
+            separators=(",", ":"),
+        )
+        encoded = urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            raw_values, reverse = json.loads(urlsafe_b64decode(padded.encode()))
+            if len(raw_values) != len(self.ordering):
+                raise ValueError
+            values = [
+                self.model_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, raw_values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return {"values": values, "reverse": bool(reverse)}
@@ -0,0 +1,55 @@
+from drf_spectacular.utils import OpenApiParameter
+
+from .idempotency import IDEMPOTENCY_HEADER
+from .serializers import EXPAND_PARAM, FIELDS_PARAM
+
+fields_param = OpenApiParameter(
+    name=FIELDS_PARAM,
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description=(
+        "Список полей ответа через запятую; вложенные поля указываются через точку "
+        "(например, 'id,status,schedule.start_time')."
+    ),
+)
+
+expand_param = OpenApiParameter(
+    name=EXPAND_PARAM,
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description=(
+        "Связи, которые нужно развернуть, через запятую (например, 'schedule.trainer'). "
+        "Остальные вложенные объекты выводятся как ID. Без параметра разворачиваются все связи."
+    ),
+)
+
+idempotency_key_param = OpenApiParameter(
+    name=IDEMPOTENCY_HEADER,
+    type=str,
+    location=OpenApiParameter.HEADER,
+    description=(
+        "Уникальный ключ запроса (например, UUID). Повтор запроса с тем же ключом "
+        "возвращает сохранённый ответ вместо повторного выполнения; такой ответ "
+        "помечается заголовком Idempotent-Replayed."
+    ),
+)
+
+if_none_match_param = OpenApiParameter(
+    name="If-None-Match",
+    type=str,
+    location=OpenApiParameter.HEADER,
+    description=(
+        "ETag из предыдущего ответа. Если данные не изменились, "
+        "возвращается 304 без тела."
+    ),
+)
+
+if_modified_since_param = OpenApiParameter(
+    name="If-Modified-Since",
+    type=str,
+    location=OpenApiParameter.HEADER,
+    description=(
+        "Last-Modified из предыдущего ответа (для отдельных объектов). "
+        "Если объект с тех пор не менялся, возвращается 304 без тела."
+    ),
+)
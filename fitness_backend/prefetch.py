@@ -0,0 +1,104 @@
+"""
+Построение ``select_related``/``prefetch_related`` по дереву сериализатора.
+
+Вложенные сериализаторы обходятся рекурсивно: прямые ForeignKey/OneToOne
+попадают в ``select_related``, связи «многие» (many=True, обратные FK, M2M) —
+в ``prefetch_related`` вместе со всем, что вложено под ними. Поля, которые
+выводят только первичный ключ связи, JOIN не требуют и пропускаются.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import prefetch_related_objects
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+def related_lookups(serializer, prefix="", in_prefetch=False):
+    """
+    Возвращает пару списков ``(select_related, prefetch_related)`` для
+    сериализатора модели.
+    """
+    select, prefetch = [], []
+    model = getattr(getattr(serializer, "Meta", None), "model", None)
+    if model is None:
+        return select, prefetch
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+
+        attrs = field.source.split(".")
+        current_model, path, many = model, prefix, in_prefetch
+        for attr in attrs:
+            try:
+                model_field = current_model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                path = None
+                break
+            if not model_field.is_relation:
+                path = None
+                break
+            path = f"{path}{attr}"
+            many = many or model_field.one_to_many or model_field.many_to_many
+            current_model = model_field.related_model
+            if attr != attrs[-1]:
+                path += "__"
+        if not path:
+            continue
+
+        if isinstance(field, serializers.ListSerializer):
+            field, many = field.child, True
+        elif isinstance(field, ManyRelatedField):
+            field, many = field.child_relation, True
+
+        if (
+            isinstance(field, RelatedField)
+            and not many
+            and field.use_pk_only_optimization()
+        ):
+            # Первичный ключ берётся из столбца *_id родительского объекта.
+            if len(attrs) == 1:
+                continue
+            path = path.rsplit("__", 1)[0]
+
+        (prefetch if many else select).append(path)
+        if isinstance(field, serializers.BaseSerializer):
+            nested_select, nested_prefetch = related_lookups(
+                field, prefix=f"{path}__", in_prefetch=many
+            )
+            select.extend(nested_select)
+            prefetch.extend(nested_prefetch)
+
+    return select, prefetch
+
+
+def optimize_queryset(queryset, serializer):
+    """
+    Добавляет к queryset ровно те JOIN и предзагрузки, которые нужны сериализатору.
+    """
+    select, prefetch = related_lookups(serializer)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+def prefetch_for_serializer(instances, serializer):
+    """
+    Догружает связи для уже полученных объектов (например, созданных через
+    ``bulk_create``) пакетными запросами вместо ленивой загрузки по одному.
+    """
+    select, prefetch = related_lookups(serializer)
+    prefetch_related_objects(instances, *select, *prefetch)
+    return instances
+
+
+class OptimizedQuerysetMixin:
+    """
+    Примесь для GenericAPIView: queryset загружает связи, необходимые
+    сериализатору текущего действия.
+    """
+
+    def get_queryset(self):
+        return optimize_queryset(super().get_queryset(), self.get_serializer())
@@ -0,0 +1,77 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+def parse_paths(value):
+    return {path.strip() for path in value.split(",") if path.strip()}
+
+
+class FlexFieldsMixin:
+    """
+    Выбор полей ответа параметрами запроса (только для GET/HEAD/OPTIONS).
+
+    ``?fields=id,status,schedule.start_time`` — оставить только перечисленные
+    поля; вложенные поля указываются через точку, имя связи без продолжения
+    оставляет её целиком.
+
+    ``?expand=schedule.trainer`` — развернуть только перечисленные связи
+    (вместе с их предками), остальные вложенные объекты выводятся как ID.
+    Без параметра ``expand`` все связи разворачиваются, как и раньше.
+
+    Примесь должна быть у каждого сериализатора дерева, поля которого нужно
+    отбирать: каждый уровень отбирает свои поля сам, зная свой путь от корня.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+
+        path = self.field_path()
+        prefix = f"{path}." if path else ""
+
+        selected = parse_paths(request.query_params.get(FIELDS_PARAM, ""))
+        if selected and path not in selected:
+            names = {
+                item[len(prefix) :].split(".")[0]
+                for item in selected
+                if item.startswith(prefix)
+            }
+            if names or not path:
+                for name, field in list(fields.items()):
+                    if name not in names and not field.write_only:
+                        del fields[name]
+
+        if EXPAND_PARAM in request.query_params:
+            expanded = parse_paths(request.query_params[EXPAND_PARAM])
+            for name, field in list(fields.items()):
+                if not isinstance(field, serializers.BaseSerializer):
+                    continue
+                nested = f"{prefix}{name}"
+                if nested in expanded or any(
+                    item.startswith(f"{nested}.") for item in expanded
+                ):
+                    continue
+                fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True,
+                    source=field.source if field.source != name else None,
+                    many=isinstance(field, serializers.ListSerializer),
+                )
+
+        return fields
+
+    def field_path(self):
+        """
+        Путь сериализатора от корневого, например ``schedule.trainer``.
+        """
+        names = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                names.append(node.field_name)
+            node = node.parent
+        return ".".join(reversed(names))
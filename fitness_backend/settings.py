@@ -25,7 +25,9 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
+    "fitness_backend",
     "users",
     "trainers",
     "schedule",
@@ -82,6 +84,14 @@ DATABASES = {
     }
 }
 
+# Кэш: адрес в формате django-environ, например redis://localhost:6379/1.
+# По умолчанию — память процесса (у каждого воркера свой кэш). Кэши расписаний,
+# членства тренеров и календарей (*_CACHE_SECONDS) сбрасываются при изменениях
+# данных только в кэше того процесса, который их изменил, поэтому при нескольких
+# воркерах нужен общий кэш (Redis, Memcached); без него check --deploy
+# выдаёт предупреждение fitness_backend.W001.
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -102,6 +112,8 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "fitness_backend.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
 }
 
 SPECTACULAR_SETTINGS = {
@@ -139,6 +151,55 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Бронирование слотов: ожидание блокировки счётчика слота и повторные попытки
+BOOKING_SLOT_LOCK_TIMEOUT_MS = env.int("BOOKING_SLOT_LOCK_TIMEOUT_MS", default=2000)
+BOOKING_RESERVATION_MAX_ATTEMPTS = env.int(
+    "BOOKING_RESERVATION_MAX_ATTEMPTS", default=3
+)
+BOOKING_RESERVATION_BACKOFF_MS = env.int("BOOKING_RESERVATION_BACKOFF_MS", default=50)
+# Максимальное число записей в одном пакетном запросе
+BOOKING_BATCH_MAX_SIZE = env.int("BOOKING_BATCH_MAX_SIZE", default=200)
+# Длина слота (в минутах), на которые делится окно расписания при расчёте свободных слотов
+BOOKING_SLOT_MINUTES = env.int("BOOKING_SLOT_MINUTES", default=30)
+# На сколько месяцев вперёд заранее создаются секции таблицы записей
+BOOKING_PARTITION_MONTHS_AHEAD = env.int("BOOKING_PARTITION_MONTHS_AHEAD", default=12)
+
+# Размер порции серверного курсора при потоковой выгрузке записей
+BOOKING_EXPORT_CHUNK_SIZE = env.int("BOOKING_EXPORT_CHUNK_SIZE", default=2000)
+
+# Доставка событий записей из outbox (команда dispatch_booking_events)
+BOOKING_EVENTS_DELIVERER = env.str(
+    "BOOKING_EVENTS_DELIVERER", default="bookings.events.deliver_webhook"
+)
+BOOKING_EVENTS_WEBHOOK_URL = env.str("BOOKING_EVENTS_WEBHOOK_URL", default="")
+BOOKING_EVENTS_WEBHOOK_TIMEOUT = env.int("BOOKING_EVENTS_WEBHOOK_TIMEOUT", default=10)
+BOOKING_EVENTS_BATCH_SIZE = env.int("BOOKING_EVENTS_BATCH_SIZE", default=100)
+BOOKING_EVENTS_RETRY_MAX_SECONDS = env.int(
+    "BOOKING_EVENTS_RETRY_MAX_SECONDS", default=600
+)
+
+# Сколько часов хранится ответ на POST-запрос с заголовком Idempotency-Key
+IDEMPOTENCY_KEY_TTL_HOURS = env.int("IDEMPOTENCY_KEY_TTL_HOURS", default=24)
+
+# Сколько секунд хранится в кэше недельное расписание клуба
+TIMETABLE_CACHE_SECONDS = env.int("TIMETABLE_CACHE_SECONDS", default=86400)
+
+# Сколько секунд хранится в кэше текст календаря .ics (тренера, клуба, клиента)
+CALENDAR_FEED_CACHE_SECONDS = env.int("CALENDAR_FEED_CACHE_SECONDS", default=86400)
+# За сколько прошедших дней в календарь клиента попадают записи
+CALENDAR_FEED_PAST_DAYS = env.int("CALENDAR_FEED_PAST_DAYS", default=30)
+
+# Максимальное число строк в одном импорте расписания
+TIMETABLE_IMPORT_MAX_ROWS = env.int("TIMETABLE_IMPORT_MAX_ROWS", default=20000)
+
+# Сколько секунд кэшируется ответ «работает ли тренер в клубе»
+TRAINER_MEMBERSHIP_CACHE_SECONDS = env.int(
+    "TRAINER_MEMBERSHIP_CACHE_SECONDS", default=3600
+)
+
+# До скольких строк списки админки считаются точно; дальше — по оценке PostgreSQL
+ADMIN_EXACT_COUNT_LIMIT = env.int("ADMIN_EXACT_COUNT_LIMIT", default=10000)
+
 LANGUAGE_CODE = "en-us"
 
 TIME_ZONE = "Asia/Almaty"
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Schedule
+from trainers.admin import TrainerListFilter
+from .models import Schedule, ScheduleException
 
 
 @admin.register(Schedule)
@@ -10,6 +11,7 @@ class ScheduleAdmin(admin.ModelAdmin):
         "day_of_week",
         "start_time",
         "end_time",
+        "capacity",
         "is_active",
         "created_at",
     )
@@ -17,7 +19,7 @@ class ScheduleAdmin(admin.ModelAdmin):
         "day_of_week",
         "is_active",
         "fitness_club",
-        "trainer__user__last_name",
+        TrainerListFilter,
     )
     search_fields = (
         "trainer__user__first_name",
@@ -25,3 +27,26 @@ class ScheduleAdmin(admin.ModelAdmin):
         "fitness_club__name",
     )
     readonly_fields = ("created_at", "updated_at")
+    autocomplete_fields = ("trainer", "fitness_club")
+
+    def get_queryset(self, request):
+        # тренер и клуб нужны в __str__ (в том числе в подсказках автодополнения)
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("trainer__user", "fitness_club")
+        )
+
+
+@admin.register(ScheduleException)
+class ScheduleExceptionAdmin(admin.ModelAdmin):
+    list_display = ("date", "schedule", "fitness_club", "reason")
+    list_filter = ("fitness_club",)
+    date_hierarchy = "date"
+    search_fields = ("reason",)
+    autocomplete_fields = ("schedule", "fitness_club")
+    list_select_related = (
+        "schedule__trainer__user",
+        "schedule__fitness_club",
+        "fitness_club",
+    )
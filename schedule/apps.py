@@ -1,6 +1,129 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+
+def invalidate_schedule_timetable(sender, instance, **kwargs):
+    from .timetable import invalidate_timetables, schedule_timetable
+
+    current = schedule_timetable(instance)
+    loaded = getattr(instance, "_loaded_timetable", None)
+    pairs = [current]
+    if loaded and None not in loaded:
+        pairs.append(loaded)
+    invalidate_timetables(pairs)
+    instance._loaded_timetable = current
+
+
+def invalidate_trainer_timetables(sender, instance, **kwargs):
+    from .timetable import invalidate_timetables, trainer_timetables
+
+    # Удаление тренера каскадно удаляет расписания — их сбросит свой сигнал.
+    invalidate_timetables(trainer_timetables([instance.pk]))
+
+
+def invalidate_user_timetables(sender, instance, created, **kwargs):
+    from users.models import Role
+    from .timetable import invalidate_timetables, user_timetables
+
+    # Пользователь тренера выводится в расписании вложенным объектом.
+    if not created and instance.role == Role.TRAINER:
+        invalidate_timetables(user_timetables(instance.pk))
+
+
+def invalidate_club_timetables(sender, instance, **kwargs):
+    from .timetable import club_timetables, invalidate_timetables
+
+    # Для удаления вызывается из pre_delete: после удаления связи тренеров
+    # с клубом уже не найти.
+    invalidate_timetables(club_timetables(instance.pk))
+
+
+def invalidate_timetables_on_clubs_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    from .timetable import invalidate_timetables, trainer_timetables
+
+    # Состав клубов тренера выводится в каждом его расписании.
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        invalidate_timetables(trainer_timetables([instance.pk]))
+    elif reverse and action in ("post_add", "post_remove"):
+        invalidate_timetables(trainer_timetables(pk_set))
+    elif reverse and action == "pre_clear":
+        invalidate_timetables(
+            trainer_timetables(instance.trainers.values_list("pk", flat=True))
+        )
+
+
+def invalidate_schedule_feeds(sender, instance, **kwargs):
+    from .feeds import invalidate_feeds, schedule_feeds
+
+    # Для удаления вызывается из pre_delete: записи клиентов на расписание
+    # удаляются каскадно раньше, чем срабатывает post_delete.
+    loaded_trainer, loaded_club = getattr(instance, "_loaded_feeds", (None, None))
+    invalidate_feeds(
+        schedule_feeds(
+            {instance.trainer_id, loaded_trainer},
+            {instance.fitness_club_id, loaded_club},
+            instance.pk,
+        )
+    )
+    instance._loaded_feeds = (instance.trainer_id, instance.fitness_club_id)
+
+
+def invalidate_exception_feeds(sender, instance, **kwargs):
+    from .feeds import exception_feeds, invalidate_feeds
+
+    invalidate_feeds(exception_feeds(instance))
+
+
+def invalidate_user_feeds(sender, instance, created, **kwargs):
+    from users.models import Role
+    from .feeds import invalidate_feeds, trainer_user_feeds
+
+    # Имя тренера выводится в событиях календарей.
+    if not created and instance.role == Role.TRAINER:
+        invalidate_feeds(trainer_user_feeds(instance.pk))
+
+
+def invalidate_club_feeds(sender, instance, created, **kwargs):
+    from .feeds import club_feeds, invalidate_feeds
+
+    if not created:
+        invalidate_feeds(club_feeds(instance.pk))
+
+
+def invalidate_booking_feeds(sender, bookings, **kwargs):
+    from .feeds import invalidate_feeds
+
+    invalidate_feeds(("client", booking.client_id) for booking in bookings)
 
 
 class ScheduleConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "schedule"
+
+    def ready(self):
+        from bookings.signals import bookings_changed
+        from trainers.models import Trainer
+
+        post_save.connect(invalidate_schedule_timetable, sender="schedule.Schedule")
+        post_delete.connect(invalidate_schedule_timetable, sender="schedule.Schedule")
+        post_save.connect(invalidate_trainer_timetables, sender="trainers.Trainer")
+        post_save.connect(invalidate_club_timetables, sender="trainers.FitnessClub")
+        pre_delete.connect(invalidate_club_timetables, sender="trainers.FitnessClub")
+        post_save.connect(invalidate_user_timetables, sender="users.User")
+        m2m_changed.connect(
+            invalidate_timetables_on_clubs_change, sender=Trainer.clubs.through
+        )
+
+        post_save.connect(invalidate_schedule_feeds, sender="schedule.Schedule")
+        pre_delete.connect(invalidate_schedule_feeds, sender="schedule.Schedule")
+        post_save.connect(
+            invalidate_exception_feeds, sender="schedule.ScheduleException"
+        )
+        pre_delete.connect(
+            invalidate_exception_feeds, sender="schedule.ScheduleException"
+        )
+        post_save.connect(invalidate_user_feeds, sender="users.User")
+        post_save.connect(invalidate_club_feeds, sender="trainers.FitnessClub")
+        bookings_changed.connect(invalidate_booking_feeds)
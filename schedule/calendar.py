@@ -0,0 +1,78 @@
+"""
+Календарь занятий: развёртывание недельных шаблонов ``Schedule`` в датированные
+занятия за диапазон дат.
+
+Расписания загружаются одним запросом, число записей на каждое занятие —
+одним агрегатным запросом, отменённые занятия — одним запросом к исключениям
+из расписания, после чего занятия порождаются генератором день
+за днём и сразу отдаются клиенту JSON-массивом через
+``StreamingHttpResponse``: ответ за квартал по нескольким клубам не собирается
+в памяти целиком.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+
+def expand_occurrences(schedules, date_from, date_to, cancelled=frozenset()):
+    """
+    Пары ``(date, schedule)`` для каждого занятия диапазона в порядке даты
+    и времени начала, кроме отменённых пар ``(schedule_id, date)``.
+    """
+    by_weekday = defaultdict(list)
+    for schedule in sorted(schedules, key=lambda item: (item.start_time, item.id)):
+        by_weekday[schedule.weekday].append(schedule)
+
+    day = date_from
+    while day <= date_to:
+        for schedule in by_weekday[day.weekday()]:
+            if (schedule.id, day) not in cancelled:
+                yield day, schedule
+        day += timedelta(days=1)
+
+
+def occurrence_data(day, schedule, counts, statuses):
+    bookings = dict.fromkeys(statuses.values, 0)
+    bookings.update(counts.get((schedule.id, day), {}))
+    confirmed = bookings[statuses.CONFIRMED]
+    return {
+        "schedule_id": schedule.id,
+        "date": day,
+        "start_time": schedule.start_time,
+        "end_time": schedule.end_time,
+        "trainer_id": schedule.trainer_id,
+        "trainer_name": schedule.trainer.full_name,
+        "fitness_club_id": schedule.fitness_club_id,
+        "fitness_club_name": schedule.fitness_club.name,
+        "capacity": schedule.capacity,
+        "free_places": max(schedule.capacity - confirmed, 0),
+        "bookings": bookings,
+    }
+
+
+def calendar_lines(occurrences, counts, statuses):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    separator = "["
+    for day, schedule in occurrences:
+        yield separator + encoder.encode(
+            occurrence_data(day, schedule, counts, statuses)
+        )
+        separator = ","
+    yield "[]\n" if separator == "[" else "]\n"
+
+
+def calendar_response(schedules, date_from, date_to, counts, statuses, cancelled):
+    """
+    ``counts`` — словарь ``{(schedule_id, date): {status: count}}``,
+    ``statuses`` — перечисление статусов записи: отсутствующие в ``counts``
+    статусы выводятся нулями, свободные места считаются по подтверждённым.
+    ``cancelled`` — отменённые пары ``(schedule_id, date)``, они пропускаются.
+    """
+    occurrences = expand_occurrences(schedules, date_from, date_to, cancelled)
+    return StreamingHttpResponse(
+        calendar_lines(occurrences, counts, statuses),
+        content_type="application/json",
+    )
@@ -0,0 +1,386 @@
+"""
+Календари iCalendar (``.ics``) для тренеров, клубов и клиентов.
+
+Календарные приложения опрашивают ссылку каждые несколько минут, поэтому
+ответ почти всегда отдаётся без обращения к БД:
+
+* ссылка подписана (``feed_token``) и не требует JWT — подпись проверяется
+  без запроса к БД;
+* у каждого календаря есть версия в кэше (``fitness_backend.cache``);
+  она же — ETag, так что на ``If-None-Match`` с текущей версией сразу
+  отдаётся 304;
+* текст календаря кэшируется под ключом версии; при промахе он отдаётся
+  потоком по мере формирования и попадает в кэш, когда поток дочитан.
+
+Любое изменение данных календаря заменяет версию (сигналы в
+``schedule.apps``, для записей — ``bookings_changed``), после чего
+прежний текст в кэше больше не читается.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signing import Signer
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import BaseRenderer
+
+from fitness_backend.cache import cache_version, invalidate_keys
+from trainers.models import FitnessClub, Trainer
+from users.models import User
+from .models import Schedule, ScheduleException
+
+FEED_KINDS = ("trainer", "club", "client")
+# Отмены занятий вперёд, которые попадают в EXDATE повторяющихся событий.
+EXCEPTION_DAYS_AHEAD = 366
+UID_DOMAIN = "fitness-backend"
+
+signer = Signer(salt="schedule.feeds")
+
+
+def feed_token(kind, pk):
+    return signer.signature(f"{kind}:{pk}")
+
+
+def check_feed_token(kind, pk, token):
+    return constant_time_compare(feed_token(kind, pk), token or "")
+
+
+def version_key(kind, pk):
+    return f"schedule:feed-version:{kind}:{pk}"
+
+
+def feed_version(kind, pk):
+    return cache_version(version_key(kind, pk))
+
+
+def body_key(kind, pk, version):
+    return f"schedule:feed:{kind}:{pk}:{version}"
+
+
+def invalidate_feeds(feeds):
+    invalidate_keys(version_key(kind, pk) for kind, pk in set(feeds))
+
+
+def stored_lines(lines, key):
+    """
+    Отдаёт строки календаря и кэширует текст целиком, когда поток дочитан.
+    """
+    chunks = []
+    for chunk in lines:
+        chunks.append(chunk)
+        yield chunk
+    cache.set(key, "".join(chunks), settings.CALENDAR_FEED_CACHE_SECONDS)
+
+
+# Затрагиваемые изменениями календари
+
+
+def past_limit():
+    return timezone.localdate() - timedelta(days=settings.CALENDAR_FEED_PAST_DAYS)
+
+
+def booked_clients(condition):
+    from bookings.models import Booking
+
+    return (
+        Booking.objects.filter(condition, booking_date__gte=past_limit())
+        .order_by()
+        .values_list("client_id", flat=True)
+        .distinct()
+    )
+
+
+def schedule_feeds(trainer_ids, club_ids, schedule_id=None):
+    feeds = [("trainer", pk) for pk in trainer_ids if pk is not None]
+    feeds += [("club", pk) for pk in club_ids if pk is not None]
+    if schedule_id is not None:
+        feeds += [("client", pk) for pk in booked_clients(Q(schedule_id=schedule_id))]
+    return feeds
+
+
+def exception_feeds(exception):
+    day = exception.date
+    if exception.schedule_id is not None:
+        schedule = exception.schedule
+        return [
+            ("trainer", schedule.trainer_id),
+            ("club", schedule.fitness_club_id),
+        ] + [
+            ("client", pk)
+            for pk in booked_clients(Q(schedule_id=schedule.id, booking_date=day))
+        ]
+    club_id = exception.fitness_club_id
+    trainer_ids = (
+        Schedule.objects.filter(fitness_club_id=club_id)
+        .order_by()
+        .values_list("trainer_id", flat=True)
+        .distinct()
+    )
+    return (
+        [("club", club_id)]
+        + [("trainer", pk) for pk in trainer_ids]
+        + [
+            ("client", pk)
+            for pk in booked_clients(
+                Q(schedule__fitness_club_id=club_id, booking_date=day)
+            )
+        ]
+    )
+
+
+def trainer_user_feeds(user_id):
+    """
+    Календари, в которых выводится имя тренера-пользователя.
+    """
+    rows = (
+        Schedule.objects.filter(trainer__user_id=user_id)
+        .order_by()
+        .values_list("trainer_id", "fitness_club_id")
+        .distinct()
+    )
+    feeds = []
+    for trainer_id, club_id in rows:
+        feeds += [("trainer", trainer_id), ("club", club_id)]
+    feeds += [
+        ("client", pk) for pk in booked_clients(Q(schedule__trainer__user_id=user_id))
+    ]
+    return feeds
+
+
+def club_feeds(club_id):
+    """
+    Календари, в которых выводятся название и адрес клуба.
+    """
+    trainer_ids = (
+        Schedule.objects.filter(fitness_club_id=club_id)
+        .order_by()
+        .values_list("trainer_id", flat=True)
+        .distinct()
+    )
+    return (
+        [("club", club_id)]
+        + [("trainer", pk) for pk in trainer_ids]
+        + [
+            ("client", pk)
+            for pk in booked_clients(Q(schedule__fitness_club_id=club_id))
+        ]
+    )
+
+
+# Формирование календаря (RFC 5545)
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """
+    Переносит строку длиннее 75 октетов: продолжение начинается с пробела.
+    """
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Не разрываем многобайтовый символ UTF-8.
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def local_stamp(day, time):
+    return datetime.combine(day, time).strftime("%Y%m%dT%H%M%S")
+
+
+def utc_stamp(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def first_occurrence(schedule):
+    """
+    Первая дата занятия не раньше дня создания расписания.
+    """
+    day = timezone.localdate(schedule.created_at)
+    return day + timedelta(days=(schedule.weekday - day.weekday()) % 7)
+
+
+def location(club):
+    return f"{club.name}, {club.address}" if club.address else club.name
+
+
+def calendar_lines(name, events):
+    tzid = settings.TIME_ZONE
+    yield fold("BEGIN:VCALENDAR")
+    yield fold("VERSION:2.0")
+    yield fold("PRODID:-//Fitness Club//Schedule//RU")
+    yield fold("CALSCALE:GREGORIAN")
+    yield fold(f"X-WR-CALNAME:{escape(name)}")
+    yield fold(f"X-WR-TIMEZONE:{tzid}")
+    for event in events:
+        yield "".join(fold(line) for line in event)
+    yield fold("END:VCALENDAR")
+
+
+def schedule_events(schedules, cancelled):
+    """
+    Повторяющееся еженедельное событие на каждое расписание; отменённые
+    занятия исключаются через EXDATE.
+    """
+    tzid = settings.TIME_ZONE
+    cancelled_dates = defaultdict(list)
+    for schedule_id, day in cancelled:
+        cancelled_dates[schedule_id].append(day)
+    for schedule in schedules:
+        first = first_occurrence(schedule)
+        event = [
+            "BEGIN:VEVENT",
+            f"UID:schedule-{schedule.id}@{UID_DOMAIN}",
+            f"DTSTAMP:{utc_stamp(schedule.updated_at)}",
+            f"DTSTART;TZID={tzid}:{local_stamp(first, schedule.start_time)}",
+            f"DTEND;TZID={tzid}:{local_stamp(first, schedule.end_time)}",
+            "RRULE:FREQ=WEEKLY",
+            f"SUMMARY:{escape('Тренировка: ' + schedule.trainer.full_name)}",
+            f"LOCATION:{escape(location(schedule.fitness_club))}",
+        ]
+        exdates = sorted(day for day in cancelled_dates[schedule.id] if day >= first)
+        if exdates:
+            stamps = ",".join(local_stamp(day, schedule.start_time) for day in exdates)
+            event.append(f"EXDATE;TZID={tzid}:{stamps}")
+        event.append("END:VEVENT")
+        yield event
+
+
+def booking_events(bookings, cancelled, statuses):
+    """
+    Событие на каждую запись клиента. Длительность — слот записи, но не
+    дольше окна расписания.
+    """
+    tzid = settings.TIME_ZONE
+    slot = timedelta(minutes=settings.BOOKING_SLOT_MINUTES)
+    for booking in bookings:
+        schedule = booking.schedule
+        start = datetime.combine(booking.booking_date, booking.booking_time)
+        end = min(
+            start + slot, datetime.combine(booking.booking_date, schedule.end_time)
+        )
+        if (schedule.id, booking.booking_date) in cancelled:
+            status = "CANCELLED"
+        elif booking.status == statuses.CONFIRMED:
+            status = "CONFIRMED"
+        else:
+            status = "TENTATIVE"
+        yield [
+            "BEGIN:VEVENT",
+            f"UID:booking-{booking.id}@{UID_DOMAIN}",
+            f"DTSTAMP:{utc_stamp(booking.updated_at)}",
+            f"DTSTART;TZID={tzid}:{start.strftime('%Y%m%dT%H%M%S')}",
+            f"DTEND;TZID={tzid}:{end.strftime('%Y%m%dT%H%M%S')}",
+            f"SUMMARY:{escape('Тренировка: ' + schedule.trainer.full_name)}",
+            f"LOCATION:{escape(location(schedule.fitness_club))}",
+            f"STATUS:{status}",
+            "END:VEVENT",
+        ]
+
+
+def schedules_feed(name, schedules):
+    schedules = list(
+        schedules.filter(is_active=True)
+        .select_related("trainer__user", "fitness_club")
+        .order_by("weekday", "start_time", "id")
+    )
+    today = timezone.localdate()
+    cancelled = ScheduleException.objects.cancelled(
+        schedules, past_limit(), today + timedelta(days=EXCEPTION_DAYS_AHEAD)
+    )
+    return calendar_lines(name, schedule_events(schedules, cancelled))
+
+
+def trainer_feed(trainer):
+    return schedules_feed(
+        f"Расписание: {trainer.full_name}",
+        Schedule.objects.filter(trainer_id=trainer.id),
+    )
+
+
+def club_feed(club):
+    return schedules_feed(
+        f"Расписание: {club.name}", Schedule.objects.filter(fitness_club_id=club.id)
+    )
+
+
+def client_feed(client):
+    from bookings.models import Booking, BookingStatus
+
+    bookings = list(
+        Booking.objects.filter(
+            client_id=client.id,
+            booking_date__gte=past_limit(),
+            status__in=(BookingStatus.PENDING, BookingStatus.CONFIRMED),
+        )
+        .select_related("schedule__trainer__user", "schedule__fitness_club")
+        .order_by("booking_date", "booking_time", "id")
+    )
+    cancelled = set()
+    if bookings:
+        cancelled = ScheduleException.objects.cancelled(
+            {booking.schedule for booking in bookings},
+            bookings[0].booking_date,
+            bookings[-1].booking_date,
+        )
+    return calendar_lines(
+        "Мои тренировки", booking_events(bookings, cancelled, BookingStatus)
+    )
+
+
+def feed_owner(kind, pk):
+    """
+    Владелец календаря или ``None``, если его нет.
+    """
+    if kind == "trainer":
+        return Trainer.objects.select_related("user").filter(pk=pk).first()
+    if kind == "club":
+        return FitnessClub.objects.filter(pk=pk).first()
+    return User.objects.filter(pk=pk).first()
+
+
+FEED_BUILDERS = {"trainer": trainer_feed, "club": club_feed, "client": client_feed}
+
+
+class ICalendarRenderer(BaseRenderer):
+    media_type = "text/calendar"
+    format = "ics"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Календарь отдаётся готовым текстом; сюда попадают только ошибки.
+        if isinstance(data, dict):
+            data = data.get("detail", data)
+        return str(data).encode(self.charset)
+
+
+class IgnoreAcceptNegotiation(BaseContentNegotiation):
+    """
+    Календарные приложения присылают разные Accept; ответ всегда ``.ics``.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
@@ -0,0 +1,269 @@
+"""
+Массовый импорт недельного расписания из CSV или JSON.
+
+Все проверки выполняются в памяти: тренеры, клубы, членство тренеров в клубах
+и существующие расписания этих тренеров загружаются заранее четырьмя
+запросами, после чего каждая строка проверяется на длительность, членство,
+уникальность и пересечение с другими занятиями тренера. Если ошибок нет,
+расписания вставляются ``bulk_create`` в одной транзакции; если есть хотя бы
+одна, не вставляется ничего, а отчёт перечисляет ошибки по строкам.
+"""
+
+import csv
+import io
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from rest_framework.settings import api_settings
+
+from trainers.models import FitnessClub, Trainer
+from .models import Schedule
+from .timetable import invalidate_timetables, schedule_timetable
+
+IMPORT_COLUMNS = (
+    "trainer_id",
+    "fitness_club_id",
+    "day_of_week",
+    "start_time",
+    "end_time",
+    "capacity",
+    "is_active",
+)
+IMPORT_FORMATS = ("csv", "json")
+NON_FIELD = api_settings.NON_FIELD_ERRORS_KEY
+
+
+class TimetableImportError(Exception):
+    """
+    Файл не удалось разобрать как таблицу расписания.
+    """
+
+
+def read_rows(content, import_format):
+    """
+    Строки расписания из текста CSV (первая строка — заголовок с именами
+    столбцов ``IMPORT_COLUMNS``) или JSON (массив объектов либо объект
+    с ключом ``schedules``).
+    """
+    if import_format == "csv":
+        reader = csv.DictReader(io.StringIO(content))
+        missing = set(IMPORT_COLUMNS[:5]) - set(reader.fieldnames or [])
+        if missing:
+            raise TimetableImportError(
+                f"В заголовке CSV нет столбцов: {', '.join(sorted(missing))}."
+            )
+        return list(reader)
+
+    try:
+        data = json.loads(content) if isinstance(content, str) else content
+    except ValueError as e:
+        raise TimetableImportError(f"Некорректный JSON: {e}.")
+    if isinstance(data, dict):
+        data = data.get("schedules")
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise TimetableImportError(
+            "Ожидается массив объектов или объект с ключом schedules."
+        )
+    return data
+
+
+def minutes(value):
+    return value.hour * 60 + value.minute
+
+
+class TimetableImport:
+    """
+    Проверка и вставка строк расписания. Номера строк в отчёте начинаются
+    с 1 и не учитывают заголовок CSV.
+    """
+
+    def __init__(self, rows):
+        if len(rows) > settings.TIMETABLE_IMPORT_MAX_ROWS:
+            raise TimetableImportError(
+                f"Не больше {settings.TIMETABLE_IMPORT_MAX_ROWS} строк за один импорт."
+            )
+        self.rows = rows
+        self.errors = defaultdict(lambda: defaultdict(list))
+        self.schedules = {}
+        self.created = 0
+
+    def add_error(self, number, field, message):
+        self.errors[number][field].append(message)
+
+    def validate(self):
+        parsed = {}
+        for number, row in enumerate(self.rows, start=1):
+            schedule = self.build(number, row)
+            if schedule is not None:
+                parsed[number] = schedule
+
+        self.check_references(parsed)
+        self.check_conflicts(parsed)
+        self.schedules = {
+            number: schedule
+            for number, schedule in parsed.items()
+            if number not in self.errors
+        }
+        return not self.errors
+
+    def build(self, number, row):
+        values = {}
+        for field in ("trainer_id", "fitness_club_id"):
+            try:
+                values[field] = int(row.get(field))
+            except (TypeError, ValueError):
+                self.add_error(number, field, "Ожидается целое число.")
+        for field in ("capacity", "is_active"):
+            if row.get(field) not in (None, ""):
+                values[field] = row[field]
+
+        schedule = Schedule(
+            day_of_week=(row.get("day_of_week") or "").strip().lower(),
+            start_time=row.get("start_time"),
+            end_time=row.get("end_time"),
+            **values,
+        )
+        try:
+            # Внешние ключи проверяются по заранее загруженным множествам.
+            schedule.clean_fields(exclude=["trainer", "fitness_club"])
+            schedule.clean_times()
+        except ValidationError as e:
+            for field, messages in e.message_dict.items():
+                for message in messages:
+                    self.add_error(number, field, message)
+        if number in self.errors:
+            return None
+        return schedule
+
+    def check_references(self, parsed):
+        trainer_ids = {schedule.trainer_id for schedule in parsed.values()}
+        club_ids = {schedule.fitness_club_id for schedule in parsed.values()}
+        trainers = set(
+            Trainer.objects.filter(id__in=trainer_ids)
+            .order_by()
+            .values_list("id", flat=True)
+        )
+        clubs = set(
+            FitnessClub.objects.filter(id__in=club_ids)
+            .order_by()
+            .values_list("id", flat=True)
+        )
+        memberships = set(
+            Trainer.clubs.through.objects.filter(trainer_id__in=trainers).values_list(
+                "trainer_id", "fitnessclub_id"
+            )
+        )
+        for number, schedule in parsed.items():
+            if schedule.trainer_id not in trainers:
+                self.add_error(number, "trainer_id", "Тренер не найден.")
+            elif schedule.fitness_club_id not in clubs:
+                self.add_error(number, "fitness_club_id", "Фитнес-клуб не найден.")
+            elif (schedule.trainer_id, schedule.fitness_club_id) not in memberships:
+                self.add_error(
+                    number,
+                    "fitness_club_id",
+                    "Выбранный тренер не работает в этом фитнес-клубе.",
+                )
+
+    def check_conflicts(self, parsed):
+        """
+        Уникальность (тренер, клуб, день, начало, конец) и отсутствие
+        пересечений активных занятий тренера в один день недели — среди
+        существующих расписаний и строк импорта.
+        """
+        existing = (
+            Schedule.objects.filter(
+                trainer_id__in={schedule.trainer_id for schedule in parsed.values()}
+            )
+            .order_by()
+            .values_list(
+                "id",
+                "trainer_id",
+                "fitness_club_id",
+                "day_of_week",
+                "start_time",
+                "end_time",
+                "is_active",
+            )
+        )
+        taken = {}
+        # (trainer_id, day_of_week) -> [(начало, конец, номер строки или None, описание)]
+        intervals = defaultdict(list)
+        for pk, trainer_id, club_id, day, start, end, is_active in existing:
+            taken[(trainer_id, club_id, day, start, end)] = f"расписание #{pk}"
+            if is_active:
+                intervals[(trainer_id, day)].append(
+                    (minutes(start), minutes(end), None, f"расписание #{pk}")
+                )
+
+        for number, schedule in parsed.items():
+            key = (
+                schedule.trainer_id,
+                schedule.fitness_club_id,
+                schedule.day_of_week,
+                schedule.start_time,
+                schedule.end_time,
+            )
+            if key in taken:
+                self.add_error(
+                    number, NON_FIELD, f"Такое расписание уже есть: {taken[key]}."
+                )
+                continue
+            taken[key] = f"строка {number}"
+            if schedule.is_active:
+                intervals[(schedule.trainer_id, schedule.day_of_week)].append(
+                    (
+                        minutes(schedule.start_time),
+                        minutes(schedule.end_time),
+                        number,
+                        f"строка {number}",
+                    )
+                )
+
+        for items in intervals.values():
+            items.sort(key=lambda item: item[:2])
+            latest = None
+            for item in items:
+                if latest is not None and item[0] < latest[1]:
+                    for number, other in ((item[2], latest), (latest[2], item)):
+                        if number is not None:
+                            self.add_error(
+                                number,
+                                NON_FIELD,
+                                "Пересекается с другим активным занятием тренера "
+                                f"в этот день недели ({other[3]}).",
+                            )
+                if latest is None or item[1] > latest[1]:
+                    latest = item
+
+    def save(self):
+        """
+        Вставляет проверенные расписания одной транзакцией.
+        """
+        schedules = list(self.schedules.values())
+        try:
+            with transaction.atomic():
+                Schedule.objects.bulk_create(schedules, batch_size=1000)
+        except IntegrityError:
+            raise TimetableImportError(
+                "Расписания изменились во время импорта (дубликат или пересечение "
+                "занятий). Повторите импорт."
+            )
+        # bulk_create не отправляет post_save: кэш расписаний клубов
+        # сбрасывается явно.
+        invalidate_timetables(schedule_timetable(schedule) for schedule in schedules)
+        self.created = len(schedules)
+        return schedules
+
+    def report(self):
+        return {
+            "rows": len(self.rows),
+            "created": self.created,
+            "errors": [
+                {"row": number, "errors": dict(self.errors[number])}
+                for number in sorted(self.errors)
+            ],
+        }
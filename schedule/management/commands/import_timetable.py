@@ -0,0 +1,70 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from schedule.importer import (
+    IMPORT_FORMATS,
+    TimetableImport,
+    TimetableImportError,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Импорт недельного расписания из CSV или JSON. Все строки проверяются "
+        "до вставки; при любой ошибке не вставляется ничего и выводится отчёт "
+        "по строкам."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу CSV или JSON.")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            default=None,
+            help="Формат файла; по умолчанию определяется по расширению.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только проверить строки, ничего не вставляя.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        import_format = options["format"] or path.suffix.lstrip(".").lower()
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError("Укажите --format: csv или json.")
+
+        try:
+            rows = read_rows(path.read_text(encoding="utf-8-sig"), import_format)
+            timetable = TimetableImport(rows)
+            valid = timetable.validate()
+            if valid and not options["dry_run"]:
+                timetable.save()
+        except OSError as e:
+            raise CommandError(f"Не удалось прочитать файл: {e}.")
+        except TimetableImportError as e:
+            raise CommandError(str(e))
+
+        report = timetable.report()
+        for item in report["errors"]:
+            messages = "; ".join(
+                f"{field}: {' '.join(errors)}"
+                for field, errors in item["errors"].items()
+            )
+            self.stderr.write(f"Строка {item['row']}: {messages}")
+        if not valid:
+            raise CommandError(
+                f"Ошибок в строках: {len(report['errors'])} из {report['rows']}. "
+                "Ничего не импортировано."
+            )
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"Проверено строк: {report['rows']}, ошибок нет.")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Импортировано расписаний: {report['created']}.")
+            )
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:35
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schedule", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="schedule",
+            name="capacity",
+            field=models.PositiveSmallIntegerField(
+                default=1,
+                help_text="Максимальное число подтверждённых записей на один слот (1 — индивидуальная тренировка).",
+                validators=[
+                    django.core.validators.MinValueValidator(
+                        1, message="Вместимость должна быть не меньше 1."
+                    )
+                ],
+                verbose_name="Вместимость",
+            ),
+        ),
+    ]
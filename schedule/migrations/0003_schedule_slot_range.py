@@ -0,0 +1,213 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:42
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.datetime
+import django.db.models.lookups
+from django.db import migrations, models
+
+
+def check_overlaps(apps, schema_editor):
+    """
+    Ограничение не создастся, если пересечения уже есть: перечисляем их,
+    чтобы было понятно, какие расписания исправить или отключить.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT a.id, b.id FROM schedule_schedule a "
+            "JOIN schedule_schedule b ON a.id < b.id "
+            "AND a.slot_range && b.slot_range "
+            "WHERE a.is_active AND b.is_active ORDER BY a.id, b.id"
+        )
+        pairs = cursor.fetchall()
+    if pairs:
+        listed = ", ".join(f"#{a} и #{b}" for a, b in pairs[:20])
+        raise RuntimeError(
+            f"Пересекающиеся активные расписания тренеров ({len(pairs)}): {listed}. "
+            "Исправьте время или отключите лишние расписания и повторите миграцию."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schedule", "0002_schedule_capacity"),
+        ("trainers", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="schedule",
+            name="slot_range",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Func(
+                    django.db.models.expressions.CombinedExpression(
+                        django.db.models.expressions.CombinedExpression(
+                            django.db.models.expressions.CombinedExpression(
+                                models.F("trainer"), "*", models.Value(10080)
+                            ),
+                            "+",
+                            django.db.models.expressions.CombinedExpression(
+                                models.Case(
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "monday"
+                                        ),
+                                        then=models.Value(0),
+                                    ),
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "tuesday"
+                                        ),
+                                        then=models.Value(1),
+                                    ),
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "wednesday"
+                                        ),
+                                        then=models.Value(2),
+                                    ),
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "thursday"
+                                        ),
+                                        then=models.Value(3),
+                                    ),
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "friday"
+                                        ),
+                                        then=models.Value(4),
+                                    ),
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "saturday"
+                                        ),
+                                        then=models.Value(5),
+                                    ),
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "sunday"
+                                        ),
+                                        then=models.Value(6),
+                                    ),
+                                    output_field=models.BigIntegerField(),
+                                ),
+                                "*",
+                                models.Value(1440),
+                            ),
+                        ),
+                        "+",
+                        django.db.models.functions.comparison.Cast(
+                            django.db.models.expressions.CombinedExpression(
+                                django.db.models.expressions.CombinedExpression(
+                                    django.db.models.functions.datetime.ExtractHour(
+                                        "start_time"
+                                    ),
+                                    "*",
+                                    models.Value(60),
+                                ),
+                                "+",
+                                django.db.models.functions.datetime.ExtractMinute(
+                                    "start_time"
+                                ),
+                            ),
+                            models.BigIntegerField(),
+                        ),
+                    ),
+                    django.db.models.expressions.CombinedExpression(
+                        django.db.models.expressions.CombinedExpression(
+                            django.db.models.expressions.CombinedExpression(
+                                models.F("trainer"), "*", models.Value(10080)
+                            ),
+                            "+",
+                            django.db.models.expressions.CombinedExpression(
+                                models.Case(
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "monday"
+                                        ),
+                                        then=models.Value(0),
+                                    ),
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "tuesday"
+                                        ),
+                                        then=models.Value(1),
+                                    ),
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "wednesday"
+                                        ),
+                                        then=models.Value(2),
+                                    ),
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "thursday"
+                                        ),
+                                        then=models.Value(3),
+                                    ),
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "friday"
+                                        ),
+                                        then=models.Value(4),
+                                    ),
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "saturday"
+                                        ),
+                                        then=models.Value(5),
+                                    ),
+                                    models.When(
+                                        django.db.models.lookups.Exact(
+                                            models.F("day_of_week"), "sunday"
+                                        ),
+                                        then=models.Value(6),
+                                    ),
+                                    output_field=models.BigIntegerField(),
+                                ),
+                                "*",
+                                models.Value(1440),
+                            ),
+                        ),
+                        "+",
+                        django.db.models.functions.comparison.Cast(
+                            django.db.models.expressions.CombinedExpression(
+                                django.db.models.expressions.CombinedExpression(
+                                    django.db.models.functions.datetime.ExtractHour(
+                                        "end_time"
+                                    ),
+                                    "*",
+                                    models.Value(60),
+                                ),
+                                "+",
+                                django.db.models.functions.datetime.ExtractMinute(
+                                    "end_time"
+                                ),
+                            ),
+                            models.BigIntegerField(),
+                        ),
+                    ),
+                    function="int8range",
+                    output_field=django.contrib.postgres.fields.ranges.BigIntegerRangeField(),
+                ),
+                output_field=django.contrib.postgres.fields.ranges.BigIntegerRangeField(),
+                verbose_name="Интервал занятия тренера",
+            ),
+        ),
+        migrations.RunPython(check_overlaps, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="schedule",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(("is_active", True)),
+                expressions=[("slot_range", "&&")],
+                name="exclude_overlapping_trainer_slots",
+                violation_error_code="schedule_overlap",
+                violation_error_message="У тренера уже есть активное занятие в этот день недели, пересекающееся по времени.",
+            ),
+        ),
+    ]
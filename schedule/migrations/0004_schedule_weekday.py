@@ -0,0 +1,107 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:45
+
+import django.db.models.lookups
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schedule", "0003_schedule_slot_range"),
+        ("trainers", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="schedule",
+            options={
+                "ordering": ["weekday", "start_time"],
+                "verbose_name": "Расписание",
+                "verbose_name_plural": "Расписания",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="schedule",
+            name="schedule_sc_trainer_153ca9_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="schedule",
+            name="schedule_sc_fitness_a0bb43_idx",
+        ),
+        migrations.AddField(
+            model_name="schedule",
+            name="weekday",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(
+                        django.db.models.lookups.Exact(
+                            models.F("day_of_week"), "monday"
+                        ),
+                        then=models.Value(0),
+                    ),
+                    models.When(
+                        django.db.models.lookups.Exact(
+                            models.F("day_of_week"), "tuesday"
+                        ),
+                        then=models.Value(1),
+                    ),
+                    models.When(
+                        django.db.models.lookups.Exact(
+                            models.F("day_of_week"), "wednesday"
+                        ),
+                        then=models.Value(2),
+                    ),
+                    models.When(
+                        django.db.models.lookups.Exact(
+                            models.F("day_of_week"), "thursday"
+                        ),
+                        then=models.Value(3),
+                    ),
+                    models.When(
+                        django.db.models.lookups.Exact(
+                            models.F("day_of_week"), "friday"
+                        ),
+                        then=models.Value(4),
+                    ),
+                    models.When(
+                        django.db.models.lookups.Exact(
+                            models.F("day_of_week"), "saturday"
+                        ),
+                        then=models.Value(5),
+                    ),
+                    models.When(
+                        django.db.models.lookups.Exact(
+                            models.F("day_of_week"), "sunday"
+                        ),
+                        then=models.Value(6),
+                    ),
+                    output_field=models.PositiveSmallIntegerField(),
+                ),
+                help_text="0 — понедельник, 6 — воскресенье.",
+                output_field=models.PositiveSmallIntegerField(),
+                verbose_name="Номер дня недели",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="schedule",
+            index=models.Index(
+                fields=["weekday", "start_time", "id"],
+                name="schedule_sc_weekday_bca21f_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="schedule",
+            index=models.Index(
+                fields=["trainer", "weekday", "start_time"],
+                name="schedule_sc_trainer_27001e_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="schedule",
+            index=models.Index(
+                fields=["fitness_club", "weekday", "start_time"],
+                name="schedule_sc_fitness_47d2d0_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schedule", "0004_schedule_weekday"),
+        ("trainers", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScheduleException",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "date",
+                    models.DateField(help_text="Дата отмены.", verbose_name="Дата"),
+                ),
+                (
+                    "reason",
+                    models.CharField(
+                        blank=True,
+                        help_text="Например, «Праздничный день» или «Тренер болеет».",
+                        max_length=255,
+                        verbose_name="Причина",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "fitness_club",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Клуб, в котором в этот день отменены все занятия.",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="schedule_exceptions",
+                        to="trainers.fitnessclub",
+                        verbose_name="Фитнес-клуб",
+                    ),
+                ),
+                (
+                    "schedule",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Отменяемое занятие.",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="exceptions",
+                        to="schedule.schedule",
+                        verbose_name="Расписание",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Исключение из расписания",
+                "verbose_name_plural": "Исключения из расписания",
+                "ordering": ["date", "id"],
+                "constraints": [
+                    models.CheckConstraint(
+                        condition=models.Q(
+                            ("schedule__isnull", True),
+                            ("fitness_club__isnull", True),
+                            _connector="XOR",
+                        ),
+                        name="schedule_exception_single_target",
+                        violation_error_message="Укажите либо расписание, либо фитнес-клуб.",
+                    ),
+                    models.UniqueConstraint(
+                        fields=("schedule", "date"),
+                        name="unique_schedule_exception",
+                        violation_error_message="Это занятие на эту дату уже отменено.",
+                    ),
+                    models.UniqueConstraint(
+                        fields=("fitness_club", "date"),
+                        name="unique_club_closure",
+                        violation_error_message="Клуб на эту дату уже закрыт.",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -1,11 +1,19 @@
 # schedule/models.py
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import BigIntegerRangeField, RangeOperators
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Cast, ExtractHour, ExtractMinute
+from django.db.models.lookups import Exact
+from trainers.membership import is_club_member
 from trainers.models import Trainer, FitnessClub
 from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
+from collections import defaultdict
 from datetime import (
     timedelta,
     datetime,
-)  # Не нужны MinValueValidator, MaxValueValidator, time, т.к. max_clients удален
+)
 
 
 class DayOfWeek(models.TextChoices):
@@ -20,11 +28,46 @@ class DayOfWeek(models.TextChoices):
 
 # TrainingType класс удален, так как training_type больше не используется в Schedule
 
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+# Номер дня недели: 0 — понедельник, 6 — воскресенье (как у ``date.weekday()``).
+WEEKDAY_NUMBERS = {value: index for index, value in enumerate(DayOfWeek.values)}
+
+
+def weekday_number(output_field):
+    """
+    Выражение: номер дня недели расписания по ``WEEKDAY_NUMBERS``.
+    """
+    return models.Case(
+        *[
+            models.When(Exact(models.F("day_of_week"), value), then=models.Value(index))
+            for value, index in WEEKDAY_NUMBERS.items()
+        ],
+        output_field=output_field,
+    )
+
+
+def trainer_minute(time_field):
+    """
+    Выражение: номер минуты недели тренера на общей числовой оси
+    ``trainer_id * MINUTES_PER_WEEK + день_недели * MINUTES_PER_DAY + минута_дня``.
+    Недели разных тренеров и дни одного тренера на оси не пересекаются.
+    """
+    weekday = weekday_number(models.BigIntegerField())
+    minute = Cast(
+        ExtractHour(time_field) * 60 + ExtractMinute(time_field),
+        models.BigIntegerField(),
+    )
+    return models.F("trainer") * MINUTES_PER_WEEK + weekday * MINUTES_PER_DAY + minute
+
 
 class Schedule(models.Model):
     """
     Модель для расписания тренировок тренеров.
-    Теперь не различает индивидуальные/групповые тренировки и не отслеживает максимальное количество клиентов.
+    Индивидуальная тренировка — слот вместимостью 1, групповое занятие —
+    слот с большей вместимостью (``capacity``).
     """
 
     trainer = models.ForeignKey(
@@ -47,13 +90,47 @@ class Schedule(models.Model):
         verbose_name="День недели",
         help_text="День недели, в который проводится тренировка.",
     )
+    # Числовой день недели хранится вычисляемым столбцом: всегда совпадает
+    # с day_of_week, сортирует неделю по порядку и обслуживается индексами.
+    weekday = models.GeneratedField(
+        expression=weekday_number(models.PositiveSmallIntegerField()),
+        output_field=models.PositiveSmallIntegerField(),
+        db_persist=True,
+        verbose_name="Номер дня недели",
+        help_text="0 — понедельник, 6 — воскресенье.",
+    )
     start_time = models.TimeField(
         verbose_name="Время начала", help_text="Время начала тренировки (ЧЧ:ММ)."
     )
     end_time = models.TimeField(
         verbose_name="Время окончания", help_text="Время окончания тренировки (ЧЧ:ММ)."
     )
-    # Поля training_type и max_clients удалены
+    # Поле training_type удалено; групповые занятия задаются вместимостью слота.
+    capacity = models.PositiveSmallIntegerField(
+        default=1,
+        validators=[
+            MinValueValidator(1, message="Вместимость должна быть не меньше 1.")
+        ],
+        verbose_name="Вместимость",
+        help_text="Максимальное число подтверждённых записей на один слот "
+        "(1 — индивидуальная тренировка).",
+    )
+
+    # Интервал занятия на оси минут тренера (см. trainer_minute). Два интервала
+    # пересекаются, только если это один тренер, один день недели и время
+    # занятий перекрывается, поэтому проверка пересечений — одно условие &&
+    # по GiST-индексу ограничения exclude_overlapping_trainer_slots.
+    slot_range = models.GeneratedField(
+        expression=models.Func(
+            trainer_minute("start_time"),
+            trainer_minute("end_time"),
+            function="int8range",
+            output_field=BigIntegerRangeField(),
+        ),
+        output_field=BigIntegerRangeField(),
+        db_persist=True,
+        verbose_name="Интервал занятия тренера",
+    )
 
     is_active = models.BooleanField(
         default=True,
@@ -78,10 +155,26 @@ class Schedule(models.Model):
             "start_time",
             "end_time",
         )
-        ordering = ["day_of_week", "start_time"]
-        indexes = [  # Индексы сохраняем, так как они полезны для запросов
-            models.Index(fields=["trainer", "day_of_week", "start_time"]),
-            models.Index(fields=["fitness_club", "day_of_week"]),
+        constraints = [
+            # Активные занятия одного тренера в один день недели не могут
+            # пересекаться по времени, даже в разных клубах.
+            ExclusionConstraint(
+                name="exclude_overlapping_trainer_slots",
+                expressions=[("slot_range", RangeOperators.OVERLAPS)],
+                condition=models.Q(is_active=True),
+                violation_error_code="schedule_overlap",
+                violation_error_message=(
+                    "У тренера уже есть активное занятие в этот день недели, "
+                    "пересекающееся по времени."
+                ),
+            ),
+        ]
+        ordering = ["weekday", "start_time"]
+        # Неделя по порядку: целиком, по тренеру и по клубу
+        indexes = [
+            models.Index(fields=["weekday", "start_time", "id"]),
+            models.Index(fields=["trainer", "weekday", "start_time"]),
+            models.Index(fields=["fitness_club", "weekday", "start_time"]),
         ]
 
     def __str__(self):
@@ -91,10 +184,43 @@ class Schedule(models.Model):
             f"{self.end_time.strftime('%H:%M')})"
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Клуб и день на момент загрузки: при переносе расписания кэш
+        # сбрасывается и для прежнего места в недельном расписании клуба.
+        instance._loaded_timetable = (
+            instance.__dict__.get("fitness_club_id"),
+            instance.__dict__.get("weekday"),
+        )
+        # Тренер и клуб на момент загрузки: при переносе расписания
+        # сбрасываются и прежние календари .ics.
+        instance._loaded_feeds = (
+            instance.__dict__.get("trainer_id"),
+            instance.__dict__.get("fitness_club_id"),
+        )
+        return instance
+
     def clean(self):
         super().clean()
 
         # 1. Валидация времени начала и окончания
+        self.clean_times()
+
+        # 2. Валидация: тренер должен быть привязан к данному фитнес-клубу
+        if self.trainer_id and self.fitness_club_id:
+            if not is_club_member(self.trainer_id, self.fitness_club_id):
+                raise ValidationError(
+                    {
+                        "fitness_club": "Выбранный тренер не работает в этом фитнес-клубе."
+                    },
+                    code="trainer_not_in_club",
+                )
+
+    def clean_times(self):
+        """
+        Проверки времени занятия, не требующие обращения к БД.
+        """
         if self.start_time and self.end_time:
             if self.start_time >= self.end_time:
                 raise ValidationError(
@@ -119,12 +245,106 @@ class Schedule(models.Model):
                     {"end_time": "Длительность тренировки не должна превышать 8 часов."}
                 )
 
-        # 2. Валидация: тренер должен быть привязан к данному фитнес-клубу
-        if self.trainer and self.fitness_club:
-            if self.fitness_club not in self.trainer.clubs.all():
+
+class ScheduleExceptionManager(models.Manager):
+    def cancelled(self, schedules, date_from, date_to):
+        """
+        Пары ``(schedule_id, date)`` отменённых занятий расписаний ``schedules``
+        за диапазон дат — одним запросом по уникальным индексам
+        ``(schedule, date)`` и ``(fitness_club, date)``.
+        """
+        by_club = defaultdict(list)
+        for schedule in schedules:
+            by_club[schedule.fitness_club_id].append(schedule.id)
+        if not by_club:
+            return set()
+
+        rows = self.filter(
+            Q(schedule_id__in=[pk for ids in by_club.values() for pk in ids])
+            | Q(fitness_club_id__in=by_club.keys()),
+            date__range=(date_from, date_to),
+        ).values_list("schedule_id", "fitness_club_id", "date")
+        cancelled = set()
+        for schedule_id, club_id, day in rows:
+            if schedule_id is not None:
+                cancelled.add((schedule_id, day))
+            else:
+                cancelled.update((pk, day) for pk in by_club[club_id])
+        return cancelled
+
+    def is_cancelled(self, schedule, day):
+        return (schedule.id, day) in self.cancelled([schedule], day, day)
+
+
+class ScheduleException(models.Model):
+    """
+    Исключение из недельного расписания на конкретную дату: отмена одного
+    занятия (задано ``schedule``) или закрытие всего клуба, например
+    в праздник (задан ``fitness_club``).
+    """
+
+    schedule = models.ForeignKey(
+        Schedule,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="exceptions",
+        verbose_name="Расписание",
+        help_text="Отменяемое занятие.",
+    )
+    fitness_club = models.ForeignKey(
+        FitnessClub,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="schedule_exceptions",
+        verbose_name="Фитнес-клуб",
+        help_text="Клуб, в котором в этот день отменены все занятия.",
+    )
+    date = models.DateField(verbose_name="Дата", help_text="Дата отмены.")
+    reason = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name="Причина",
+        help_text="Например, «Праздничный день» или «Тренер болеет».",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+
+    objects = ScheduleExceptionManager()
+
+    class Meta:
+        verbose_name = "Исключение из расписания"
+        verbose_name_plural = "Исключения из расписания"
+        ordering = ["date", "id"]
+        # Уникальные индексы обслуживают и поиск отмен за диапазон дат.
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(schedule__isnull=True) ^ Q(fitness_club__isnull=True),
+                name="schedule_exception_single_target",
+                violation_error_message="Укажите либо расписание, либо фитнес-клуб.",
+            ),
+            models.UniqueConstraint(
+                fields=["schedule", "date"],
+                name="unique_schedule_exception",
+                violation_error_message="Это занятие на эту дату уже отменено.",
+            ),
+            models.UniqueConstraint(
+                fields=["fitness_club", "date"],
+                name="unique_club_closure",
+                violation_error_message="Клуб на эту дату уже закрыт.",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Отмена {self.date}: {self.schedule or self.fitness_club}"
+
+    def clean(self):
+        super().clean()
+        if self.schedule is not None and self.date:
+            if self.date.weekday() != self.schedule.weekday:
                 raise ValidationError(
                     {
-                        "fitness_club": "Выбранный тренер не работает в этом фитнес-клубе."
-                    },
-                    code="trainer_not_in_club",
+                        "date": "Дата не соответствует дню недели расписания "
+                        f"({self.schedule.get_day_of_week_display()})."
+                    }
                 )
@@ -23,3 +23,83 @@ date_param = OpenApiParameter(
         "Например, если 2025-07-17 был четверг, будут показаны все расписания, запланированные на четверг."
     ),
 )
+
+calendar_from_param = OpenApiParameter(
+    name="from",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    required=True,
+    description="Первый день календаря (формат: ГГГГ-ММ-ДД).",
+)
+
+calendar_to_param = OpenApiParameter(
+    name="to",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    required=True,
+    description="Последний день календаря включительно (формат: ГГГГ-ММ-ДД).",
+)
+
+dry_run_param = OpenApiParameter(
+    name="dry_run",
+    type=bool,
+    location=OpenApiParameter.QUERY,
+    description="Только проверить строки, ничего не создавая.",
+)
+
+exception_fitness_club_id_param = OpenApiParameter(
+    name="fitness_club_id",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description="Закрытия клуба и отмены занятий его расписаний.",
+)
+
+exception_schedule_id_param = OpenApiParameter(
+    name="schedule_id",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description="Отмены занятий одного расписания.",
+)
+
+exception_date_from_param = OpenApiParameter(
+    name="date_from",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description="Исключения не раньше этой даты (формат: ГГГГ-ММ-ДД).",
+)
+
+exception_date_to_param = OpenApiParameter(
+    name="date_to",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description="Исключения не позже этой даты (формат: ГГГГ-ММ-ДД).",
+)
+
+feed_token_param = OpenApiParameter(
+    name="token",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    required=True,
+    description="Подпись ссылки из списка календарей.",
+)
+
+feed_fitness_club_id_param = OpenApiParameter(
+    name="fitness_club_id",
+    type=int,
+    location=OpenApiParameter.QUERY,
+    description="Добавить ссылку на календарь клуба.",
+)
+
+feed_trainer_id_param = OpenApiParameter(
+    name="trainer_id",
+    type=int,
+    location=OpenApiParameter.QUERY,
+    description="Добавить ссылку на календарь тренера (только админ).",
+)
+
+feed_client_id_param = OpenApiParameter(
+    name="client_id",
+    type=int,
+    location=OpenApiParameter.QUERY,
+    description="Добавить ссылку на календарь записей клиента (только админ).",
+)
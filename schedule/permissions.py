@@ -35,3 +35,15 @@ class IsAdminOrTrainerOwnerOfSchedule(permissions.BasePermission):
         ):
             return True
         return False
+
+
+class IsAdminOrReadOnly(permissions.BasePermission):
+    """
+    Изменять могут только администраторы, просматривать — все
+    аутентифицированные пользователи.
+    """
+
+    def has_permission(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return False
+        return request.method in permissions.SAFE_METHODS or request.user.is_staff
@@ -1,8 +1,43 @@
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiResponse, extend_schema_view
-from .serializers import ScheduleSerializer
-from .parameters import trainer_id_param, fitness_club_id_param, date_param
+from .serializers import (
+    CalendarFeedLinkSerializer,
+    ScheduleExceptionSerializer,
+    ScheduleOccurrenceSerializer,
+    ScheduleSerializer,
+    TimetableCacheStatsSerializer,
+    TimetableImportFileSerializer,
+    TimetableImportReportSerializer,
+    TimetableImportRowSerializer,
+)
+from fitness_backend.parameters import (
+    expand_param,
+    fields_param,
+    if_modified_since_param,
+    if_none_match_param,
+)
+from .parameters import (
+    trainer_id_param,
+    fitness_club_id_param,
+    date_param,
+    calendar_from_param,
+    calendar_to_param,
+    dry_run_param,
+    exception_date_from_param,
+    exception_date_to_param,
+    exception_fitness_club_id_param,
+    exception_schedule_id_param,
+    feed_client_id_param,
+    feed_fitness_club_id_param,
+    feed_token_param,
+    feed_trainer_id_param,
+)
 
-common_tags = {"schedule": ["Расписания"]}
+common_tags = {
+    "schedule": ["Расписания"],
+    "exceptions": ["Исключения из расписания"],
+    "feeds": ["Календари .ics"],
+}
 
 
 schedule_extend_schema_view = extend_schema_view(
@@ -12,11 +47,22 @@ schedule_extend_schema_view = extend_schema_view(
             "Получение списка всех расписаний тренировок. "
             "Клиенты и гости видят все расписания. "
             "Тренеры видят только свои расписания. "
-            "Поддерживается фильтрация по ID тренера, ID фитнес-клуба и дате."
+            "Поддерживается фильтрация по ID тренера, ID фитнес-клуба и дате. "
+            "Расписание клуба (только fitness_club_id и, возможно, date) отдаётся "
+            "из кэша по дням недели; кэш сбрасывается при изменении расписаний, "
+            "тренеров и клубов."
         ),
-        parameters=[trainer_id_param, fitness_club_id_param, date_param],
+        parameters=[
+            trainer_id_param,
+            fitness_club_id_param,
+            date_param,
+            fields_param,
+            expand_param,
+            if_none_match_param,
+        ],
         responses={
             200: ScheduleSerializer(many=True),
+            304: OpenApiResponse(description="Данные не изменились (условный запрос)."),
             400: OpenApiResponse(description="Неверный формат даты."),
             401: OpenApiResponse(description="Неавторизованный доступ."),
         },
@@ -28,8 +74,15 @@ schedule_extend_schema_view = extend_schema_view(
             "Получение детальной информации о конкретном расписании по его ID. "
             "Доступно всем аутентифицированным пользователям."
         ),
+        parameters=[
+            fields_param,
+            expand_param,
+            if_none_match_param,
+            if_modified_since_param,
+        ],
         responses={
             200: ScheduleSerializer,
+            304: OpenApiResponse(description="Данные не изменились (условный запрос)."),
             401: OpenApiResponse(description="Неавторизованный доступ."),
             404: OpenApiResponse(description="Расписание не найдено."),
         },
@@ -44,7 +97,12 @@ schedule_extend_schema_view = extend_schema_view(
         request=ScheduleSerializer,
         responses={
             201: ScheduleSerializer,
-            400: OpenApiResponse(description="Неверные данные запроса."),
+            400: OpenApiResponse(
+                description=(
+                    "Неверные данные запроса (в том числе пересечение с другим "
+                    "активным занятием тренера в этот день недели)."
+                )
+            ),
             401: OpenApiResponse(description="Неавторизованный доступ."),
             403: OpenApiResponse(
                 description="Доступ запрещён (например, тренер пытается создать расписание для другого тренера)."
@@ -61,7 +119,12 @@ schedule_extend_schema_view = extend_schema_view(
         request=ScheduleSerializer,
         responses={
             200: ScheduleSerializer,
-            400: OpenApiResponse(description="Неверные данные запроса."),
+            400: OpenApiResponse(
+                description=(
+                    "Неверные данные запроса (в том числе пересечение с другим "
+                    "активным занятием тренера в этот день недели)."
+                )
+            ),
             401: OpenApiResponse(description="Неавторизованный доступ."),
             403: OpenApiResponse(description="Доступ запрещён."),
             404: OpenApiResponse(description="Расписание не найдено."),
@@ -77,7 +140,12 @@ schedule_extend_schema_view = extend_schema_view(
         request=ScheduleSerializer(partial=True),
         responses={
             200: ScheduleSerializer,
-            400: OpenApiResponse(description="Неверные данные запроса."),
+            400: OpenApiResponse(
+                description=(
+                    "Неверные данные запроса (в том числе пересечение с другим "
+                    "активным занятием тренера в этот день недели)."
+                )
+            ),
             401: OpenApiResponse(description="Неавторизованный доступ."),
             403: OpenApiResponse(description="Доступ запрещён."),
             404: OpenApiResponse(description="Расписание не найдено."),
@@ -95,4 +163,199 @@ schedule_extend_schema_view = extend_schema_view(
         },
         tags=common_tags["schedule"],
     ),
+    calendar=extend_schema(
+        summary="Календарь занятий",
+        description=(
+            "Развёртывание недельных расписаний в занятия на каждую дату периода "
+            "(до 92 дней) одним запросом. Для каждого занятия выводится число записей "
+            "по статусам и число свободных мест. Учитываются только активные "
+            "расписания; фильтры по тренеру и фитнес-клубу и ограничения видимости "
+            "те же, что у списка. Ответ — JSON-массив, который отдаётся потоком "
+            "по мере формирования."
+        ),
+        parameters=[
+            calendar_from_param,
+            calendar_to_param,
+            trainer_id_param,
+            fitness_club_id_param,
+        ],
+        responses={
+            200: ScheduleOccurrenceSerializer(many=True),
+            400: OpenApiResponse(description="Неверный или слишком длинный период."),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+        },
+        tags=common_tags["schedule"],
+    ),
+    timetable_cache=extend_schema(
+        summary="Статистика кэша расписаний клубов (только админ)",
+        description=(
+            "Число дней недельного расписания клубов, отданных из кэша и загруженных "
+            "из БД, и доля попаданий."
+        ),
+        responses={
+            200: TimetableCacheStatsSerializer,
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+        },
+        tags=common_tags["schedule"],
+    ),
+    import_timetable=extend_schema(
+        summary="Импорт недельного расписания (только админ)",
+        description=(
+            "Массовое создание расписаний из JSON (массив строк) или файла CSV/JSON. "
+            "Все строки проверяются до вставки: длительность, членство тренера в клубе, "
+            "уникальность и пересечения занятий тренера. Если ошибок нет, расписания "
+            "создаются одной транзакцией; иначе не создаётся ничего, а в ответе "
+            "перечислены ошибки по строкам."
+        ),
+        parameters=[dry_run_param],
+        request={
+            "application/json": TimetableImportRowSerializer(many=True),
+            "multipart/form-data": TimetableImportFileSerializer,
+        },
+        responses={
+            200: OpenApiResponse(
+                TimetableImportReportSerializer, description="Проверка без создания."
+            ),
+            201: TimetableImportReportSerializer,
+            400: OpenApiResponse(
+                TimetableImportReportSerializer,
+                description="Ошибки в строках или неверный формат файла.",
+            ),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+            409: OpenApiResponse(
+                description="Расписания изменились во время импорта; повторите запрос."
+            ),
+        },
+        tags=common_tags["schedule"],
+    ),
+)
+
+
+schedule_exception_extend_schema_view = extend_schema_view(
+    list=extend_schema(
+        summary="Список исключений из расписания",
+        description=(
+            "Отмены отдельных занятий и закрытия клубов на конкретные даты. "
+            "Отменённые занятия не попадают в календарь и свободные слоты, "
+            "записаться на них нельзя."
+        ),
+        parameters=[
+            exception_fitness_club_id_param,
+            exception_schedule_id_param,
+            exception_date_from_param,
+            exception_date_to_param,
+        ],
+        responses={
+            200: ScheduleExceptionSerializer(many=True),
+            400: OpenApiResponse(description="Неверный формат даты."),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+        },
+        tags=common_tags["exceptions"],
+    ),
+    retrieve=extend_schema(
+        summary="Детали исключения из расписания",
+        responses={
+            200: ScheduleExceptionSerializer,
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            404: OpenApiResponse(description="Исключение не найдено."),
+        },
+        tags=common_tags["exceptions"],
+    ),
+    create=extend_schema(
+        summary="Отмена занятия или закрытие клуба (только админ)",
+        description=(
+            "Укажите schedule_id, чтобы отменить одно занятие (дата должна "
+            "приходиться на день недели расписания), или fitness_club_id, "
+            "чтобы отменить все занятия клуба в этот день."
+        ),
+        request=ScheduleExceptionSerializer,
+        responses={
+            201: ScheduleExceptionSerializer,
+            400: OpenApiResponse(
+                description="Не указана цель или указаны обе, дата не совпадает "
+                "с днём недели расписания, отмена на эту дату уже есть."
+            ),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+        },
+        tags=common_tags["exceptions"],
+    ),
+    update=extend_schema(
+        summary="Изменение исключения из расписания (только админ)",
+        request=ScheduleExceptionSerializer,
+        responses={
+            200: ScheduleExceptionSerializer,
+            400: OpenApiResponse(description="Ошибка валидации данных."),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+            404: OpenApiResponse(description="Исключение не найдено."),
+        },
+        tags=common_tags["exceptions"],
+    ),
+    partial_update=extend_schema(
+        summary="Частичное изменение исключения из расписания (только админ)",
+        request=ScheduleExceptionSerializer,
+        responses={
+            200: ScheduleExceptionSerializer,
+            400: OpenApiResponse(description="Ошибка валидации данных."),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+            404: OpenApiResponse(description="Исключение не найдено."),
+        },
+        tags=common_tags["exceptions"],
+    ),
+    destroy=extend_schema(
+        summary="Удаление исключения из расписания (только админ)",
+        responses={
+            204: OpenApiResponse(description="Исключение удалено."),
+            401: OpenApiResponse(description="Неавторизованный доступ."),
+            403: OpenApiResponse(description="Доступ запрещён."),
+            404: OpenApiResponse(description="Исключение не найдено."),
+        },
+        tags=common_tags["exceptions"],
+    ),
+)
+
+
+calendar_feed_links_extend_schema = extend_schema(
+    summary="Ссылки на календари .ics",
+    description=(
+        "Подписанные ссылки для подписки в календарном приложении: клиенту — "
+        "календарь его записей, тренеру — его расписание. По fitness_club_id "
+        "добавляется календарь клуба; администраторы могут запросить календари "
+        "любого тренера и клиента."
+    ),
+    parameters=[
+        feed_fitness_club_id_param,
+        feed_trainer_id_param,
+        feed_client_id_param,
+    ],
+    responses={
+        200: CalendarFeedLinkSerializer(many=True),
+        400: OpenApiResponse(description="Неверный формат ID."),
+        401: OpenApiResponse(description="Неавторизованный доступ."),
+        403: OpenApiResponse(description="Доступ запрещён."),
+    },
+    tags=common_tags["feeds"],
+)
+
+calendar_feed_extend_schema = extend_schema(
+    summary="Календарь .ics",
+    description=(
+        "Календарь в формате iCalendar по подписанной ссылке, без JWT. "
+        "Расписания тренера и клуба — еженедельные повторяющиеся события "
+        "с исключёнными отменёнными датами, календарь клиента — его записи. "
+        "Ответ кэшируется; ETag меняется при изменении данных календаря, "
+        "запрос с совпадающим If-None-Match получает 304."
+    ),
+    auth=[],
+    parameters=[feed_token_param, if_none_match_param],
+    responses={
+        (200, "text/calendar"): OpenApiTypes.STR,
+        304: OpenApiResponse(description="Календарь не изменился."),
+        404: OpenApiResponse(description="Календарь не найден или неверная подпись."),
+    },
+    tags=common_tags["feeds"],
 )
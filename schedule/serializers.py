@@ -1,16 +1,22 @@
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
+from fitness_backend.serializers import FlexFieldsMixin
 from trainers.models import Trainer, FitnessClub
-from .models import Schedule
+from .models import DayOfWeek, Schedule, ScheduleException
 from trainers.serializers import TrainerSerializer, FitnessClubSerializer
 
 
-class ScheduleSerializer(serializers.ModelSerializer):
+class ScheduleSerializer(FlexFieldsMixin, serializers.ModelSerializer):
     trainer = TrainerSerializer(read_only=True)
     fitness_club = FitnessClubSerializer(read_only=True)
     day_of_week_display = serializers.CharField(
         source="get_day_of_week_display", read_only=True
     )
+    weekday = serializers.IntegerField(
+        read_only=True, help_text="Номер дня недели: 0 — понедельник, 6 — воскресенье."
+    )
     trainer_id = serializers.PrimaryKeyRelatedField(
         queryset=Trainer.objects.all(), source="trainer", write_only=True, required=True
     )
@@ -31,10 +37,190 @@ class ScheduleSerializer(serializers.ModelSerializer):
             "fitness_club_id",
             "day_of_week",
             "day_of_week_display",
+            "weekday",
             "start_time",
             "end_time",
+            "capacity",
             "is_active",
             "created_at",
             "updated_at",
         ]
         read_only_fields = ["created_at", "updated_at"]
+
+    # Поля модели, которые проверяет Schedule.clean() и ограничения модели.
+    validated_model_fields = (
+        "trainer",
+        "fitness_club",
+        "day_of_week",
+        "start_time",
+        "end_time",
+        "capacity",
+        "is_active",
+    )
+
+    def validate(self, data):
+        values = {}
+        if self.instance is not None:
+            values = {
+                field: getattr(self.instance, field)
+                for field in self.validated_model_fields
+            }
+        values.update(data)
+        instance = Schedule(**values)
+        if self.instance is not None:
+            # Сохранённое расписание не пересекается само с собой.
+            instance.pk = self.instance.pk
+            instance._state.adding = False
+        try:
+            instance.clean()
+            # Пересечение с другими занятиями тренера проверяет
+            # exclude_overlapping_trainer_slots — одним запросом по GiST-индексу.
+            instance.validate_constraints()
+        except ValidationError as e:
+            field_map = {
+                "trainer": "trainer_id",
+                "fitness_club": "fitness_club_id",
+                NON_FIELD_ERRORS: api_settings.NON_FIELD_ERRORS_KEY,
+            }
+            raise serializers.ValidationError(
+                {
+                    field_map.get(field, field): messages
+                    for field, messages in e.message_dict.items()
+                }
+            )
+        return data
+
+
+class ScheduleExceptionSerializer(serializers.ModelSerializer):
+    schedule_id = serializers.PrimaryKeyRelatedField(
+        queryset=Schedule.objects.all(),
+        source="schedule",
+        required=False,
+        allow_null=True,
+        help_text="Отменяемое занятие (либо fitness_club_id).",
+    )
+    fitness_club_id = serializers.PrimaryKeyRelatedField(
+        queryset=FitnessClub.objects.all(),
+        source="fitness_club",
+        required=False,
+        allow_null=True,
+        help_text="Клуб, закрытый в этот день (либо schedule_id).",
+    )
+
+    class Meta:
+        model = ScheduleException
+        fields = [
+            "id",
+            "schedule_id",
+            "fitness_club_id",
+            "date",
+            "reason",
+            "created_at",
+        ]
+        read_only_fields = ["created_at"]
+        # Уникальность и выбор цели проверяются ограничениями модели в validate().
+        validators = []
+
+    def validate(self, data):
+        values = {}
+        if self.instance is not None:
+            values = {
+                field: getattr(self.instance, field)
+                for field in ("schedule", "fitness_club", "date", "reason")
+            }
+        values.update(data)
+        instance = ScheduleException(**values)
+        if self.instance is not None:
+            instance.pk = self.instance.pk
+            instance._state.adding = False
+        try:
+            instance.clean()
+            instance.validate_constraints()
+        except ValidationError as e:
+            field_map = {
+                "schedule": "schedule_id",
+                "fitness_club": "fitness_club_id",
+                NON_FIELD_ERRORS: api_settings.NON_FIELD_ERRORS_KEY,
+            }
+            raise serializers.ValidationError(
+                {
+                    field_map.get(field, field): messages
+                    for field, messages in e.message_dict.items()
+                }
+            )
+        return data
+
+
+class ScheduleOccurrenceSerializer(serializers.Serializer):
+    """
+    Занятие календаря: расписание, развёрнутое на конкретную дату.
+    Используется для описания потокового ответа в схеме API.
+    """
+
+    schedule_id = serializers.IntegerField()
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    trainer_id = serializers.IntegerField()
+    trainer_name = serializers.CharField()
+    fitness_club_id = serializers.IntegerField()
+    fitness_club_name = serializers.CharField()
+    capacity = serializers.IntegerField()
+    free_places = serializers.IntegerField(
+        help_text="Вместимость минус подтверждённые записи."
+    )
+    bookings = serializers.DictField(
+        child=serializers.IntegerField(),
+        help_text="Число записей на занятие по статусам.",
+    )
+
+
+class TimetableCacheStatsSerializer(serializers.Serializer):
+    hits = serializers.IntegerField(help_text="Дней расписания отдано из кэша.")
+    misses = serializers.IntegerField(help_text="Дней расписания загружено из БД.")
+    hit_ratio = serializers.FloatField(
+        allow_null=True, help_text="Доля попаданий; null, пока обращений не было."
+    )
+
+
+class TimetableImportRowSerializer(serializers.Serializer):
+    """
+    Строка импорта расписания (для описания запроса в схеме API).
+    """
+
+    trainer_id = serializers.IntegerField()
+    fitness_club_id = serializers.IntegerField()
+    day_of_week = serializers.ChoiceField(choices=DayOfWeek.choices)
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    capacity = serializers.IntegerField(required=False, default=1)
+    is_active = serializers.BooleanField(required=False, default=True)
+
+
+class TimetableImportFileSerializer(serializers.Serializer):
+    file = serializers.FileField(help_text="Файл CSV (с заголовком) или JSON.")
+    import_format = serializers.ChoiceField(
+        choices=["csv", "json"],
+        required=False,
+        help_text="Формат файла; по умолчанию определяется по расширению.",
+    )
+
+
+class TimetableImportReportSerializer(serializers.Serializer):
+    rows = serializers.IntegerField(help_text="Строк в запросе.")
+    created = serializers.IntegerField(help_text="Создано расписаний.")
+    errors = serializers.ListField(
+        child=serializers.DictField(),
+        help_text="Ошибки по строкам: номер строки (с 1) и ошибки по полям.",
+    )
+
+
+class CalendarFeedLinkSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(
+        choices=["trainer", "club", "client"],
+        help_text="Чей календарь: тренера, клуба или записи клиента.",
+    )
+    id = serializers.IntegerField(help_text="ID тренера, клуба или клиента.")
+    url = serializers.URLField(
+        help_text="Подписанная ссылка на календарь .ics для подписки в приложении."
+    )
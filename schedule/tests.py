@@ -1,3 +1,569 @@
-from django.test import TestCase
+import json
+from datetime import date, time, timedelta
 
-# Create your tests here.
+from django.core import checks
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bookings.models import Booking, BookingStatus
+from fitness_backend.cache import check_shared_cache
+from trainers.models import FitnessClub, Trainer
+from users.models import Role, User
+from .models import DayOfWeek, Schedule, ScheduleException
+
+
+class ScheduleListQueryBudgetTests(TestCase):
+    """
+    Число запросов списка расписаний не зависит от количества расписаний.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_user = User.objects.create_user(
+            username="client", email="client@example.com", role=Role.CLIENT
+        )
+        clubs = [FitnessClub.objects.create(name=f"Клуб {i}") for i in range(3)]
+        for i in range(5):
+            trainer_user = User.objects.create_user(
+                username=f"trainer{i}",
+                email=f"trainer{i}@example.com",
+                role=Role.TRAINER,
+            )
+            trainer = Trainer.objects.create(user=trainer_user)
+            trainer.clubs.set(clubs)
+            for day_of_week in DayOfWeek.values:
+                Schedule.objects.create(
+                    trainer=trainer,
+                    fitness_club=clubs[i % len(clubs)],
+                    day_of_week=day_of_week,
+                    start_time=time(8 + i),
+                    end_time=time(9 + i),
+                )
+        cls.trainer_user = trainer_user
+
+    def test_schedule_list(self):
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        # расписания с тренерами, пользователями и клубами + клубы тренеров
+        with self.assertNumQueries(2):
+            response = api.get("/api/schedule/schedules/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 35)
+
+    def test_schedule_list_for_trainer(self):
+        api = APIClient()
+        api.force_authenticate(self.trainer_user)
+        with self.assertNumQueries(2):
+            response = api.get("/api/schedule/schedules/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item["day_of_week"] for item in response.data["results"]],
+            DayOfWeek.values,
+        )
+
+    def test_calendar_expands_weekly_templates(self):
+        schedule = Schedule.objects.filter(trainer__user=self.trainer_user).first()
+        day = date.today() + timedelta(days=1)
+        day += timedelta(
+            days=(DayOfWeek.values.index(schedule.day_of_week) - day.weekday()) % 7
+        )
+        Booking.objects.create(
+            client=self.client_user,
+            schedule=schedule,
+            booking_date=day,
+            booking_time=schedule.start_time,
+            status=BookingStatus.CONFIRMED,
+        )
+
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        # расписания с тренерами и клубами, число записей из сводки, отмены
+        with self.assertNumQueries(3):
+            response = api.get(
+                "/api/schedule/schedules/calendar/",
+                {"from": str(day), "to": str(day + timedelta(days=13))},
+            )
+            occurrences = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(occurrences), 70)
+        self.assertEqual(
+            [item["date"] for item in occurrences],
+            sorted(item["date"] for item in occurrences),
+        )
+        booked = next(
+            item
+            for item in occurrences
+            if item["schedule_id"] == schedule.id and item["date"] == str(day)
+        )
+        self.assertEqual(booked["bookings"]["confirmed"], 1)
+        self.assertEqual(booked["free_places"], 0)
+
+
+class ScheduleWeekdayOrderTests(TestCase):
+    """
+    Расписания упорядочены по номеру дня недели, а не по названию дня.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_user = User.objects.create_user(
+            username="client", email="client@example.com", role=Role.CLIENT
+        )
+        trainer = Trainer.objects.create(
+            user=User.objects.create_user(
+                username="trainer", email="trainer@example.com", role=Role.TRAINER
+            )
+        )
+        cls.club = FitnessClub.objects.create(name="Клуб")
+        trainer.clubs.add(cls.club)
+        # По алфавиту «friday» < «monday» < «sunday»; создаются не по порядку.
+        cls.friday, cls.sunday, cls.monday = [
+            Schedule.objects.create(
+                trainer=trainer,
+                fitness_club=cls.club,
+                day_of_week=day_of_week,
+                start_time=time(hour),
+                end_time=time(hour + 1),
+            )
+            for day_of_week, hour in (
+                (DayOfWeek.FRIDAY, 8),
+                (DayOfWeek.SUNDAY, 9),
+                (DayOfWeek.MONDAY, 18),
+            )
+        ]
+
+    def setUp(self):
+        # Откат транзакции теста не возвращает кэш расписаний клуба.
+        cache.clear()
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def ids(self, **params):
+        response = self.api.get("/api/schedule/schedules/", params)
+        self.assertEqual(response.status_code, 200)
+        return [item["id"] for item in response.data["results"]]
+
+    def test_list_is_ordered_monday_to_sunday(self):
+        week = [self.monday.id, self.friday.id, self.sunday.id]
+        self.assertEqual(self.ids(), week)
+        self.assertEqual(self.ids(fitness_club_id=self.club.id), week)
+
+    def test_date_filter_matches_weekday(self):
+        friday = date.today() + timedelta(days=(4 - date.today().weekday()) % 7)
+        self.assertEqual(self.ids(date=str(friday)), [self.friday.id])
+        self.assertEqual(
+            self.ids(fitness_club_id=self.club.id, date=str(friday + timedelta(2))),
+            [self.sunday.id],
+        )
+
+        # Перенос на другой день сбрасывает кэш расписания клуба для обоих дней.
+        self.monday.day_of_week = DayOfWeek.FRIDAY
+        self.monday.save()
+        self.assertEqual(
+            self.ids(fitness_club_id=self.club.id, date=str(friday)),
+            [self.friday.id, self.monday.id],
+        )
+        self.assertEqual(
+            self.ids(
+                fitness_club_id=self.club.id, date=str(friday - timedelta(days=4))
+            ),
+            [],
+        )
+
+
+class ScheduleOverlapTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", role=Role.ADMIN, is_staff=True
+        )
+        trainer_user = User.objects.create_user(
+            username="trainer", email="trainer@example.com", role=Role.TRAINER
+        )
+        cls.trainer = Trainer.objects.create(user=trainer_user)
+        cls.clubs = [FitnessClub.objects.create(name=f"Клуб {i}") for i in range(2)]
+        cls.trainer.clubs.set(cls.clubs)
+        Schedule.objects.create(
+            trainer=cls.trainer,
+            fitness_club=cls.clubs[0],
+            day_of_week=DayOfWeek.MONDAY,
+            start_time=time(10),
+            end_time=time(11),
+        )
+
+    def create(self, start, end, club=1, **extra):
+        api = APIClient()
+        api.force_authenticate(self.admin)
+        return api.post(
+            "/api/schedule/schedules/",
+            {
+                "trainer_id": self.trainer.id,
+                "fitness_club_id": self.clubs[club].id,
+                "day_of_week": DayOfWeek.MONDAY,
+                "start_time": start,
+                "end_time": end,
+                **extra,
+            },
+            format="json",
+        )
+
+    def test_overlap_in_another_club_is_rejected(self):
+        response = self.create("10:30", "11:30")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("non_field_errors", response.data)
+
+    def test_adjacent_and_inactive_slots_are_allowed(self):
+        self.assertEqual(self.create("11:00", "12:00").status_code, 201)
+        self.assertEqual(
+            self.create("10:30", "11:30", is_active=False).status_code, 201
+        )
+
+
+class TimetableCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", role=Role.ADMIN, is_staff=True
+        )
+        cls.trainer_user = User.objects.create_user(
+            username="trainer", email="trainer@example.com", role=Role.TRAINER
+        )
+        cls.trainer = Trainer.objects.create(user=cls.trainer_user)
+        cls.clubs = [FitnessClub.objects.create(name=f"Клуб {i}") for i in range(2)]
+        cls.trainer.clubs.set(cls.clubs)
+        cls.schedule = Schedule.objects.create(
+            trainer=cls.trainer,
+            fitness_club=cls.clubs[0],
+            day_of_week=DayOfWeek.MONDAY,
+            start_time=time(10),
+            end_time=time(11),
+        )
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def timetable(self):
+        response = self.api.get(
+            "/api/schedule/schedules/", {"fitness_club_id": self.clubs[0].id}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]
+
+    def test_timetable_is_served_from_cache_until_related_data_changes(self):
+        before = self.api.get("/api/schedule/schedules/timetable-cache/").data
+        self.timetable()
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.timetable()), 1)
+        after = self.api.get("/api/schedule/schedules/timetable-cache/").data
+        self.assertEqual(after["misses"] - before["misses"], 7)
+        self.assertEqual(after["hits"] - before["hits"], 7)
+
+        self.trainer_user.last_name = "Петров"
+        self.trainer_user.save()
+        self.assertEqual(self.timetable()[0]["trainer"]["user"]["last_name"], "Петров")
+
+        self.clubs[1].name = "Новый клуб"
+        self.clubs[1].save()
+        clubs = self.timetable()[0]["trainer"]["clubs"]
+        self.assertIn("Новый клуб", [club["name"] for club in clubs])
+
+        self.trainer.clubs.remove(self.clubs[1])
+        self.assertEqual(len(self.timetable()[0]["trainer"]["clubs"]), 1)
+
+        self.schedule.day_of_week = DayOfWeek.TUESDAY
+        self.schedule.save()
+        self.assertEqual(self.timetable()[0]["day_of_week"], DayOfWeek.TUESDAY)
+        self.schedule.fitness_club = self.clubs[1]
+        self.trainer.clubs.add(self.clubs[1])
+        self.schedule.save()
+        self.assertEqual(self.timetable(), [])
+
+
+class TimetableImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", role=Role.ADMIN, is_staff=True
+        )
+        cls.club = FitnessClub.objects.create(name="Клуб")
+        cls.other_club = FitnessClub.objects.create(name="Другой клуб")
+        cls.trainer = Trainer.objects.create(
+            user=User.objects.create_user(
+                username="trainer", email="trainer@example.com", role=Role.TRAINER
+            )
+        )
+        cls.trainer.clubs.add(cls.club)
+        Schedule.objects.create(
+            trainer=cls.trainer,
+            fitness_club=cls.club,
+            day_of_week=DayOfWeek.MONDAY,
+            start_time=time(9),
+            end_time=time(10),
+        )
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def upload(self, lines, **params):
+        content = "\n".join(
+            ["trainer_id,fitness_club_id,day_of_week,start_time,end_time,capacity"]
+            + [",".join(map(str, line)) for line in lines]
+        )
+        upload = SimpleUploadedFile("week.csv", content.encode())
+        query = "?dry_run=true" if params.get("dry_run") else ""
+        return self.api.post(
+            f"/api/schedule/schedules/import/{query}",
+            {"file": upload},
+            format="multipart",
+        )
+
+    def test_csv_import_creates_all_rows(self):
+        lines = [
+            (self.trainer.id, self.club.id, day, f"{hour}:00", f"{hour + 1}:00", 10)
+            for day in DayOfWeek.values
+            for hour in (10, 12, 14)
+        ]
+        response = self.upload(lines, dry_run=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 0)
+        self.assertEqual(Schedule.objects.count(), 1)
+
+        with self.assertNumQueries(7):
+            response = self.upload(lines)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {"rows": 21, "created": 21, "errors": []})
+        self.assertEqual(Schedule.objects.filter(capacity=10).count(), 21)
+
+    def test_invalid_rows_are_reported_and_nothing_is_created(self):
+        response = self.upload(
+            [
+                (self.trainer.id, self.club.id, "tuesday", "10:00", "11:00", 1),
+                (self.trainer.id, self.club.id, "monday", "09:30", "10:30", 1),
+                (self.trainer.id, self.other_club.id, "friday", "10:00", "11:00", 1),
+                (self.trainer.id, self.club.id, "sunday", "11:00", "10:00", 1),
+                (self.trainer.id, self.club.id, "tuesday", "10:45", "12:00", 1),
+            ]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [error["row"] for error in response.data["errors"]], [1, 2, 3, 4, 5]
+        )
+        self.assertIn("fitness_club_id", response.data["errors"][2]["errors"])
+        self.assertEqual(Schedule.objects.count(), 1)
+
+
+class ScheduleExceptionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", role=Role.ADMIN, is_staff=True
+        )
+        cls.client_user = User.objects.create_user(
+            username="client", email="client@example.com", role=Role.CLIENT
+        )
+        cls.club = FitnessClub.objects.create(name="Клуб")
+        cls.trainer = Trainer.objects.create(
+            user=User.objects.create_user(
+                username="trainer", email="trainer@example.com", role=Role.TRAINER
+            )
+        )
+        cls.trainer.clubs.add(cls.club)
+        cls.morning, cls.evening = [
+            Schedule.objects.create(
+                trainer=cls.trainer,
+                fitness_club=cls.club,
+                day_of_week=DayOfWeek.MONDAY,
+                start_time=time(hour),
+                end_time=time(hour + 1),
+            )
+            for hour in (9, 18)
+        ]
+        cls.monday = date.today() + timedelta(days=7 - date.today().weekday())
+        cls.next_monday = cls.monday + timedelta(weeks=1)
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def test_cancelled_classes_are_hidden_and_cannot_be_booked(self):
+        response = self.api.post(
+            "/api/schedule/exceptions/",
+            {"schedule_id": self.morning.id, "date": str(self.monday)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        response = self.api.post(
+            "/api/schedule/exceptions/",
+            {"fitness_club_id": self.club.id, "date": str(self.next_monday)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        response = self.api.post(
+            "/api/schedule/exceptions/",
+            {"schedule_id": self.evening.id, "date": str(self.monday + timedelta(1))},
+            format="json",
+        )
+        self.assertIn("date", response.data)
+
+        response = self.api.get(
+            "/api/schedule/schedules/calendar/",
+            {"from": str(self.monday), "to": str(self.next_monday)},
+        )
+        occurrences = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(
+            [(item["schedule_id"], item["date"]) for item in occurrences],
+            [(self.evening.id, str(self.monday))],
+        )
+
+        response = self.api.get(
+            "/api/bookings/availability/",
+            {"fitness_club_id": self.club.id, "date_from": str(self.monday)},
+        )
+        self.assertEqual(
+            [entry["schedule_id"] for entry in response.data["days"][0]["schedules"]],
+            [self.evening.id],
+        )
+
+        self.api.force_authenticate(self.client_user)
+        response = self.api.post(
+            "/api/bookings/bookings/",
+            {
+                "client_id": self.client_user.id,
+                "schedule_id": self.morning.id,
+                "booking_date": str(self.monday),
+                "booking_time": "09:00",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("booking_date", response.data)
+
+        response = self.api.post(
+            "/api/bookings/series/",
+            {
+                "schedule_id": self.evening.id,
+                "start_date": str(self.monday),
+                "booking_time": "18:00",
+                "weeks": 3,
+                "skip_conflicts": True,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            sorted(item["booking_date"] for item in response.data["occurrences"]),
+            [str(self.monday), str(self.next_monday + timedelta(weeks=1))],
+        )
+
+
+class CalendarFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_user = User.objects.create_user(
+            username="client", email="client@example.com", role=Role.CLIENT
+        )
+        cls.club = FitnessClub.objects.create(name="Клуб", address="ул. Абая, 1")
+        cls.trainer_user = User.objects.create_user(
+            username="trainer",
+            email="trainer@example.com",
+            role=Role.TRAINER,
+            first_name="Иван",
+            last_name="Иванов",
+        )
+        cls.trainer = Trainer.objects.create(user=cls.trainer_user)
+        cls.trainer.clubs.add(cls.club)
+        cls.schedule = Schedule.objects.create(
+            trainer=cls.trainer,
+            fitness_club=cls.club,
+            day_of_week=DayOfWeek.MONDAY,
+            start_time=time(9),
+            end_time=time(10),
+            capacity=5,
+        )
+        cls.monday = date.today() + timedelta(days=7 - date.today().weekday())
+
+    def links(self, user, **params):
+        api = APIClient()
+        api.force_authenticate(user)
+        response = api.get("/api/schedule/feeds/", params)
+        self.assertEqual(response.status_code, 200)
+        return {link["kind"]: link["url"] for link in response.data}
+
+    def fetch(self, url, **headers):
+        """
+        Ответ и текст календаря (пустой, если тела нет).
+        """
+        response = APIClient().get(url, headers=headers)
+        if response.streaming:
+            return response, b"".join(response.streaming_content).decode()
+        return response, response.content.decode()
+
+    def test_feeds_are_signed_cached_and_invalidated(self):
+        links = self.links(self.trainer_user, fitness_club_id=self.club.id)
+        self.assertEqual(set(links), {"trainer", "club"})
+        response, _ = self.fetch(links["club"].replace("token=", "token=x"))
+        self.assertEqual(response.status_code, 404)
+
+        ScheduleException.objects.create(schedule=self.schedule, date=self.monday)
+        response, feed = self.fetch(links["club"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertIn("RRULE:FREQ=WEEKLY", feed)
+        self.assertIn(f"EXDATE;TZID=Asia/Almaty:{self.monday:%Y%m%d}T090000", feed)
+        self.assertIn("Иванов", feed)
+
+        etag = response["ETag"]
+        with self.assertNumQueries(0):
+            response, _ = self.fetch(links["club"], if_none_match=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(self.fetch(links["club"])[1], feed)
+
+        self.trainer_user.last_name = "Петров"
+        self.trainer_user.save()
+        response, feed = self.fetch(links["club"], if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Петров", feed)
+
+        client_url = self.links(self.client_user)["client"]
+        etag = self.fetch(client_url)[0]["ETag"]
+        Booking.objects.create(
+            client=self.client_user,
+            schedule=self.schedule,
+            booking_date=self.monday + timedelta(weeks=1),
+            booking_time=time(9),
+            status=BookingStatus.CONFIRMED,
+        )
+        response, feed = self.fetch(client_url, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("STATUS:CONFIRMED", feed)
+
+    def test_other_users_feeds_require_admin(self):
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        response = api.get("/api/schedule/feeds/", {"trainer_id": self.trainer.id})
+        self.assertEqual(response.status_code, 403)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_process_local_cache_is_reported(self):
+        self.assertEqual(
+            [warning.id for warning in check_shared_cache(None)],
+            ["fitness_backend.W001"],
+        )
+        with override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+            }
+        ):
+            self.assertEqual(check_shared_cache(None), [])
+
+    def test_registered_as_deploy_check(self):
+        self.assertIn(
+            check_shared_cache,
+            checks.registry.registry.get_checks(include_deployment_checks=True),
+        )
+        self.assertNotIn(check_shared_cache, checks.registry.registry.get_checks())
@@ -0,0 +1,114 @@
+"""
+Кэш публичного расписания клуба.
+
+Сериализованные расписания клуба хранятся в кэше отдельно на каждый день
+недели: ключ ``(club_id, weekday)``. Запрос недели читает семь ключей одним
+``get_many``, промахи догружаются одним запросом к БД. Записи кэша
+сбрасываются сигналами (см. ``schedule.apps``) точно по тем парам
+``(клуб, день)``, в выдаче которых могли измениться данные: расписания,
+тренеры (вместе с пользователем и составом клубов) и клубы.
+
+Счётчики попаданий и промахов хранятся в том же кэше и общие для всех
+процессов, если кэш общий (Redis, Memcached).
+"""
+
+import json
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from fitness_backend.cache import invalidate_keys
+from .models import WEEKDAY_NUMBERS, Schedule
+
+COUNTER_KEYS = {
+    "hits": "schedule:timetable-stats:hits",
+    "misses": "schedule:timetable-stats:misses",
+}
+
+
+def timetable_key(club_id, weekday):
+    return f"schedule:timetable:{club_id}:{weekday}"
+
+
+def increment(key, delta):
+    if not delta:
+        return
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def timetable_entries(club_id, weekdays, load):
+    """
+    Записи кэша ``{weekday: {"results": [...], "digest": str}}`` для дней
+    ``weekdays``. ``load(weekdays)`` возвращает сериализованные расписания
+    клуба ``{weekday: [...]}`` для дней, которых нет в кэше.
+    """
+    keys = {weekday: timetable_key(club_id, weekday) for weekday in weekdays}
+    cached = cache.get_many(keys.values())
+    entries = {weekday: cached[key] for weekday, key in keys.items() if key in cached}
+    missing = [weekday for weekday in weekdays if weekday not in entries]
+    if missing:
+        loaded = load(missing)
+        fresh = {}
+        for weekday in missing:
+            results = loaded.get(weekday, [])
+            payload = json.dumps(results, cls=DjangoJSONEncoder, sort_keys=True)
+            entries[weekday] = fresh[keys[weekday]] = {
+                "results": results,
+                "digest": md5(payload.encode(), usedforsecurity=False).hexdigest(),
+            }
+        cache.set_many(fresh, settings.TIMETABLE_CACHE_SECONDS)
+
+    increment(COUNTER_KEYS["hits"], len(weekdays) - len(missing))
+    increment(COUNTER_KEYS["misses"], len(missing))
+    return entries
+
+
+def timetable_cache_stats():
+    counters = cache.get_many(COUNTER_KEYS.values())
+    stats = {name: counters.get(key, 0) for name, key in COUNTER_KEYS.items()}
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+    return stats
+
+
+def invalidate_timetables(pairs):
+    invalidate_keys(timetable_key(club_id, weekday) for club_id, weekday in set(pairs))
+
+
+def schedule_timetable(schedule):
+    """
+    Пара ``(club_id, weekday)`` расписания по значениям в памяти (после
+    обновления вычисляемый ``weekday`` не перечитывается из БД).
+    """
+    return (schedule.fitness_club_id, WEEKDAY_NUMBERS[schedule.day_of_week])
+
+
+def timetables_of(condition):
+    """
+    Пары ``(club_id, weekday)`` расписаний, удовлетворяющих ``condition``.
+    """
+    return (
+        Schedule.objects.filter(condition)
+        .values_list("fitness_club_id", "weekday")
+        .distinct()
+    )
+
+
+def trainer_timetables(trainer_ids):
+    return timetables_of(Q(trainer_id__in=trainer_ids))
+
+
+def user_timetables(user_id):
+    return timetables_of(Q(trainer__user_id=user_id))
+
+
+def club_timetables(club_id):
+    # Клуб выводится и в расписаниях других клубов — в списке клубов тренера.
+    return timetables_of(Q(fitness_club_id=club_id) | Q(trainer__clubs=club_id))
@@ -1,10 +1,22 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
-from .views import ScheduleViewSet
+from .views import (
+    CalendarFeedLinksView,
+    CalendarFeedView,
+    ScheduleExceptionViewSet,
+    ScheduleViewSet,
+)
 
 router = DefaultRouter()
 router.register(r"schedules", ScheduleViewSet)
+router.register(r"exceptions", ScheduleExceptionViewSet)
 
 urlpatterns = [
+    path("feeds/", CalendarFeedLinksView.as_view(), name="calendar-feed-links"),
+    re_path(
+        r"^feeds/(?P<kind>trainer|club|client)/(?P<pk>[0-9]+)\.ics$",
+        CalendarFeedView.as_view(),
+        name="calendar-feed",
+    ),
     path("", include(router.urls)),
 ]
@@ -1,18 +1,78 @@
-from rest_framework import viewsets, permissions as drf_permissions
+from pathlib import Path
 
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from rest_framework import status, viewsets, permissions as drf_permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from bookings.models import BookingRollup, BookingStatus
+from fitness_backend.conditional import ConditionalGetMixin
+from fitness_backend.prefetch import OptimizedQuerysetMixin
+from trainers.membership import is_club_member
 from trainers.models import Trainer
 from users.models import Role
-from .models import Schedule
-from .schemas import schedule_extend_schema_view
-from .serializers import ScheduleSerializer
+from .calendar import calendar_response
+from .feeds import (
+    FEED_BUILDERS,
+    ICalendarRenderer,
+    IgnoreAcceptNegotiation,
+    body_key,
+    check_feed_token,
+    feed_owner,
+    feed_token,
+    feed_version,
+    stored_lines,
+)
+from .importer import (
+    IMPORT_FORMATS,
+    NON_FIELD,
+    TimetableImport,
+    TimetableImportError,
+    read_rows,
+)
+from .models import DayOfWeek, Schedule, ScheduleException
+from .schemas import (
+    calendar_feed_extend_schema,
+    calendar_feed_links_extend_schema,
+    schedule_exception_extend_schema_view,
+    schedule_extend_schema_view,
+)
+from .serializers import (
+    CalendarFeedLinkSerializer,
+    ScheduleExceptionSerializer,
+    ScheduleOccurrenceSerializer,
+    ScheduleSerializer,
+    TimetableCacheStatsSerializer,
+    TimetableImportReportSerializer,
+)
+from .timetable import timetable_cache_stats, timetable_entries
 from . import permissions as local_permissions
 from datetime import datetime
 from rest_framework.exceptions import ValidationError
 
+MAX_CALENDAR_DAYS = 92
+
+# Параметры, при которых список расписаний клуба отдаётся из кэша.
+TIMETABLE_PARAMS = {"fitness_club_id", "date"}
+
 
 @schedule_extend_schema_view
-class ScheduleViewSet(viewsets.ModelViewSet):
-    queryset = Schedule.objects.all().order_by("day_of_week", "start_time")
+class ScheduleViewSet(
+    ConditionalGetMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet
+):
+    queryset = Schedule.objects.all().order_by("weekday", "start_time", "id")
+    ordering = ("weekday", "start_time", "id")
     serializer_class = ScheduleSerializer
     permission_classes = [local_permissions.IsAdminOrTrainerOwnerOfSchedule]
 
@@ -27,25 +87,21 @@ class ScheduleViewSet(viewsets.ModelViewSet):
         if fitness_club_id:
             queryset = queryset.filter(fitness_club__id=fitness_club_id)
 
+        # Тренер не работает в клубе — расписаний заведомо нет, БД не нужна.
+        if (
+            trainer_id
+            and fitness_club_id
+            and trainer_id.isdigit()
+            and fitness_club_id.isdigit()
+            and not is_club_member(int(trainer_id), int(fitness_club_id))
+        ):
+            return queryset.none()
+
         date_param = self.request.query_params.get("date")
         if date_param:
             try:
                 target_date = datetime.strptime(date_param, "%Y-%m-%d").date()
-                # Соответствие дня недели из расписания (0=понедельник, 6=воскресенье)
-                day_of_week_map = {
-                    0: "monday",
-                    1: "tuesday",
-                    2: "wednesday",
-                    3: "thursday",
-                    4: "friday",
-                    5: "saturday",
-                    6: "sunday",
-                }
-                day_name = day_of_week_map.get(target_date.weekday())
-                if day_name:
-                    queryset = queryset.filter(day_of_week=day_name)
-                else:
-                    return queryset.none()
+                queryset = queryset.filter(weekday=target_date.weekday())
             except ValueError:
                 raise ValidationError(
                     {"date": "Неверный формат даты. Используйте YYYY-MM-DD."}
@@ -56,14 +112,174 @@ class ScheduleViewSet(viewsets.ModelViewSet):
             and self.request.user.role == Role.TRAINER
             and not self.request.user.is_staff
         ):
-            try:
-                trainer_profile = Trainer.objects.get(user=self.request.user)
-                queryset = queryset.filter(trainer=trainer_profile)
-            except Trainer.DoesNotExist:
-                return queryset.none()
+            queryset = queryset.filter(trainer__user=self.request.user)
 
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        club_id, weekdays = self.timetable_scope()
+        if club_id is None:
+            return super().list(request, *args, **kwargs)
+
+        entries = timetable_entries(
+            club_id, weekdays, lambda missing: self.load_timetable(club_id, missing)
+        )
+        results = [item for weekday in weekdays for item in entries[weekday]["results"]]
+        if len(results) > self.paginator.get_page_size(request):
+            return super().list(request, *args, **kwargs)
+        # Валидатор ETag — отпечатки содержимого дней из кэша: запрос к БД
+        # не нужен ни для ответа 200, ни для 304.
+        return self.conditional_response(
+            request,
+            [],
+            [entries[weekday]["digest"] for weekday in weekdays],
+            lambda: Response({"next": None, "previous": None, "results": results}),
+            use_date=False,
+        )
+
+    def timetable_scope(self):
+        """
+        Клуб и дни недели, если запрос — публичное расписание клуба
+        (``fitness_club_id`` и, возможно, ``date``, без других параметров),
+        иначе ``(None, None)``. Тренерам список не кэшируется: они видят
+        только свои расписания.
+        """
+        params = self.request.query_params
+        club_id = params.get("fitness_club_id", "")
+        user = self.request.user
+        if (
+            not club_id.isdigit()
+            or set(params) - TIMETABLE_PARAMS
+            or (user.role == Role.TRAINER and not user.is_staff)
+        ):
+            return None, None
+        if not params.get("date"):
+            return int(club_id), list(range(len(DayOfWeek.values)))
+        try:
+            target_date = datetime.strptime(params["date"], "%Y-%m-%d").date()
+        except ValueError:
+            return None, None
+        return int(club_id), [target_date.weekday()]
+
+    def load_timetable(self, club_id, weekdays):
+        queryset = self.get_queryset().filter(
+            fitness_club_id=club_id, weekday__in=weekdays
+        )
+        timetable = {}
+        for item in self.get_serializer(queryset, many=True).data:
+            timetable.setdefault(item["weekday"], []).append(item)
+        return timetable
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=[IsAdminUser],
+        parser_classes=[JSONParser, MultiPartParser],
+        serializer_class=TimetableImportReportSerializer,
+    )
+    def import_timetable(self, request):
+        upload = request.FILES.get("file")
+        try:
+            if upload is None:
+                rows = read_rows(request.data, "json")
+            else:
+                import_format = (
+                    request.data.get("import_format")
+                    or Path(upload.name).suffix.lstrip(".").lower()
+                )
+                if import_format not in IMPORT_FORMATS:
+                    raise ValidationError(
+                        {
+                            "import_format": f"Допустимые значения: {', '.join(IMPORT_FORMATS)}."
+                        }
+                    )
+                try:
+                    content = upload.read().decode("utf-8-sig")
+                except UnicodeDecodeError:
+                    raise ValidationError(
+                        {"file": "Файл должен быть в кодировке UTF-8."}
+                    )
+                rows = read_rows(content, import_format)
+            timetable = TimetableImport(rows)
+        except TimetableImportError as e:
+            field = "file" if upload else NON_FIELD
+            raise ValidationError({field: str(e)})
+
+        if not timetable.validate():
+            return Response(timetable.report(), status=status.HTTP_400_BAD_REQUEST)
+        if request.query_params.get("dry_run") in ("1", "true"):
+            return Response(timetable.report())
+        try:
+            timetable.save()
+        except TimetableImportError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(timetable.report(), status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="timetable-cache",
+        permission_classes=[IsAdminUser],
+        serializer_class=TimetableCacheStatsSerializer,
+    )
+    def timetable_cache(self, request):
+        return Response(TimetableCacheStatsSerializer(timetable_cache_stats()).data)
+
+    @action(
+        detail=False, methods=["get"], serializer_class=ScheduleOccurrenceSerializer
+    )
+    def calendar(self, request):
+        params = request.query_params
+        errors, dates = {}, {}
+        for name in ("from", "to"):
+            try:
+                dates[name] = datetime.strptime(params[name], "%Y-%m-%d").date()
+            except KeyError:
+                errors[name] = "Обязательный параметр."
+            except ValueError:
+                errors[name] = "Неверный формат даты. Используйте YYYY-MM-DD."
+        if not errors and not 0 <= (dates["to"] - dates["from"]).days < (
+            MAX_CALENDAR_DAYS
+        ):
+            errors["to"] = (
+                f"Период должен начинаться не позже конца и быть не длиннее "
+                f"{MAX_CALENDAR_DAYS} дней."
+            )
+        if errors:
+            raise ValidationError(errors)
+
+        date_from, date_to = dates["from"], dates["to"]
+        # Те же фильтры и ограничения видимости, что и у списка; нужны только
+        # поля, которые выводит календарь.
+        schedules = list(
+            self.get_queryset()
+            .filter(is_active=True)
+            .select_related("trainer__user", "fitness_club")
+            .prefetch_related(None)
+            .only(
+                "weekday",
+                "start_time",
+                "end_time",
+                "capacity",
+                "trainer__user__first_name",
+                "trainer__user__last_name",
+                "fitness_club__name",
+            )
+        )
+        counts = {}
+        rollups = BookingRollup.objects.filter(
+            schedule_id__in=[schedule.id for schedule in schedules],
+            date__range=(date_from, date_to),
+            count__gt=0,
+        ).values_list("schedule_id", "date", "status", "count")
+        for schedule_id, day, booking_status, count in rollups:
+            counts.setdefault((schedule_id, day), {})[booking_status] = count
+        cancelled = ScheduleException.objects.cancelled(schedules, date_from, date_to)
+        return calendar_response(
+            schedules, date_from, date_to, counts, BookingStatus, cancelled
+        )
+
     def perform_create(self, serializer):
         if self.request.user.role == Role.TRAINER and not self.request.user.is_staff:
             try:
@@ -98,3 +314,135 @@ class ScheduleViewSet(viewsets.ModelViewSet):
                 )
         else:
             serializer.save()
+
+
+@schedule_exception_extend_schema_view
+class ScheduleExceptionViewSet(viewsets.ModelViewSet):
+    """
+    Отмены занятий и закрытия клубов на конкретные даты.
+    """
+
+    queryset = ScheduleException.objects.all().order_by("date", "id")
+    serializer_class = ScheduleExceptionSerializer
+    permission_classes = [local_permissions.IsAdminOrReadOnly]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+
+        fitness_club_id = params.get("fitness_club_id")
+        if fitness_club_id:
+            queryset = queryset.filter(
+                Q(fitness_club_id=fitness_club_id)
+                | Q(schedule__fitness_club_id=fitness_club_id)
+            )
+        schedule_id = params.get("schedule_id")
+        if schedule_id:
+            queryset = queryset.filter(schedule_id=schedule_id)
+
+        for name, lookup in (("date_from", "date__gte"), ("date_to", "date__lte")):
+            if params.get(name):
+                try:
+                    day = datetime.strptime(params[name], "%Y-%m-%d").date()
+                except ValueError:
+                    raise ValidationError(
+                        {name: "Неверный формат даты. Используйте YYYY-MM-DD."}
+                    )
+                queryset = queryset.filter(**{lookup: day})
+        return queryset
+
+
+@calendar_feed_links_extend_schema
+class CalendarFeedLinksView(APIView):
+    """
+    Подписанные ссылки на календари .ics, доступные пользователю.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        params = request.query_params
+        feeds = []
+        if user.role == Role.CLIENT:
+            feeds.append(("client", user.id))
+        if user.role == Role.TRAINER:
+            trainer_id = (
+                Trainer.objects.filter(user=user).values_list("id", flat=True).first()
+            )
+            if trainer_id is not None:
+                feeds.append(("trainer", trainer_id))
+
+        errors = {}
+        for name, kind in (
+            ("fitness_club_id", "club"),
+            ("trainer_id", "trainer"),
+            ("client_id", "client"),
+        ):
+            if not params.get(name):
+                continue
+            if kind != "club" and not user.is_staff:
+                raise PermissionDenied(
+                    "Ссылки на чужие календари доступны только администраторам."
+                )
+            try:
+                feeds.append((kind, int(params[name])))
+            except ValueError:
+                errors[name] = "Ожидается целое число."
+        if errors:
+            raise ValidationError(errors)
+
+        links = [
+            {
+                "kind": kind,
+                "id": pk,
+                "url": request.build_absolute_uri(
+                    reverse("calendar-feed", kwargs={"kind": kind, "pk": pk})
+                )
+                + "?"
+                + urlencode({"token": feed_token(kind, pk)}),
+            }
+            for kind, pk in dict.fromkeys(feeds)
+        ]
+        return Response(CalendarFeedLinkSerializer(links, many=True).data)
+
+
+@calendar_feed_extend_schema
+class CalendarFeedView(APIView):
+    """
+    Календарь .ics по подписанной ссылке. Текущая версия календаря — ETag:
+    опрос без изменений получает 304 без обращения к БД, а неизменившийся
+    календарь после изменения данных строится один раз и дальше читается из кэша.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    renderer_classes = [ICalendarRenderer]
+    content_negotiation_class = IgnoreAcceptNegotiation
+
+    def get(self, request, kind, pk):
+        pk = int(pk)
+        if not check_feed_token(kind, pk, request.query_params.get("token")):
+            raise NotFound("Календарь не найден.")
+
+        version = feed_version(kind, pk)
+        etag = quote_etag(version)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            key = body_key(kind, pk, version)
+            content_type = f"{ICalendarRenderer.media_type}; charset=utf-8"
+            body = cache.get(key)
+            if body is not None:
+                response = HttpResponse(body, content_type=content_type)
+            else:
+                owner = feed_owner(kind, pk)
+                if owner is None:
+                    raise NotFound("Календарь не найден.")
+                response = StreamingHttpResponse(
+                    stored_lines(FEED_BUILDERS[kind](owner), key),
+                    content_type=content_type,
+                )
+        response["ETag"] = etag
+        response["Content-Disposition"] = f'inline; filename="{kind}-{pk}.ics"'
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
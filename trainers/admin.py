@@ -2,6 +2,28 @@ from django.contrib import admin
 from .models import Trainer, FitnessClub
 
 
+class TrainerListFilter(admin.SimpleListFilter):
+    """
+    Фильтр по тренеру: варианты строятся одним запросом по таблице тренеров,
+    а не выборкой различных значений из фильтруемой таблицы.
+    """
+
+    title = "тренер"
+    parameter_name = "trainer"
+    trainer_lookup = "trainer"
+
+    def lookups(self, request, model_admin):
+        trainers = Trainer.objects.select_related("user").only(
+            "id", "user__first_name", "user__last_name"
+        )
+        return [(trainer.id, trainer.full_name) for trainer in trainers]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.trainer_lookup: self.value()})
+        return queryset
+
+
 @admin.register(Trainer)
 class TrainerAdmin(admin.ModelAdmin):
 
@@ -22,6 +44,16 @@ class TrainerAdmin(admin.ModelAdmin):
         "specialization",
     )
     readonly_fields = ("created_at", "updated_at")
+    autocomplete_fields = ("user", "clubs")
+
+    def get_queryset(self, request):
+        # user нужен в __str__ (в том числе в подсказках автодополнения)
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("user")
+            .prefetch_related("clubs")
+        )
 
     def display_clubs(self, obj):
         return ", ".join([club.name for club in obj.clubs.all()])
@@ -1,6 +1,50 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed
+from django.utils import timezone
+
+
+def touch_trainers_on_clubs_change(sender, instance, action, reverse, pk_set, **kwargs):
+    from .models import Trainer
+
+    # Состав клубов выводится в профиле тренера: изменение связи должно
+    # обновлять его updated_at, иначе условный GET отдаст устаревшие данные.
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        trainers = Trainer.objects.filter(pk=instance.pk)
+    elif reverse and action in ("post_add", "post_remove"):
+        trainers = Trainer.objects.filter(pk__in=pk_set)
+    elif reverse and action == "pre_clear":
+        trainers = Trainer.objects.filter(clubs=instance)
+    else:
+        return
+    trainers.update(updated_at=timezone.now())
+
+
+def invalidate_membership_on_clubs_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    from .membership import invalidate_membership
+    from .models import Trainer
+
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        invalidate_membership([instance.pk])
+    elif reverse and action in ("post_add", "post_remove"):
+        invalidate_membership(pk_set)
+    elif reverse and action == "pre_clear":
+        invalidate_membership(
+            Trainer.objects.filter(clubs=instance).values_list("pk", flat=True)
+        )
 
 
 class TrainersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "trainers"
+
+    def ready(self):
+        from .models import Trainer
+
+        m2m_changed.connect(
+            touch_trainers_on_clubs_change, sender=Trainer.clubs.through
+        )
+        m2m_changed.connect(
+            invalidate_membership_on_clubs_change, sender=Trainer.clubs.through
+        )
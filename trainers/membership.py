@@ -0,0 +1,41 @@
+"""
+Кэш членства тренера в фитнес-клубах.
+
+Ответ на вопрос «работает ли тренер в клубе» кэшируется по паре
+``(trainer_id, club_id)``. Ключ включает версию членства тренера: при любом
+изменении ``Trainer.clubs`` (сигнал ``m2m_changed``) версия заменяется, и все
+ответы по этому тренеру разом устаревают. При промахе выполняется один
+``EXISTS`` по уникальному индексу промежуточной таблицы.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from fitness_backend.cache import cache_version, invalidate_keys
+from .models import Trainer
+
+
+def version_key(trainer_id):
+    return f"trainers:membership-version:{trainer_id}"
+
+
+def membership_version(trainer_id):
+    return cache_version(version_key(trainer_id))
+
+
+def is_club_member(trainer_id, club_id):
+    key = (
+        f"trainers:membership:{trainer_id}:"
+        f"{membership_version(trainer_id)}:{club_id}"
+    )
+    member = cache.get(key)
+    if member is None:
+        member = Trainer.clubs.through.objects.filter(
+            trainer_id=trainer_id, fitnessclub_id=club_id
+        ).exists()
+        cache.set(key, member, settings.TRAINER_MEMBERSHIP_CACHE_SECONDS)
+    return member
+
+
+def invalidate_membership(trainer_ids):
+    invalidate_keys(version_key(trainer_id) for trainer_id in trainer_ids)
@@ -12,7 +12,7 @@ class IsAdminOrTrainerOwner(permissions.BasePermission):
     def has_permission(self, request, view):
         if view.action == "create":
             return request.user and request.user.is_staff
-        if view.user and request.user.is_authenticated:
+        if request.user and request.user.is_authenticated:
             return True
         return False
 
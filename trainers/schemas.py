@@ -1,5 +1,11 @@
 from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiResponse
 
+from fitness_backend.parameters import (
+    expand_param,
+    fields_param,
+    if_modified_since_param,
+    if_none_match_param,
+)
 from trainers.serializers import FitnessClubSerializer, TrainerSerializer
 
 
@@ -10,8 +16,10 @@ fitnessclub_extend_schema_view = extend_schema_view(
         summary="Список фитнес-клубов",
         description="Получение списка всех зарегистрированных фитнес-клубов. Доступно всем пользователям.",
         tags=common_tags["fitnessclub"],
+        parameters=[fields_param, expand_param, if_none_match_param],
         responses={
             200: FitnessClubSerializer(many=True),
+            304: OpenApiResponse(description="Данные не изменились (условный запрос)."),
             401: OpenApiResponse(description="Неавторизованный доступ."),
         },
     ),
@@ -19,8 +27,15 @@ fitnessclub_extend_schema_view = extend_schema_view(
         summary="Информация о фитнес-клубе",
         description="Получение детальной информации о конкретном фитнес-клубе по его ID. Доступно всем пользователям.",
         tags=common_tags["fitnessclub"],
+        parameters=[
+            fields_param,
+            expand_param,
+            if_none_match_param,
+            if_modified_since_param,
+        ],
         responses={
             200: FitnessClubSerializer,
+            304: OpenApiResponse(description="Данные не изменились (условный запрос)."),
             401: OpenApiResponse(description="Неавторизованный доступ."),
             404: OpenApiResponse(description="Фитнес-клуб не найден."),
         },
@@ -93,8 +108,10 @@ trainer_extend_schema_view = extend_schema_view(
     list=extend_schema(
         summary="Список тренеров",
         description="Получение списка всех профилей тренеров. Доступно всем аутентифицированным пользователям.",
+        parameters=[fields_param, expand_param, if_none_match_param],
         responses={
             200: TrainerSerializer(many=True),
+            304: OpenApiResponse(description="Данные не изменились (условный запрос)."),
             401: OpenApiResponse(description="Неавторизованный доступ."),
         },
         tags=common_tags["trainer"],
@@ -105,8 +122,15 @@ trainer_extend_schema_view = extend_schema_view(
             "Получение детальной информации о профиле тренера по его ID. "
             "Доступно всем аутентифицированным пользователям."
         ),
+        parameters=[
+            fields_param,
+            expand_param,
+            if_none_match_param,
+            if_modified_since_param,
+        ],
         responses={
             200: TrainerSerializer,
+            304: OpenApiResponse(description="Данные не изменились (условный запрос)."),
             401: OpenApiResponse(description="Неавторизованный доступ."),
             404: OpenApiResponse(description="Профиль тренера не найден."),
         },
@@ -1,18 +1,19 @@
 from rest_framework import serializers
 
+from fitness_backend.serializers import FlexFieldsMixin
 from users.models import User
 from .models import Trainer, FitnessClub
 from users.serializers import UserSerializer
 
 
-class FitnessClubSerializer(serializers.ModelSerializer):
+class FitnessClubSerializer(FlexFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = FitnessClub
         fields = "__all__"
         read_only_fields = ["created_at", "updated_at"]
 
 
-class TrainerSerializer(serializers.ModelSerializer):
+class TrainerSerializer(FlexFieldsMixin, serializers.ModelSerializer):
 
     user = UserSerializer(read_only=True)
     clubs = FitnessClubSerializer(many=True, read_only=True)
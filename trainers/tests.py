@@ -1,3 +1,147 @@
+from datetime import time
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from schedule.models import DayOfWeek, Schedule
+from users.models import Role, User
+from .membership import is_club_member
+from .models import FitnessClub, Trainer
+
+
+class TrainerListQueryBudgetTests(TestCase):
+    """
+    Число запросов списков тренеров и клубов не зависит от количества строк.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_user = User.objects.create_user(
+            username="client", email="client@example.com", role=Role.CLIENT
+        )
+        clubs = [FitnessClub.objects.create(name=f"Клуб {i}") for i in range(4)]
+        for i in range(10):
+            trainer_user = User.objects.create_user(
+                username=f"trainer{i}",
+                email=f"trainer{i}@example.com",
+                role=Role.TRAINER,
+            )
+            Trainer.objects.create(user=trainer_user).clubs.set(clubs[: i % 4 + 1])
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def test_trainer_list(self):
+        # тренеры с пользователями + клубы тренеров
+        with self.assertNumQueries(2):
+            response = self.api.get("/api/trainers/trainers/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_club_list(self):
+        with self.assertNumQueries(1):
+            response = self.api.get("/api/trainers/clubs/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 4)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_user = User.objects.create_user(
+            username="client", email="client@example.com", role=Role.CLIENT
+        )
+        trainer_user = User.objects.create_user(
+            username="trainer", email="trainer@example.com", role=Role.TRAINER
+        )
+        cls.trainer = Trainer.objects.create(user=trainer_user)
+        cls.club = FitnessClub.objects.create(name="Клуб")
+        cls.trainer.clubs.add(cls.club)
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def test_list_not_modified_until_related_data_changes(self):
+        response = self.api.get("/api/trainers/trainers/")
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        # Только выборка страницы (тренеры и их клубы), без сериализации.
+        with self.assertNumQueries(2):
+            response = self.api.get("/api/trainers/trainers/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        # Состав клубов выводится в профиле тренера.
+        self.trainer.clubs.add(FitnessClub.objects.create(name="Второй клуб"))
+        response = self.api.get("/api/trainers/trainers/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        etag = response["ETag"]
+
+        # Удаление клуба не меняет updated_at, но меняет состав строк.
+        FitnessClub.objects.filter(name="Второй клуб").delete()
+        response = self.api.get("/api/trainers/trainers/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_retrieve_honours_if_modified_since(self):
+        url = f"/api/trainers/clubs/{self.club.id}/"
+        last_modified = self.api.get(url)["Last-Modified"]
+        response = self.api.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        other = APIClient()
+        other.force_authenticate(self.trainer.user)
+        etag = self.api.get(url)["ETag"]
+        self.assertNotEqual(other.get(url)["ETag"], etag)
+
+
+class ClubMembershipCacheTests(TestCase):
+    def test_membership_is_cached_until_clubs_change(self):
+        trainer_user = User.objects.create_user(
+            username="trainer", email="trainer@example.com", role=Role.TRAINER
+        )
+        trainer = Trainer.objects.create(user=trainer_user)
+        club = FitnessClub.objects.create(name="Клуб")
+        trainer.clubs.add(club)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(is_club_member(trainer.id, club.id))
+        with self.assertNumQueries(0):
+            self.assertTrue(is_club_member(trainer.id, club.id))
+
+        trainer.clubs.remove(club)
+        self.assertFalse(is_club_member(trainer.id, club.id))
+        club.trainers.add(trainer)
+        self.assertTrue(is_club_member(trainer.id, club.id))
+        club.trainers.clear()
+        self.assertFalse(is_club_member(trainer.id, club.id))
+
+    def test_removed_trainer_is_rejected_in_same_transaction(self):
+        trainer_user = User.objects.create_user(
+            username="trainer", email="trainer@example.com", role=Role.TRAINER
+        )
+        trainer = Trainer.objects.create(user=trainer_user)
+        club = FitnessClub.objects.create(name="Клуб")
+        trainer.clubs.add(club)
+        schedule = Schedule(
+            trainer=trainer,
+            fitness_club=club,
+            day_of_week=DayOfWeek.MONDAY,
+            start_time=time(9),
+            end_time=time(10),
+        )
 
-# Create your tests here.
+        with transaction.atomic():
+            schedule.clean()
+            self.assertTrue(is_club_member(trainer.id, club.id))
+            # Ответ уже в кэше, но исключение тренера из клуба сбрасывает
+            # его сразу, не дожидаясь фиксации транзакции.
+            trainer.clubs.remove(club)
+            with self.assertRaises(ValidationError) as raised:
+                schedule.clean()
+            self.assertIn("fitness_club", raised.exception.message_dict)
@@ -1,5 +1,7 @@
 from rest_framework import viewsets, permissions as drf_permissions
 from rest_framework.permissions import IsAdminUser, AllowAny
+from fitness_backend.conditional import ConditionalGetMixin
+from fitness_backend.prefetch import OptimizedQuerysetMixin
 from .models import Trainer, FitnessClub
 from . import permissions as local_permissions
 from .schemas import fitnessclub_extend_schema_view, trainer_extend_schema_view
@@ -8,8 +10,9 @@ from users.models import Role
 
 
 @fitnessclub_extend_schema_view
-class FitnessClubViewSet(viewsets.ModelViewSet):
-    queryset = FitnessClub.objects.all().order_by("name")
+class FitnessClubViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = FitnessClub.objects.all().order_by("name", "id")
+    ordering = ("name", "id")
     serializer_class = FitnessClubSerializer
 
     def get_permissions(self):
@@ -19,8 +22,13 @@ class FitnessClubViewSet(viewsets.ModelViewSet):
 
 
 @trainer_extend_schema_view
-class TrainerViewSet(viewsets.ModelViewSet):
-    queryset = Trainer.objects.all().order_by("user__last_name", "user__first_name")
+class TrainerViewSet(
+    ConditionalGetMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet
+):
+    queryset = Trainer.objects.all().order_by(
+        "user__last_name", "user__first_name", "id"
+    )
+    ordering = ("user__last_name", "user__first_name", "id")
     serializer_class = TrainerSerializer
     permission_classes = [local_permissions.IsAdminOrTrainerOwner]
 
@@ -38,13 +46,3 @@ class TrainerViewSet(viewsets.ModelViewSet):
             serializer.save(user=self.request.user)
         else:
             serializer.save()
-
-    def get_queryset(self):
-        if (
-            self.request.user.is_authenticated
-            and self.request.user.role == Role.TRAINER
-            and not self.request.user.is_staff
-        ):
-            # Тренер может просматривать всех, но для редактирования нужна has_object_permission
-            return Trainer.objects.all().order_by("user__last_name")
-        return super().get_queryset()
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from fitness_backend.admin import EstimatedCountPaginator
 from .models import User
 from trainers.models import Trainer
 
@@ -14,6 +15,8 @@ class TrainerInline(admin.StackedInline):
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     inlines = (TrainerInline,)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_display = (
         "username",
         "email",
@@ -0,0 +1,102 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:20
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_user_birthday_user_gender_user_phone_number"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IdempotencyKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        max_length=255, verbose_name="Ключ идемпотентности"
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        help_text="Операция, к которой относится ключ, например 'bookings.create'.",
+                        max_length=100,
+                        verbose_name="Точка API",
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        help_text="HMAC тела запроса: повтор ключа с другим телом отклоняется.",
+                        max_length=64,
+                        verbose_name="Отпечаток запроса",
+                    ),
+                ),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(
+                        blank=True, null=True, verbose_name="Код ответа"
+                    ),
+                ),
+                (
+                    "response_body",
+                    models.JSONField(
+                        blank=True,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        null=True,
+                        verbose_name="Тело ответа",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                ("expires_at", models.DateTimeField(verbose_name="Срок хранения")),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Автор запроса; пусто для анонимных запросов (регистрация).",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="idempotency_keys",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ключ идемпотентности",
+                "verbose_name_plural": "Ключи идемпотентности",
+                "indexes": [
+                    models.Index(
+                        fields=["expires_at"], name="users_idemp_expires_dba068_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("key", "scope", "user"),
+                        name="unique_idempotency_key",
+                        nulls_distinct=False,
+                    )
+                ],
+            },
+        ),
+    ]
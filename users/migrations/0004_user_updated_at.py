@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, verbose_name="Дата последнего обновления профиля"
+            ),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import RegexValidator
 from django.db import models
 
@@ -53,6 +54,9 @@ class User(AbstractUser):
         verbose_name="Телефон",
         help_text="Контактный телефон пользователя.",
     )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name="Дата последнего обновления профиля"
+    )
 
     REQUIRED_FIELDS = ["email"]
 
@@ -78,3 +82,59 @@ class User(AbstractUser):
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
+
+
+class IdempotencyKey(models.Model):
+    """
+    Сохранённый результат POST-запроса с заголовком ``Idempotency-Key``.
+
+    Повтор запроса с тем же ключом (в пределах той же точки API и того же
+    пользователя) до истечения ``expires_at`` получает сохранённый ответ без
+    повторного выполнения. Пока первый запрос выполняется, ``status_code`` пуст.
+    """
+
+    key = models.CharField(max_length=255, verbose_name="Ключ идемпотентности")
+    scope = models.CharField(
+        max_length=100,
+        verbose_name="Точка API",
+        help_text="Операция, к которой относится ключ, например 'bookings.create'.",
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="idempotency_keys",
+        verbose_name="Пользователь",
+        help_text="Автор запроса; пусто для анонимных запросов (регистрация).",
+    )
+    fingerprint = models.CharField(
+        max_length=64,
+        verbose_name="Отпечаток запроса",
+        help_text="HMAC тела запроса: повтор ключа с другим телом отклоняется.",
+    )
+    status_code = models.PositiveSmallIntegerField(
+        null=True, blank=True, verbose_name="Код ответа"
+    )
+    response_body = models.JSONField(
+        null=True, blank=True, encoder=DjangoJSONEncoder, verbose_name="Тело ответа"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    expires_at = models.DateTimeField(verbose_name="Срок хранения")
+
+    class Meta:
+        verbose_name = "Ключ идемпотентности"
+        verbose_name_plural = "Ключи идемпотентности"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key", "scope", "user"],
+                name="unique_idempotency_key",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}: {self.key}"
@@ -1,5 +1,10 @@
 from drf_spectacular.utils import extend_schema, OpenApiResponse, extend_schema_view
 
+from fitness_backend.parameters import (
+    idempotency_key_param,
+    if_modified_since_param,
+    if_none_match_param,
+)
 from users.serializers import UserCreateSerializer, UserSerializer, UserUpdateSerializer
 
 common_tags = {"users": ["Аутентификация и Пользователи"]}
@@ -15,6 +20,7 @@ create_user_extend_schema = extend_schema(
     запросов к API.
     """,
     request=UserCreateSerializer,
+    parameters=[idempotency_key_param],
     responses={
         201: OpenApiResponse(
             response=UserSerializer, description="Пользователь успешно зарегистрирован."
@@ -26,6 +32,12 @@ create_user_extend_schema = extend_schema(
                 "(слишком короткий, простой и т.д.), или другие ошибки валидации."
             )
         ),
+        409: OpenApiResponse(
+            description="Запрос с тем же ключом идемпотентности ещё выполняется."
+        ),
+        422: OpenApiResponse(
+            description="Ключ идемпотентности уже использован с другими данными."
+        ),
     },
     tags=common_tags["users"],
     auth=[],
@@ -36,8 +48,10 @@ me_extend_schema_view = extend_schema_view(
     get=extend_schema(
         summary="Получение собственного профиля",
         description="Позволяет аутентифицированному пользователю просмотреть детальную информацию о своем профиле.",
+        parameters=[if_none_match_param, if_modified_since_param],
         responses={
             200: UserSerializer,
+            304: OpenApiResponse(description="Данные не изменились (условный запрос)."),
             401: OpenApiResponse(
                 description="Неавторизованный доступ. Не предоставлен токен авторизации или он недействителен."
             ),
@@ -1,8 +1,10 @@
 from rest_framework import serializers
+
+from fitness_backend.serializers import FlexFieldsMixin
 from .models import User
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(FlexFieldsMixin, serializers.ModelSerializer):
     """
     Сериализатор для модели пользователя.
     Используется для чтения и отображения данных пользователя,
@@ -1,3 +1,44 @@
+from unittest import mock
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import IdempotencyKey, User
+
+
+class RegisterIdempotencyTests(TestCase):
+    payload = {
+        "username": "client",
+        "email": "client@example.com",
+        "password": "S3cure-passw0rd",
+    }
+
+    def register(self, key, payload=None):
+        return APIClient().post(
+            "/api/users/register/",
+            payload or self.payload,
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_replay_returns_stored_response_without_hashing(self):
+        first = self.register("key-1")
+        self.assertEqual(first.status_code, 201)
+
+        with mock.patch("django.contrib.auth.base_user.make_password") as hasher:
+            replay = self.register("key-1")
+        hasher.assert_not_called()
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_key_reuse_with_other_payload_is_rejected(self):
+        self.register("key-1")
+        response = self.register("key-1", {**self.payload, "username": "other"})
+        self.assertEqual(response.status_code, 422)
 
-# Create your tests here.
+    def test_failed_request_releases_key(self):
+        response = self.register("key-1", {**self.payload, "email": "wrong"})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
@@ -1,6 +1,8 @@
 from rest_framework import generics, viewsets, status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.response import Response
+from fitness_backend.conditional import ConditionalGetMixin
+from fitness_backend.idempotency import IdempotentCreateMixin
 from .models import User, Role
 from .schemas import (
     create_user_extend_schema,
@@ -11,12 +13,14 @@ from .serializers import UserCreateSerializer, UserSerializer, UserUpdateSeriali
 
 
 @create_user_extend_schema
-class RegisterView(generics.CreateAPIView):
+class RegisterView(IdempotentCreateMixin, generics.CreateAPIView):
     """
     Представление для регистрации нового пользователя.
     Доступно всем. Создает пользователя с ролью 'client' по умолчанию.
+    Повтор запроса с тем же заголовком Idempotency-Key возвращает сохранённый ответ.
     """
 
+    idempotency_scope = "users.register"
     queryset = User.objects.all()
     permission_classes = [AllowAny]
     serializer_class = UserCreateSerializer
@@ -26,10 +30,11 @@ class RegisterView(generics.CreateAPIView):
 
 
 @me_extend_schema_view
-class MeView(generics.RetrieveUpdateDestroyAPIView):
+class MeView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Представление для получения, обновления и удаления информации о текущем аутентифицированном пользователе.
     Доступно только аутентифицированным пользователям.
+    GET поддерживает условные запросы (ETag / Last-Modified).
     """
 
     serializer_class = UserSerializer
@@ -68,6 +73,7 @@ class UserAdminViewSet(viewsets.ModelViewSet):
     """
 
     queryset = User.objects.all().order_by("id")
+    ordering = ("id",)
     serializer_class = UserSerializer
     permission_classes = [IsAdminUser]
 